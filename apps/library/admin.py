@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Book, Author, Loan
+from .models import Book, Author, Loan, Nationality
 
 
 class LoanInline(admin.TabularInline):
@@ -22,7 +22,7 @@ class BookAdmin(admin.ModelAdmin):
         "page_count",
     )
     list_filter = ("language", "is_available", "author")
-    search_fields = ("title", "author__name", "isbn")
+    search_fields = ("title", "author_name", "isbn", "isbn13")
     list_editable = ("is_available",)
     inlines = [LoanInline]
     fieldsets = (
@@ -35,14 +35,23 @@ class BookAdmin(admin.ModelAdmin):
 @admin.register(Author)
 class AuthorAdmin(admin.ModelAdmin):
     list_display = ("name", "nationality", "date_of_birth", "date_of_death")
-    search_fields = ("name", "nationality")
+    list_select_related = ("nationality",)
+    search_fields = ("name", "nationality__name")
+    # lists the small Nationality table, not the distinct values of a text column
     list_filter = ("nationality",)
+    autocomplete_fields = ("nationality",)
     fieldsets = (
         (None, {"fields": ("name", "nationality")}),
         ("Life", {"fields": ("date_of_birth", "date_of_death")}),
     )
 
 
+@admin.register(Nationality)
+class NationalityAdmin(admin.ModelAdmin):
+    list_display = ("name",)
+    search_fields = ("name",)
+
+
 @admin.register(Loan)
 class LoanAdmin(admin.ModelAdmin):
     list_display = ("book", "user", "returned_at")
@@ -0,0 +1,114 @@
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+CATALOG_VERSION_KEY = "library:catalog:version"
+CATALOG_DELETES_KEY = "library:catalog:deletes"
+CACHED_HEADERS = ["Content-Type", "ETag", "Last-Modified"]
+
+
+def canonical_query_string(query_params, allowed=None):
+    """
+    Stable form of a query string: parameters sorted, empty values dropped and,
+    when ``allowed`` is given, unknown parameters ignored.
+    """
+    items = sorted(
+        (key, value)
+        for key, values in query_params.lists()
+        if allowed is None or key in allowed
+        for value in values
+        if value != ""
+    )
+    return urlencode(items)
+
+
+def make_cache_key(prefix, *parts):
+    digest = hashlib.md5(
+        "|".join(str(part) for part in parts).encode("utf-8"), usedforsecurity=False
+    ).hexdigest()
+    return f"library:{prefix}:{digest}"
+
+
+def get_counter(key):
+    """
+    Value of the shared counter ``key``.
+
+    Missing counters start from the current time in milliseconds so that values
+    seen before the counter was evicted are never reused.
+    """
+    value = cache.get(key)
+    if value is None:
+        cache.add(key, int(time.time() * 1000), None)
+        value = cache.get(key)
+    return value
+
+
+def bump_counter(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, int(time.time() * 1000), None)
+
+
+def get_catalog_version():
+    """Version of the catalog data, part of every cached catalog entry's key."""
+    return get_counter(CATALOG_VERSION_KEY)
+
+
+def bump_catalog_version():
+    """Invalidate every cached catalog entry at once."""
+    bump_counter(CATALOG_VERSION_KEY)
+
+
+def get_catalog_deletes():
+    """Counter of book and author deletes, which leave no ``modified`` trace."""
+    return get_counter(CATALOG_DELETES_KEY)
+
+
+def bump_catalog_deletes():
+    bump_counter(CATALOG_DELETES_KEY)
+
+
+def cached_anonymous_response(view, request, handler, *args, **kwargs):
+    """
+    Serve ``handler`` through the catalog response cache for anonymous users.
+
+    Entries are keyed by action, object id and canonical query string under the
+    current catalog version, and hold the rendered body and its validators, so
+    a hit skips the ORM, the serializer and the renderer.
+    """
+    timeout = settings.LIBRARY_RESPONSE_CACHE_TIMEOUT
+    if not timeout or request.user.is_authenticated:
+        return handler(request, *args, **kwargs)
+
+    key = make_cache_key(
+        "response",
+        get_catalog_version(),
+        view.action,
+        kwargs.get(view.lookup_url_kwarg or view.lookup_field, ""),
+        canonical_query_string(request.query_params),
+    )
+    cached = cache.get(key)
+    if cached is not None:
+        content, headers = cached
+        response = HttpResponse(content)
+        for header, value in headers.items():
+            response[header] = value
+        return response
+
+    def store(rendered):
+        headers = {
+            header: rendered[header]
+            for header in CACHED_HEADERS
+            if rendered.has_header(header)
+        }
+        cache.set(key, (rendered.content, headers), timeout)
+
+    response = handler(request, *args, **kwargs)
+    if response.status_code == 200:
+        response.add_post_render_callback(store)
+    return response
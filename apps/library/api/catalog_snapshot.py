@@ -0,0 +1,372 @@
+import bisect
+import threading
+from datetime import MAXYEAR, MINYEAR, date
+
+from apps.library.api.cache import get_catalog_deletes, get_catalog_version
+from apps.library.api.filters import BookFilter
+from apps.library.models import Author, Book
+
+# BookFilter filters the snapshot can evaluate; any other non-empty filter
+# sends the request to the database
+SNAPSHOT_FILTERS = {
+    "language",
+    "is_available",
+    "publish_year",
+    "publish_date_after",
+    "publish_date_before",
+    "page_count_min",
+    "page_count_max",
+}
+SNAPSHOT_ORDERING = {"publish_date", "page_count"}
+# more changed rows than this re-sort the ordered lists instead of moving
+# each record with bisect
+RESORT_THRESHOLD = 256
+# parameters that need a database feature the snapshot does not provide
+DATABASE_ONLY_PARAMS = {"pagination", "cursor"}
+
+
+class BookRecord:
+    """
+    Snapshot row of a book.
+
+    Attributes are named after the ``.values()`` paths they stand for, so
+    records can be rendered like values rows.
+    """
+
+    __slots__ = (
+        "id",
+        "title",
+        "author_id",
+        "author_name",
+        "isbn",
+        "publish_date",
+        "language",
+        "is_available",
+        "page_count",
+        "modified",
+    )
+
+    PATHS = frozenset(__slots__)
+
+    def __init__(self, *values):
+        for slot, value in zip(self.__slots__, values):
+            setattr(self, slot, value)
+
+    def __getitem__(self, path):
+        return getattr(self, path)
+
+
+def default_order(record):
+    # Book.Meta.ordering: -publish_date, id
+    return -record.publish_date.toordinal(), record.id
+
+
+# sortable number of each ordering field, so descending orders can negate it
+SORT_VALUES = {
+    "publish_date": lambda record: record.publish_date.toordinal(),
+    "page_count": lambda record: record.page_count,
+}
+# the ordered lists kept by the snapshot, keyed by their ordering term; ties
+# are broken by id as in BookOrderingFilter, "-publish_date" is the default
+ORDER_KEYS = {
+    "-publish_date": default_order,
+    "publish_date": lambda record: (record.publish_date.toordinal(), record.id),
+    "page_count": lambda record: (record.page_count, record.id),
+    "-page_count": lambda record: (-record.page_count, record.id),
+}
+
+
+class LazyRecords:
+    """
+    Sequence of the records of an iterator, read only as far as indexed.
+
+    Page number pagination slices the first page, or the first
+    ``count_cap + 1`` rows for a capped count, so later records are never
+    filtered.
+    """
+
+    def __init__(self, records):
+        self._records = records
+        self._read = []
+
+    def _read_to(self, stop):
+        """Read records up to position ``stop``, or all of them for ``None``."""
+        while stop is None or len(self._read) < stop:
+            record = next(self._records, None)
+            if record is None:
+                break
+            self._read.append(record)
+
+    def __len__(self):
+        self._read_to(None)
+        return len(self._read)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            stop = index.stop
+            if (index.start or 0) < 0 or stop is None or stop < 0:
+                stop = None
+            self._read_to(stop)
+        else:
+            self._read_to(index + 1 if index >= 0 else None)
+        return self._read[index]
+
+    def __iter__(self):
+        self._read_to(None)
+        return iter(self._read)
+
+
+class CatalogSnapshot:
+    """
+    Per-worker copy of the book catalog answering simple book list queries.
+
+    The snapshot is checked against the catalog version counter on every use
+    (a cache read). When the version moved, rows modified since the watermark
+    are fetched; deletes, counted by a second counter, trigger a full rebuild.
+
+    Books are kept sorted once per ORDER_KEYS ordering. A query walks the list
+    of its ordering, narrowed with bisect on a date or page count range, and
+    filters lazily, so a page only reads the records up to it.
+    """
+
+    def __init__(self):
+        self._books = {}
+        self._orders = {name: [] for name in ORDER_KEYS}
+        # author id -> modified, to skip authors already applied
+        self._authors = {}
+        self._version = None
+        self._deletes = None
+        self._watermark = None
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        version = get_catalog_version()
+        if version == self._version:
+            return
+        with self._lock:
+            if version == self._version:
+                return
+            # read before the rows, so deletes made meanwhile are seen next time
+            deletes = get_catalog_deletes()
+            if (
+                self._version is None
+                or self._watermark is None
+                or deletes != self._deletes
+            ):
+                self._rebuild()
+            else:
+                self._apply_changes()
+            self._version = version
+            self._deletes = deletes
+
+    def _book_rows(self, queryset):
+        return queryset.order_by().values_list(*BookRecord.__slots__)
+
+    def _rebuild(self):
+        watermark = None
+        books = {}
+        for values in self._book_rows(Book.objects.all()).iterator(chunk_size=5000):
+            record = BookRecord(*values)
+            books[record.id] = record
+            modified = record.modified
+            watermark = modified if watermark is None else max(watermark, modified)
+        authors = {}
+        for author_id, modified in Author.objects.values_list(
+            "id", "modified"
+        ).iterator(chunk_size=5000):
+            authors[author_id] = modified
+            watermark = modified if watermark is None else max(watermark, modified)
+
+        self._books = books
+        self._authors = authors
+        self._orders = {
+            name: sorted(books.values(), key=key) for name, key in ORDER_KEYS.items()
+        }
+        self._watermark = watermark
+
+    def _apply_changes(self):
+        # gte: rows committed later with the same timestamp must not be missed,
+        # so the rows already applied at the watermark come back and are skipped
+        changed_authors = {
+            author_id: (name, modified)
+            for author_id, name, modified in Author.objects.filter(
+                modified__gte=self._watermark
+            ).values_list("id", "name", "modified")
+            if self._authors.get(author_id) != modified
+        }
+        changed_books = [
+            BookRecord(*values)
+            for values in self._book_rows(
+                Book.objects.filter(modified__gte=self._watermark)
+            )
+            if getattr(self._books.get(values[0]), "modified", None) != values[-1]
+        ]
+        if not changed_authors and not changed_books:
+            return
+
+        books = dict(self._books)
+        authors = dict(self._authors)
+        replaced = {}
+        watermark = self._watermark
+        if changed_authors:
+            # records are replaced, not mutated, as readers may hold them
+            for record in self._books.values():
+                name, _ = changed_authors.get(record.author_id, (None, None))
+                if name is not None and name != record.author_name:
+                    values = [getattr(record, slot) for slot in BookRecord.__slots__]
+                    values[3] = name
+                    replaced[record.id] = BookRecord(*values)
+            for author_id, (_, modified) in changed_authors.items():
+                authors[author_id] = modified
+                watermark = max(watermark, modified)
+        for record in changed_books:
+            replaced[record.id] = record
+            watermark = max(watermark, record.modified)
+        books.update(replaced)
+
+        self._orders = self._reordered(replaced, books)
+        self._books = books
+        self._authors = authors
+        self._watermark = watermark
+
+    def _reordered(self, replaced, books):
+        """Ordered lists with the ``replaced`` records moved into place."""
+        if len(replaced) > RESORT_THRESHOLD:
+            return {
+                name: sorted(books.values(), key=key)
+                for name, key in ORDER_KEYS.items()
+            }
+        orders = {}
+        for name, key in ORDER_KEYS.items():
+            ordered = list(self._orders[name])
+            for record_id, record in replaced.items():
+                old = self._books.get(record_id)
+                if old is not None:
+                    # keys end with the id, so bisect finds the record itself
+                    position = bisect.bisect_left(ordered, key(old), key=key)
+                    if key(old) == key(record):
+                        ordered[position] = record
+                        continue
+                    del ordered[position]
+                bisect.insort(ordered, record, key=key)
+            orders[name] = ordered
+        return orders
+
+    def supports(self, paths):
+        return set(paths) <= BookRecord.PATHS
+
+    def filter_books(self, query_params):
+        """
+        Records matching ``query_params`` in the requested order, or ``None``
+        when the query needs the database.
+        """
+        if DATABASE_ONLY_PARAMS & set(query_params):
+            return None
+        filterset = BookFilter(query_params, queryset=Book.objects.none())
+        if not filterset.is_valid():
+            return None
+        filters = {
+            name: value
+            for name, value in filterset.form.cleaned_data.items()
+            if value not in (None, "")
+        }
+        if set(filters) - SNAPSHOT_FILTERS:
+            return None
+        ordering = self.parse_ordering(query_params.get("ordering"))
+        if ordering is None:
+            return None
+
+        self.refresh()
+        name = ordering[0] if ordering else "-publish_date"
+        ordered = self._orders[name]
+        start, stop = self.positions(ordered, name, filters)
+        records = (
+            ordered[position]
+            for position in range(start, stop)
+            if self.matches(ordered[position], filters)
+        )
+        if len(ordering) < 2:
+            return LazyRecords(records)
+        # several terms: sort the matches, ties broken by id (BookOrderingFilter)
+        records = sorted(records, key=lambda record: record.id)
+        for term in reversed(ordering):
+            field = term.lstrip("-")
+            records.sort(
+                key=lambda record: getattr(record, field), reverse=term.startswith("-")
+            )
+        return records
+
+    def positions(self, ordered, name, filters):
+        """
+        ``(start, stop)`` slice of ``ordered``, sorted by the ``name`` term,
+        outside of which no record matches the range ``filters`` on its field.
+        """
+        field = name.lstrip("-")
+        low, high = self.bounds(field, filters)
+        sign = 1
+        if name.startswith("-"):
+            sign, low, high = -1, high, low
+
+        def key(record):
+            return sign * SORT_VALUES[field](record)
+
+        start, stop = 0, len(ordered)
+        if low is not None:
+            start = bisect.bisect_left(ordered, sign * low, key=key)
+        if high is not None:
+            stop = bisect.bisect_right(ordered, sign * high, key=key)
+        return start, max(start, stop)
+
+    def bounds(self, field, filters):
+        """
+        Inclusive ``(low, high)`` range of ``field``, in SORT_VALUES units, set
+        by ``filters``; ``None`` for an open end.
+        """
+        lows, highs = [], []
+        if field == "publish_date":
+            if "publish_year" in filters:
+                year = int(filters["publish_year"])
+                if not MINYEAR <= year <= MAXYEAR:
+                    return 1, 0  # empty
+                lows.append(date(year, 1, 1).toordinal())
+                highs.append(date(year, 12, 31).toordinal())
+            if "publish_date_after" in filters:
+                lows.append(filters["publish_date_after"].toordinal())
+            if "publish_date_before" in filters:
+                highs.append(filters["publish_date_before"].toordinal())
+        else:
+            if "page_count_min" in filters:
+                lows.append(filters["page_count_min"])
+            if "page_count_max" in filters:
+                highs.append(filters["page_count_max"])
+        return max(lows, default=None), min(highs, default=None)
+
+    def parse_ordering(self, value):
+        """Ordering terms to apply, ``[]`` for the default, ``None`` if unsupported."""
+        if not value:
+            return []
+        terms = [term.strip() for term in value.split(",") if term.strip()]
+        if any(term.lstrip("-") not in SNAPSHOT_ORDERING for term in terms):
+            return None
+        return terms
+
+    def matches(self, record, filters):
+        for name, value in filters.items():
+            if name == "language" and record.language != value:
+                return False
+            if name == "is_available" and record.is_available != value:
+                return False
+            if name == "publish_year" and record.publish_date.year != int(value):
+                return False
+            if name == "publish_date_after" and record.publish_date < value:
+                return False
+            if name == "publish_date_before" and record.publish_date > value:
+                return False
+            if name == "page_count_min" and record.page_count < value:
+                return False
+            if name == "page_count_max" and record.page_count > value:
+                return False
+        return True
+
+
+catalog_snapshot = CatalogSnapshot()
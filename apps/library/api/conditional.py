@@ -0,0 +1,72 @@
+import hashlib
+from datetime import date
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from apps.library.api.cache import canonical_query_string, get_catalog_version
+
+
+def make_etag(*parts):
+    digest = hashlib.sha1(
+        "|".join(str(part) for part in parts).encode("utf-8"), usedforsecurity=False
+    ).hexdigest()
+    return f'"{digest}"'
+
+
+def collection_etag(view, request):
+    """
+    Version tag of a list response, derived from the catalog version counter
+    and the canonical query string without touching the database. The date is
+    included because author ages change with it.
+    """
+    return make_etag(
+        view.basename,
+        view.action,
+        get_catalog_version(),
+        date.today(),
+        canonical_query_string(request.query_params),
+    )
+
+
+def conditional_response(request, build, validators):
+    """
+    Answer ``If-None-Match`` / ``If-Modified-Since`` with a 304 when the
+    validators still match, otherwise call ``build`` and attach the validators
+    to its response.
+
+    ``validators`` returns ``(etag, last_modified)``, or ``None`` when the
+    object does not exist. It is only called for conditional requests and for
+    responses that do not already carry an ETag (cached responses do).
+    """
+    conditional = (
+        "HTTP_IF_NONE_MATCH" in request.META or "HTTP_IF_MODIFIED_SINCE" in request.META
+    )
+    current = validators() if conditional else None
+    if current is not None:
+        etag, last_modified = current
+        response = get_conditional_response(
+            request, etag=etag, last_modified=_timestamp(last_modified)
+        )
+        if response is not None:
+            return _with_validators(response, etag, last_modified)
+
+    response = build()
+    if response.status_code != 200 or response.has_header("ETag"):
+        return response
+    if not conditional:
+        current = validators()
+    if current is None:
+        return response
+    return _with_validators(response, *current)
+
+
+def _timestamp(last_modified):
+    return int(last_modified.timestamp()) if last_modified else None
+
+
+def _with_validators(response, etag, last_modified):
+    response["ETag"] = etag
+    if last_modified:
+        response["Last-Modified"] = http_date(_timestamp(last_modified))
+    return response
@@ -1,6 +1,11 @@
 import django_filters
-from django.db import models
-from apps.library.models import Book, Loan
+from datetime import MAXYEAR, MINYEAR, date
+from rest_framework.filters import OrderingFilter
+from apps.library.models import Author, Book, Loan
+from apps.library.services.author_services import with_age
+from apps.library.services.isbn_services import to_isbn13
+from apps.library.services.nationality_services import nationality_names
+from apps.library.services.search_services import fuzzy_filter, search_books
 
 
 class BookFilter(django_filters.FilterSet):
@@ -14,25 +19,33 @@ class BookFilter(django_filters.FilterSet):
         help_text="Filter by book title (case-insensitive contains)",
     )
 
-    isbn = django_filters.NumberFilter(
-        field_name="isbn",
-        lookup_expr="exact",
-        help_text="Filter by book ISBN number",
+    title_fuzzy = django_filters.CharFilter(
+        method="filter_fuzzy",
+        help_text="Typo-tolerant title match, ordered by similarity",
+    )
+
+    isbn = django_filters.CharFilter(
+        method="filter_isbn",
+        help_text="Filter by book ISBN, in ISBN-10 or ISBN-13 form",
     )
 
     author_name = django_filters.CharFilter(
-        field_name="author__name",
+        field_name="author_name",
         lookup_expr="icontains",
         help_text="Filter by author name (case-insensitive contains)",
     )
 
+    author_name_fuzzy = django_filters.CharFilter(
+        method="filter_fuzzy",
+        help_text="Typo-tolerant author name match, ordered by similarity",
+    )
+
     language = django_filters.ChoiceFilter(
         choices=Book.LANGUAGE_CHOICES, help_text="Filter by book language"
     )
 
     publish_year = django_filters.NumberFilter(
-        field_name="publish_date",
-        lookup_expr="year",
+        method="filter_publish_year",
         help_text="Filter by publication year",
     )
 
@@ -71,7 +84,9 @@ class BookFilter(django_filters.FilterSet):
         model = Book
         fields = [
             "title",
+            "title_fuzzy",
             "author_name",
+            "author_name_fuzzy",
             "language",
             "publish_year",
             "publish_date_after",
@@ -82,16 +97,157 @@ class BookFilter(django_filters.FilterSet):
             "search",
         ]
 
+    def filter_publish_year(self, queryset, name, value):
+        """
+        Books published in year ``value``, as a date range rather than
+        ``__year`` so the publish_date indexes apply.
+        """
+        if value is None:
+            return queryset
+        year = int(value)
+        if not MINYEAR <= year < MAXYEAR:
+            return queryset.none()
+        return queryset.filter(
+            publish_date__gte=date(year, 1, 1), publish_date__lt=date(year + 1, 1, 1)
+        )
+
+    def filter_isbn(self, queryset, name, value):
+        """Exact match on the canonical ISBN-13 of ``value``."""
+        if not value:
+            return queryset
+        isbn13 = to_isbn13(value)
+        if isbn13 is None:
+            return queryset.none()
+        return queryset.filter(isbn13=isbn13)
+
     def filter_search(self, queryset, name, value):
-        """Search across multiple fields."""
+        """Search across title, author name and description, ranked by relevance."""
         if value:
-            return queryset.filter(
-                models.Q(title__icontains=value)
-                | models.Q(author__name__icontains=value)
-                | models.Q(description__icontains=value)
-            ).distinct()
+            return search_books(queryset, value)
         return queryset
 
+    FUZZY_FIELDS = {"title_fuzzy": "title", "author_name_fuzzy": "author_name"}
+
+    def filter_fuzzy(self, queryset, name, value):
+        """Similarity match that tolerates typos (e.g. "harry poter")."""
+        if value:
+            return fuzzy_filter(queryset, self.FUZZY_FIELDS[name], value)
+        return queryset
+
+
+class BookOrderingFilter(OrderingFilter):
+    """
+    Ordering backend for books that also understands ``rank``, the relevance
+    annotation added by the ``search`` filter.
+    Ordering by rank is ignored when no search was performed. Requested
+    orderings end with ``id`` so ties, and pages, are stable.
+    """
+
+    def remove_invalid_fields(self, queryset, fields, view, request):
+        fields = super().remove_invalid_fields(queryset, fields, view, request)
+        ranked = "search_rank" in queryset.query.annotations
+        ordering = []
+        for term in fields:
+            if term.lstrip("-") == "rank":
+                if ranked:
+                    ordering.append(term.replace("rank", "search_rank"))
+            else:
+                ordering.append(term)
+        if ordering and not {"id", "-id"} & set(ordering):
+            ordering.append("id")
+        return ordering
+
+
+class AuthorFilter(django_filters.FilterSet):
+    """
+    Filter class for Author model.
+    """
+
+    # icontains compares UPPER(name), the expression of the trigram index
+    # library_author_name_up_trgm
+    name = django_filters.CharFilter(
+        field_name="name",
+        lookup_expr="icontains",
+        help_text="Filter by author name (case-insensitive contains)",
+    )
+
+    nationality = django_filters.CharFilter(
+        method="filter_nationality",
+        help_text="Filter by nationality (exact match)",
+    )
+
+    born_after = django_filters.DateFilter(
+        field_name="date_of_birth",
+        lookup_expr="gte",
+        help_text="Filter authors born on or after this date",
+    )
+
+    born_before = django_filters.DateFilter(
+        field_name="date_of_birth",
+        lookup_expr="lte",
+        help_text="Filter authors born on or before this date",
+    )
+
+    is_alive = django_filters.BooleanFilter(
+        field_name="date_of_death",
+        lookup_expr="isnull",
+        help_text="Filter by whether the author is alive (no date of death)",
+    )
+
+    age_min = django_filters.NumberFilter(
+        method="filter_age",
+        help_text="Filter authors at least this old (age at death for the dead)",
+    )
+
+    age_max = django_filters.NumberFilter(
+        method="filter_age",
+        help_text="Filter authors at most this old (age at death for the dead)",
+    )
+
+    class Meta:
+        model = Author
+        fields = [
+            "name",
+            "nationality",
+            "born_after",
+            "born_before",
+            "is_alive",
+            "age_min",
+            "age_max",
+        ]
+
+    def filter_nationality(self, queryset, name, value):
+        """Compare nationality ids; the name is resolved from the cached map."""
+        if not value:
+            return queryset
+        nationality_id = nationality_names.id(value)
+        if nationality_id is None:
+            return queryset.none()
+        return queryset.filter(nationality_id=nationality_id)
+
+    def filter_age(self, queryset, name, value):
+        """Filter on the ``age_years`` annotation, computed in the database."""
+        if value is None:
+            return queryset
+        lookup = "gte" if name == "age_min" else "lte"
+        return with_age(queryset).filter(**{f"age_years__{lookup}": value})
+
+
+class AuthorOrderingFilter(OrderingFilter):
+    """
+    Ordering backend for authors that maps ``age`` to the ``age_years``
+    annotation; the view adds the annotation when age is ordered by.
+    """
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if not ordering:
+            return ordering
+        return [
+            term.replace("age", "age_years") if term.lstrip("-") == "age" else term
+            for term in ordering
+        ]
+
 
 class LoanFilter(django_filters.FilterSet):
     """
@@ -117,7 +273,7 @@ class LoanFilter(django_filters.FilterSet):
     )
 
     book_author = django_filters.CharFilter(
-        field_name="book__author__name",
+        field_name="book__author_name",
         lookup_expr="icontains",
         help_text="Filter by book author (case-insensitive contains)",
     )
@@ -0,0 +1,261 @@
+import base64
+import binascii
+from collections import OrderedDict
+from datetime import date
+
+from django.conf import settings
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger
+from django.core.paginator import Paginator as DjangoPaginator
+from django.db import connections
+from django.db.models import Q, QuerySet
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class BookKeysetPagination(BasePagination):
+    """
+    Keyset (cursor) pagination over ``(publish_date DESC, id ASC)``.
+
+    Each page is fetched with a range condition on the last row seen instead of
+    an OFFSET, so it can be served straight from the matching index and costs
+    the same at any depth. Cursors are opaque and no total count is computed.
+    """
+
+    page_size = api_settings.PAGE_SIZE
+    # columns read by get_position, kept by views that project their querysets
+    position_fields = ["publish_date", "id"]
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.base_url = request.build_absolute_uri()
+        position = self.decode_cursor(request)
+
+        reverse = False
+        queryset = queryset.order_by("-publish_date", "id")
+        if position is not None:
+            publish_date, pk, reverse = position
+            if reverse:
+                # rows before the cursor, walked backwards from it
+                queryset = queryset.filter(
+                    Q(publish_date__gt=publish_date)
+                    | Q(publish_date=publish_date, id__lt=pk),
+                    publish_date__gte=publish_date,
+                ).order_by("publish_date", "-id")
+            else:
+                queryset = queryset.filter(
+                    Q(publish_date__lt=publish_date)
+                    | Q(publish_date=publish_date, id__gt=pk),
+                    publish_date__lte=publish_date,
+                )
+
+        rows = list(queryset[: self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        if reverse:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, position is not None
+
+        self.next_position = self.get_position(rows[-1]) if rows and has_next else None
+        self.previous_position = (
+            self.get_position(rows[0]) if rows and has_previous else None
+        )
+        return rows
+
+    def get_position(self, row):
+        if isinstance(row, dict):
+            # .values() rows of the values serialization path
+            return row["publish_date"], row["id"]
+        return row.publish_date, row.pk
+
+    def get_paginated_response(self, data):
+        return Response(
+            OrderedDict(
+                [
+                    ("next", self.get_next_link()),
+                    ("previous", self.get_previous_link()),
+                    ("results", data),
+                ]
+            )
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        return self.encode_cursor(*self.next_position, reverse=False)
+
+    def get_previous_link(self):
+        if self.previous_position is None:
+            return None
+        return self.encode_cursor(*self.previous_position, reverse=True)
+
+    def encode_cursor(self, publish_date, pk, reverse):
+        token = f"{publish_date.isoformat()}|{pk}|{int(reverse)}"
+        encoded = base64.urlsafe_b64encode(token.encode("ascii")).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            token = base64.urlsafe_b64decode(encoded.encode("ascii")).decode("ascii")
+            publish_date, pk, reverse = token.split("|")
+            return date.fromisoformat(publish_date), int(pk), reverse == "1"
+        except (binascii.Error, UnicodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+
+class ApproximateCountPage(Page):
+    """Page whose next page is known from an extra row, not from the count."""
+
+    def __init__(self, object_list, number, paginator, has_next):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self):
+        return self._has_next
+
+
+class CountStrategyPaginator(DjangoPaginator):
+    """
+    Django paginator whose ``count`` follows a strategy:
+
+    - ``exact``: a full ``COUNT(*)``.
+    - ``capped``: counts at most ``count_cap + 1`` rows and reports ``count_cap``
+      as an approximate count when there are more.
+    - ``estimated``: the planner's row estimate for unfiltered querysets on
+      PostgreSQL, ``capped`` otherwise.
+
+    An approximate count does not bound the page numbers: pages past it are
+    served as long as they have rows, and whether a next page exists is
+    found by fetching one row more than the page holds.
+    """
+
+    def __init__(self, object_list, per_page, count_strategy="exact", count_cap=None):
+        super().__init__(object_list, per_page)
+        self.count_strategy = count_strategy
+        self.count_cap = count_cap or settings.LIBRARY_PAGINATION_COUNT_CAP
+        self.count_is_approximate = False
+
+    @cached_property
+    def count(self):
+        if self.count_strategy == "estimated":
+            estimate = self.estimate_count()
+            if estimate is not None:
+                self.count_is_approximate = True
+                return estimate
+        if self.count_strategy in ("capped", "estimated"):
+            capped = self.object_list[: self.count_cap + 1]
+            count = capped.count() if isinstance(capped, QuerySet) else len(capped)
+            if count > self.count_cap:
+                self.count_is_approximate = True
+                return self.count_cap
+            return count
+        return super().count
+
+    def validate_number(self, number):
+        self.count  # sets count_is_approximate
+        if not self.count_is_approximate:
+            return super().validate_number(number)
+        try:
+            if isinstance(number, float) and not number.is_integer():
+                raise ValueError
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(self.error_messages["invalid_page"])
+        if number < 1:
+            raise EmptyPage(self.error_messages["min_page"])
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        top = bottom + self.per_page
+        if self.count_is_approximate:
+            rows = list(self.object_list[bottom : top + 1])
+            if not rows and number > 1:
+                raise EmptyPage(self.error_messages["no_results"])
+            return ApproximateCountPage(
+                rows[: self.per_page], number, self, len(rows) > self.per_page
+            )
+        if top + self.orphans >= self.count:
+            top = self.count
+        return self._get_page(self.object_list[bottom:top], number, self)
+
+    def estimate_count(self):
+        queryset = self.object_list
+        if not isinstance(queryset, QuerySet):
+            return None
+        connection = connections[queryset.db]
+        if connection.vendor != "postgresql" or queryset.query.where:
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        # reltuples is -1 until the table has been vacuumed or analyzed
+        if row is None or row[0] < 0:
+            return None
+        return int(row[0])
+
+
+class CountStrategyPagination(PageNumberPagination):
+    """
+    Page number pagination with a configurable count strategy.
+
+    Views choose the strategy with a ``count_strategy`` attribute
+    (``exact``, ``capped`` or ``estimated``); responses carry
+    ``count_is_approximate``.
+    """
+
+    count_strategy = "exact"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count_strategy = getattr(view, "count_strategy", self.count_strategy)
+        return super().paginate_queryset(queryset, request, view)
+
+    def django_paginator_class(self, object_list, per_page):
+        return CountStrategyPaginator(
+            object_list, per_page, count_strategy=self.count_strategy
+        )
+
+    def get_paginated_response(self, data):
+        return Response(
+            OrderedDict(
+                [
+                    ("count", self.page.paginator.count),
+                    ("count_is_approximate", self.page.paginator.count_is_approximate),
+                    ("next", self.get_next_link()),
+                    ("previous", self.get_previous_link()),
+                    ("results", data),
+                ]
+            )
+        )
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema["properties"]["count_is_approximate"] = {
+            "type": "boolean",
+            "example": False,
+        }
+        return response_schema
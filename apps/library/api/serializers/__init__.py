@@ -1,5 +1,6 @@
 from .book_serializers import (
     AuthorSerializer,
+    AuthorStatsSerializer,
     AuthorCreateUpdateSerializer,
     BookSerializer,
     BookDetailSerializer,
@@ -11,6 +12,7 @@ from .loan_serializers import LoanSerializer, BorrowBookSerializer, ReturnBookSe
 
 __all__ = [
     "AuthorSerializer",
+    "AuthorStatsSerializer",
     "AuthorCreateUpdateSerializer",
     "BookSerializer",
     "BookDetailSerializer",
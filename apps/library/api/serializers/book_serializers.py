@@ -1,21 +1,82 @@
+from django.db import transaction
 from rest_framework import serializers
 from apps.library.models import Book, Author
+from apps.library.api.serializers.mixins import (
+    SparseFieldsMixin,
+    ValuesSerializerMixin,
+)
+from apps.library.services.nationality_services import (
+    get_or_create_nationality_id,
+    nationality_names,
+)
 from datetime import date
 
 
-class AuthorSerializer(serializers.ModelSerializer):
+class NationalityField(serializers.Field):
+    """
+    An author's nationality as its name. Read from the nationality id and the
+    cached id -> name map, so the lookup table is never joined. Written as a
+    name: validation only cleans it, and the serializer saving the author
+    turns it into an id (see AuthorCreateUpdateSerializer), so invalid
+    requests never create a nationality.
+    """
+
+    default_error_messages = {
+        "invalid": "Enter a nationality name.",
+        "max_length": "Ensure this field has no more than 200 characters.",
+    }
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("source", "nationality_id")
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        return nationality_names.name(value)
+
+    def to_internal_value(self, data):
+        if not isinstance(data, str) or not data.strip():
+            self.fail("invalid")
+        if len(data.strip()) > 200:
+            self.fail("max_length")
+        return data.strip()
+
+
+class AuthorSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for Author model - read operations."""
 
+    nationality = NationalityField(read_only=True)
     age = serializers.ReadOnlyField()
 
     class Meta:
         model = Author
         fields = ["id", "name", "nationality", "date_of_birth", "date_of_death", "age"]
+        field_sources = {"age": ["date_of_birth", "date_of_death"]}
+
+
+class AuthorStatsSerializer(AuthorSerializer):
+    """
+    Author with book and active loan counts - used by the author endpoints.
+    Age and counts are annotations, see with_age and with_book_counts.
+    """
+
+    age = serializers.IntegerField(source="age_years", read_only=True)
+    book_count = serializers.IntegerField(read_only=True)
+    active_loan_count = serializers.IntegerField(read_only=True)
+
+    class Meta(AuthorSerializer.Meta):
+        fields = AuthorSerializer.Meta.fields + ["book_count", "active_loan_count"]
+        field_sources = {
+            "age": [],
+            "book_count": [],
+            "active_loan_count": [],
+        }
 
 
 class AuthorCreateUpdateSerializer(serializers.ModelSerializer):
     """Serializer for creating and updating authors - admin only."""
 
+    nationality = NationalityField()
+
     class Meta:
         model = Author
         fields = ["id", "name", "nationality", "date_of_birth", "date_of_death"]
@@ -42,14 +103,31 @@ class AuthorCreateUpdateSerializer(serializers.ModelSerializer):
 
         return super().validate(attrs)
 
+    def create(self, validated_data):
+        with transaction.atomic():
+            self.resolve_nationality(validated_data)
+            return super().create(validated_data)
+
+    def update(self, instance, validated_data):
+        with transaction.atomic():
+            self.resolve_nationality(validated_data)
+            return super().update(instance, validated_data)
+
+    def resolve_nationality(self, validated_data):
+        """Replace the validated nationality name with its id, created if new."""
+        if "nationality_id" in validated_data:
+            validated_data["nationality_id"] = get_or_create_nationality_id(
+                validated_data["nationality_id"]
+            )
 
-class BookSerializer(serializers.ModelSerializer):
+
+class BookSerializer(
+    ValuesSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer
+):
     """
     Serializer for Book model - used for listing books.
     """
 
-    author_name = serializers.CharField(source="author.name", read_only=True)
-
     class Meta:
         model = Book
         fields = [
@@ -62,7 +140,7 @@ class BookSerializer(serializers.ModelSerializer):
         ]
 
 
-class BookDetailSerializer(serializers.ModelSerializer):
+class BookDetailSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Detailed serializer for Book model - used for single book view.
     """
@@ -78,6 +156,7 @@ class BookDetailSerializer(serializers.ModelSerializer):
             "author",
             "description",
             "isbn",
+            "isbn13",
             "publish_date",
             "page_count",
             "language",
@@ -85,10 +164,13 @@ class BookDetailSerializer(serializers.ModelSerializer):
             "created",
             "modified",
         ]
+        field_sources = {
+            "current_borrower": ["current_loan__created", "current_loan__user__username"]
+        }
 
     def get_current_borrower(self, obj):
         """Get current borrower if book is borrowed."""
-        active_loan = obj.loans.filter(returned_at__isnull=True).first()
+        active_loan = obj.current_loan
         if active_loan:
             return {
                 "user_id": active_loan.user.id,
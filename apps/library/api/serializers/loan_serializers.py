@@ -1,15 +1,21 @@
 from rest_framework import serializers
 from django.utils import timezone
 from apps.library.models import Loan, Book
+from apps.library.api.serializers.mixins import (
+    SparseFieldsMixin,
+    ValuesSerializerMixin,
+)
 
 
-class LoanSerializer(serializers.ModelSerializer):
+class LoanSerializer(
+    ValuesSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer
+):
     """
     Serializer for Loan model - used for displaying loan information.
     """
 
     book_title = serializers.CharField(source="book.title", read_only=True)
-    book_author = serializers.CharField(source="book.author.name", read_only=True)
+    book_author = serializers.CharField(source="book.author_name", read_only=True)
     borrower_name = serializers.CharField(source="user.get_full_name", read_only=True)
     borrower_email = serializers.CharField(source="user.email", read_only=True)
     borrowed_date = serializers.DateTimeField(source="created", read_only=True)
@@ -27,11 +33,22 @@ class LoanSerializer(serializers.ModelSerializer):
             "returned_at",
             "is_active",
         ]
+        field_sources = {
+            "borrower_name": ["user__first_name", "user__last_name", "user__username"],
+            "is_active": ["returned_at"],
+        }
 
     def get_is_active(self, obj):
         """Check if loan is currently active."""
         return not obj.is_returned()
 
+    def values_borrower_name(self, first_name, last_name, username):
+        # same as CustomUser.get_full_name
+        return f"{first_name} {last_name}".strip() or username
+
+    def values_is_active(self, returned_at):
+        return returned_at is None
+
 
 class BorrowBookSerializer(serializers.Serializer):
     """
@@ -48,8 +65,7 @@ class BorrowBookSerializer(serializers.Serializer):
             raise serializers.ValidationError("Book with this ID does not exist.")
 
         # check if book is already borrowed
-        active_loan = book.loans.filter(returned_at__isnull=True).first()
-        if active_loan:
+        if book.current_loan_id is not None:
             raise serializers.ValidationError(
                 "This book is currently borrowed by another user."
             )
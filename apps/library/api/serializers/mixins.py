@@ -0,0 +1,182 @@
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import QuerySet
+from django.db.models.constants import LOOKUP_SEP
+
+FIELDS_QUERY_PARAM = "fields"
+
+
+def requested_fields(request):
+    """Field names asked for with ``?fields=a,b``, or ``None`` for all fields."""
+    if request is None:
+        return None
+    value = request.query_params.get(FIELDS_QUERY_PARAM)
+    if not value:
+        return None
+    return {name.strip() for name in value.split(",") if name.strip()}
+
+
+def project_queryset(queryset, paths):
+    """
+    Load only the columns behind ``paths`` (``QuerySet.only()`` lookups) and
+    join only the relations those paths traverse.
+    """
+    relations = set()
+    for path in paths:
+        model = queryset.model
+        parts = path.split(LOOKUP_SEP)
+        for position, part in enumerate(parts):
+            field = model._meta.get_field(part)
+            # a foreign key's attname (author_id) is its own column
+            if not field.is_relation or part == field.attname:
+                break
+            relations.add(LOOKUP_SEP.join(parts[: position + 1]))
+            model = field.related_model
+    queryset = queryset.select_related(None)
+    if relations:
+        queryset = queryset.select_related(*relations)
+    return queryset.only(*paths)
+
+
+class SparseFieldsMixin:
+    """
+    Serializer mixin for sparse fieldsets.
+
+    Only the fields named in the request's ``?fields=`` parameter are rendered
+    (unknown names are ignored), and ``queryset_fields`` lists the model
+    columns they read so views can project their queryset with
+    ``project_queryset``. Fields whose value does not come from a column of
+    the same source (method fields, properties) declare their columns in
+    ``Meta.field_sources``.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields = requested_fields(self.context.get("request"))
+        if fields:
+            for name in set(self.fields) - fields:
+                self.fields.pop(name)
+
+    @classmethod
+    def queryset_fields(cls, fields=None):
+        """Model field paths read when rendering ``fields`` (default: all)."""
+        field_sources = getattr(cls.Meta, "field_sources", {})
+        paths = []
+        for name, field in cls().fields.items():
+            if field.write_only or (fields and name not in fields):
+                continue
+            source = field.source.replace(".", LOOKUP_SEP)
+            if name in field_sources:
+                paths.extend(field_sources[name])
+            elif hasattr(field, "queryset_fields"):
+                # nested serializer: the related columns it renders
+                paths.extend(
+                    f"{source}{LOOKUP_SEP}{path}" for path in field.queryset_fields()
+                )
+            else:
+                paths.append(source)
+        return paths
+
+
+class ValuesSerializerMixin:
+    """
+    Read-only fast path rendering rows of ``QuerySet.values()`` with the same
+    output as ``to_representation`` on model instances.
+
+    Plain and dotted sources are read from the row and passed through the
+    field's ``to_representation``. A dotted source crossing a nullable
+    relation is left out when its row value is null, as instances skip it. Fields listed in ``Meta.field_sources`` are
+    built by a ``values_<field>`` method called with those columns. Any other
+    field (nested serializers, properties, method fields without a builder)
+    makes the serializer fall back to model instances.
+    """
+
+    def get_values_plan(self):
+        """
+        ``(name, field, paths, build, optional)`` per field, or ``None`` if
+        unsupported. ``optional`` fields are left out when their value is null.
+        """
+        field_sources = getattr(self.Meta, "field_sources", {})
+        plan = []
+        for name, field in self.fields.items():
+            if field.write_only:
+                continue
+            if name in field_sources:
+                build = getattr(self, f"values_{name}", None)
+                if build is None:
+                    return None
+                plan.append((name, field, field_sources[name], build, False))
+                continue
+            if field.source == "*" or hasattr(field, "fields"):
+                return None
+            path = field.source.replace(".", LOOKUP_SEP)
+            resolved = self._resolve_values_path(path)
+            if resolved is None:
+                return None
+            _, optional = resolved
+            plan.append((name, field, [path], None, optional))
+        return plan
+
+    def _resolve_values_path(self, path):
+        """
+        ``(model_field, optional)`` for a column path, ``optional`` when it
+        crosses a nullable relation, or ``None`` if ``.values()`` cannot
+        render it.
+        """
+        model = self.Meta.model
+        parts = path.split(LOOKUP_SEP)
+        optional = False
+        try:
+            for part in parts[:-1]:
+                relation = model._meta.get_field(part)
+                model = relation.related_model
+                if model is None:
+                    return None
+                optional = optional or relation.null
+            model_field = model._meta.get_field(parts[-1])
+        except FieldDoesNotExist:
+            return None
+        # instances skip a dotted field whose relation is missing; a null
+        # column is only told apart from that when the column is not nullable
+        if model_field.is_relation or (optional and model_field.null):
+            return None
+        return model_field, optional
+
+    def get_values_paths(self, plan):
+        paths = []
+        for _, _, field_paths, _, _ in plan:
+            paths.extend(path for path in field_paths if path not in paths)
+        return paths
+
+    def render_values(self, rows, plan):
+        data = []
+        for row in rows:
+            item = {}
+            for name, field, paths, build, optional in plan:
+                if build is not None:
+                    item[name] = build(*[row[path] for path in paths])
+                    continue
+                value = row[paths[0]]
+                if value is None:
+                    if optional:
+                        continue
+                    item[name] = None
+                else:
+                    item[name] = field.to_representation(value)
+            data.append(item)
+        return data
+
+
+def serialize_many(serializer, rows):
+    """
+    Render ``rows`` with ``serializer`` (an unbound instance), through
+    ``.values()`` when ``rows`` is a queryset and the serializer supports it.
+    """
+    plan = None
+    if settings.LIBRARY_VALUES_SERIALIZATION and isinstance(rows, QuerySet):
+        plan = getattr(serializer, "get_values_plan", lambda: None)()
+    if plan is None:
+        return type(serializer)(rows, many=True, context=serializer.context).data
+    return serializer.render_values(
+        rows.values(*serializer.get_values_paths(plan)), plan
+    )
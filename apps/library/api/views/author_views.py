@@ -1,13 +1,32 @@
 from rest_framework import viewsets, permissions
+from rest_framework.decorators import action
 from rest_framework.response import Response
+from django_filters.rest_framework import DjangoFilterBackend
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from rest_framework import status
+from django.conf import settings
+from datetime import date
 
-from apps.library.models import Author
+from apps.library.models import Author, Book
+from apps.library.api.cache import canonical_query_string, get_catalog_version
+from apps.library.api.conditional import (
+    collection_etag,
+    conditional_response,
+    make_etag,
+)
+from apps.library.api.filters import AuthorFilter, AuthorOrderingFilter
+from apps.library.api.pagination import BookKeysetPagination, CountStrategyPagination
+from apps.library.api.serializers.mixins import project_queryset, requested_fields
 from apps.library.api.serializers import (
-    AuthorSerializer,
+    AuthorStatsSerializer,
     AuthorCreateUpdateSerializer,
+    BookSerializer,
+)
+from apps.library.services.author_services import (
+    BOOK_COUNT_ANNOTATIONS,
+    with_age,
+    with_book_counts,
 )
 
 
@@ -20,37 +39,153 @@ class AuthorViewSet(viewsets.ModelViewSet):
 
     queryset = Author.objects.all()
     permission_classes = [permissions.IsAdminUser]
+    filter_backends = [DjangoFilterBackend, AuthorOrderingFilter]
+    filterset_class = AuthorFilter
+    ordering_fields = [
+        "name",
+        "date_of_birth",
+        "age",
+        "book_count",
+        "active_loan_count",
+    ]
+    ordering = ["id"]
+    pagination_class = CountStrategyPagination
+    count_strategy = "estimated"
 
     def get_serializer_class(self):
         """Return appropriate serializer based on action."""
         if self.action in ["create", "update", "partial_update"]:
             return AuthorCreateUpdateSerializer
-        return AuthorSerializer
+        elif self.action == "books":
+            return BookSerializer
+        return AuthorStatsSerializer
+
+    def get_queryset(self):
+        """
+        For reads, load only the rendered columns and annotate only the age
+        and book counts that are rendered or ordered by.
+        """
+        queryset = super().get_queryset()
+        if self.action not in ("list", "retrieve"):
+            return queryset
+        fields = requested_fields(self.request)
+        queryset = project_queryset(
+            queryset, AuthorStatsSerializer.queryset_fields(fields)
+        )
+        ordering = {
+            term.strip().lstrip("-")
+            for term in self.request.query_params.get("ordering", "").split(",")
+        }
+
+        def needed(name):
+            return fields is None or name in fields or name in ordering
+
+        if needed("age"):
+            queryset = with_age(queryset)
+        return with_book_counts(
+            queryset, [name for name in BOOK_COUNT_ANNOTATIONS if needed(name)]
+        )
 
     @swagger_auto_schema(
         operation_summary="List all authors",
         operation_description="List all authors (staff only)",
+        manual_parameters=[
+            openapi.Parameter(
+                "fields",
+                openapi.IN_QUERY,
+                description="Comma-separated subset of fields to return",
+                type=openapi.TYPE_STRING,
+            ),
+            openapi.Parameter(
+                "name",
+                openapi.IN_QUERY,
+                description="Filter by author name (case-insensitive contains)",
+                type=openapi.TYPE_STRING,
+            ),
+            openapi.Parameter(
+                "nationality",
+                openapi.IN_QUERY,
+                description="Filter by nationality (exact match)",
+                type=openapi.TYPE_STRING,
+            ),
+            openapi.Parameter(
+                "is_alive",
+                openapi.IN_QUERY,
+                description="Filter by whether the author is alive",
+                type=openapi.TYPE_BOOLEAN,
+            ),
+            openapi.Parameter(
+                "age_min",
+                openapi.IN_QUERY,
+                description="Filter authors at least this old (age at death for the dead)",
+                type=openapi.TYPE_INTEGER,
+            ),
+            openapi.Parameter(
+                "age_max",
+                openapi.IN_QUERY,
+                description="Filter authors at most this old (age at death for the dead)",
+                type=openapi.TYPE_INTEGER,
+            ),
+            openapi.Parameter(
+                "ordering",
+                openapi.IN_QUERY,
+                description="Order by name, date_of_birth, age, book_count or active_loan_count. Prefix with '-' for descending.",
+                type=openapi.TYPE_STRING,
+            ),
+        ],
         tags=["Authors - Admin"],
         responses={
-            200: AuthorSerializer(many=True),
+            200: AuthorStatsSerializer(many=True),
             401: openapi.Response(description="Unauthorized"),
             403: openapi.Response(description="Forbidden - Staff access required"),
         },
     )
     def list(self, request, *args, **kwargs):
         try:
-            return super().list(request, *args, **kwargs)
+            handler = super().list
+            return conditional_response(
+                request,
+                lambda: handler(request, *args, **kwargs),
+                lambda: (collection_etag(self, request), None),
+            )
         except Exception as e:
             return Response(
                 f"List failed: {str(e)}", status=status.HTTP_400_BAD_REQUEST
             )
 
+    def get_object_validators(self, request, pk):
+        """ETag and Last-Modified of an author detail from one indexed lookup."""
+        modified = (
+            Author.objects.filter(pk=pk).values_list("modified", flat=True).first()
+        )
+        if modified is None:
+            return None
+        # age in the representation depends on the current date, and the book
+        # counts on the catalog version
+        etag = make_etag(
+            "author",
+            pk,
+            modified.isoformat(),
+            date.today(),
+            get_catalog_version(),
+            canonical_query_string(request.query_params),
+        )
+        return etag, modified
+
     @swagger_auto_schema(
         operation_summary="Get author details",
         operation_description="Get author details (staff only)",
+        manual_parameters=[
+            openapi.Parameter(
+                "fields",
+                openapi.IN_QUERY,
+                description="Comma-separated subset of fields to return",
+                type=openapi.TYPE_STRING,
+            ),
+        ],
         tags=["Authors - Admin"],
         responses={
-            200: AuthorSerializer(),
+            200: AuthorStatsSerializer(),
             401: openapi.Response(description="Unauthorized"),
             403: openapi.Response(description="Forbidden - Staff access required"),
             404: openapi.Response(description="Author not found"),
@@ -58,7 +193,12 @@ class AuthorViewSet(viewsets.ModelViewSet):
     )
     def retrieve(self, request, *args, **kwargs):
         try:
-            return super().retrieve(request, *args, **kwargs)
+            handler = super().retrieve
+            return conditional_response(
+                request,
+                lambda: handler(request, *args, **kwargs),
+                lambda: self.get_object_validators(request, kwargs["pk"]),
+            )
         except Exception as e:
             return Response(
                 f"Retrieve failed: {str(e)}",
@@ -71,7 +211,7 @@ class AuthorViewSet(viewsets.ModelViewSet):
         tags=["Authors - Admin"],
         request_body=AuthorCreateUpdateSerializer,
         responses={
-            201: AuthorSerializer(),
+            201: AuthorStatsSerializer(),
             400: openapi.Response(description="Bad Request - Validation errors"),
             401: openapi.Response(description="Unauthorized"),
             403: openapi.Response(description="Forbidden - Staff access required"),
@@ -92,7 +232,7 @@ class AuthorViewSet(viewsets.ModelViewSet):
         tags=["Authors - Admin"],
         request_body=AuthorCreateUpdateSerializer,
         responses={
-            200: AuthorSerializer(),
+            200: AuthorStatsSerializer(),
             400: openapi.Response(description="Bad Request - Validation errors"),
             401: openapi.Response(description="Unauthorized"),
             403: openapi.Response(description="Forbidden - Staff access required"),
@@ -114,7 +254,7 @@ class AuthorViewSet(viewsets.ModelViewSet):
         tags=["Authors - Admin"],
         request_body=AuthorCreateUpdateSerializer,
         responses={
-            200: AuthorSerializer(),
+            200: AuthorStatsSerializer(),
             400: openapi.Response(description="Bad Request - Validation errors"),
             401: openapi.Response(description="Unauthorized"),
             403: openapi.Response(description="Forbidden - Staff access required"),
@@ -149,3 +289,68 @@ class AuthorViewSet(viewsets.ModelViewSet):
                 f"Delete failed: {str(e)}",
                 status=status.HTTP_400_BAD_REQUEST,
             )
+
+    @action(detail=True, methods=["get"])
+    @swagger_auto_schema(
+        operation_summary="List an author's books",
+        operation_description="Books by this author, newest first, with cursor pagination (staff only)",
+        manual_parameters=[
+            openapi.Parameter(
+                "fields",
+                openapi.IN_QUERY,
+                description="Comma-separated subset of fields to return",
+                type=openapi.TYPE_STRING,
+            ),
+            openapi.Parameter(
+                "cursor",
+                openapi.IN_QUERY,
+                description="Cursor from a previous page's next or previous link",
+                type=openapi.TYPE_STRING,
+            ),
+        ],
+        tags=["Authors - Admin"],
+        responses={
+            200: BookSerializer(many=True),
+            401: openapi.Response(description="Unauthorized"),
+            403: openapi.Response(description="Forbidden - Staff access required"),
+            404: openapi.Response(description="Author not found"),
+        },
+    )
+    def books(self, request, pk=None):
+        """Get a page of the author's books, read from the (author, -publish_date, id) index."""
+        try:
+            paginator = BookKeysetPagination()
+            serializer = self.get_serializer()
+            queryset = Book.objects.filter(author_id=pk)
+            plan = None
+            if settings.LIBRARY_VALUES_SERIALIZATION:
+                plan = serializer.get_values_plan()
+            if plan is None:
+                paths = BookSerializer.queryset_fields(requested_fields(request))
+                queryset = project_queryset(
+                    queryset, paths + paginator.position_fields
+                )
+            else:
+                paths = serializer.get_values_paths(plan)
+                queryset = queryset.values(
+                    *paths,
+                    *[path for path in paginator.position_fields if path not in paths],
+                )
+
+            page = paginator.paginate_queryset(queryset, request, view=self)
+            # an empty first page is the only case telling apart a missing author
+            if not page and not Author.objects.filter(pk=pk).exists():
+                return Response(
+                    {"detail": "No author with this id."},
+                    status=status.HTTP_404_NOT_FOUND,
+                )
+            if plan is None:
+                data = self.get_serializer(page, many=True).data
+            else:
+                data = serializer.render_values(page, plan)
+            return paginator.get_paginated_response(data)
+        except Exception as e:
+            return Response(
+                f"Books failed: {str(e)}",
+                status=status.HTTP_400_BAD_REQUEST,
+            )
@@ -1,10 +1,13 @@
 from rest_framework import viewsets, permissions, status
 from rest_framework.response import Response
 from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
 from django_filters.rest_framework import DjangoFilterBackend
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
-from django.db import models
+from django.conf import settings
+from django.core.cache import cache
+import codecs
 
 from apps.library.models import Book
 from apps.library.api.serializers import (
@@ -13,8 +16,46 @@ from apps.library.api.serializers import (
     BookCreateSerializer,
     BookUpdateSerializer,
 )
+from apps.library.api.serializers.mixins import (
+    project_queryset,
+    requested_fields,
+    serialize_many,
+)
 from apps.library.api.permissions import IsAdminOrReadOnly
-from apps.library.api.filters import BookFilter
+from apps.library.api.conditional import (
+    collection_etag,
+    conditional_response,
+    make_etag,
+)
+from apps.library.api.filters import BookFilter, BookOrderingFilter
+from apps.library.api.pagination import (
+    BookKeysetPagination,
+    CountStrategyPagination,
+)
+from apps.library.api.catalog_snapshot import catalog_snapshot
+from apps.library.api.cache import (
+    bump_catalog_version,
+    cached_anonymous_response,
+    canonical_query_string,
+    get_catalog_version,
+    make_cache_key,
+)
+from apps.library.services.book_import_services import (
+    BINARY_FORMATS,
+    IMPORT_FORMATS,
+    READERS,
+    BookImport,
+    ImportFormatError,
+    guess_format,
+)
+from apps.library.services.facet_services import book_facets
+from apps.library.services.isbn_services import to_isbn13
+from apps.library.services.loan_services import TRENDING_WINDOWS, trending_books
+from apps.library.services.suggest_services import suggestion_index
+
+
+# actions rendering books, whose querysets are projected to the serializer
+READ_ACTIONS = ["list", "retrieve", "popular", "by_isbn", "similar", "also_borrowed"]
 
 
 class BookViewSet(viewsets.ModelViewSet):
@@ -26,15 +67,36 @@ class BookViewSet(viewsets.ModelViewSet):
     - Staff users: Full CRUD operations
     """
 
-    queryset = Book.objects.select_related("author").all()
-    filter_backends = [DjangoFilterBackend]
+    # author columns are joined only by the serializers that render them
+    queryset = Book.objects.all()
+    filter_backends = [DjangoFilterBackend, BookOrderingFilter]
     filterset_class = BookFilter
+    ordering_fields = ["title", "author_name", "publish_date", "page_count", "rank"]
+    pagination_class = CountStrategyPagination
+    count_strategy = "capped"
+    cursor_pagination_class = BookKeysetPagination
+
+    @property
+    def paginator(self):
+        """
+        Use keyset pagination for ``?pagination=cursor`` (and the cursor links
+        it returns), page numbers otherwise.
+        """
+        if not hasattr(self, "_paginator"):
+            params = self.request.query_params
+            if params.get("pagination") == "cursor" or "cursor" in params:
+                self._paginator = self.cursor_pagination_class()
+            elif self.pagination_class is None:
+                self._paginator = None
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
 
     def get_permissions(self):
         """
         Instantiate and return the list of permissions that this view requires.
         """
-        if self.action in ["create", "update", "partial_update", "destroy"]:
+        if self.action in ["create", "update", "partial_update", "destroy", "bulk"]:
             # staff only
             permission_classes = [permissions.IsAdminUser]
         else:
@@ -48,27 +110,68 @@ class BookViewSet(viewsets.ModelViewSet):
             return BookCreateSerializer
         elif self.action in ["update", "partial_update"]:
             return BookUpdateSerializer
-        elif self.action == "retrieve":
+        elif self.action in ["retrieve", "by_isbn"]:
             return BookDetailSerializer
         return BookSerializer
 
+    def get_queryset(self):
+        """
+        For reads, load only the columns the (``?fields=`` trimmed) serializer
+        renders, plus those pagination and the detail ETag need.
+        """
+        queryset = super().get_queryset()
+        if self.action not in READ_ACTIONS:
+            return queryset
+        paths = self.get_serializer_class().queryset_fields(
+            requested_fields(self.request)
+        )
+        if self.action == "retrieve":
+            # get_object_validators
+            paths += ["modified", "author__modified"]
+        elif self.action == "list":
+            paths += getattr(self.paginator, "position_fields", [])
+        return project_queryset(queryset, paths)
+
+    def get_object(self):
+        # kept for get_object_validators, saving it a query
+        self.object = super().get_object()
+        return self.object
+
     @swagger_auto_schema(
         operation_summary="List all books",
         operation_description="Get a paginated list of all books with filtering options. Anonymous users can browse books.",
         tags=["Books"],
         manual_parameters=[
+            openapi.Parameter(
+                "fields",
+                openapi.IN_QUERY,
+                description="Comma-separated subset of fields to return",
+                type=openapi.TYPE_STRING,
+            ),
             openapi.Parameter(
                 "title",
                 openapi.IN_QUERY,
                 description="Filter by book title (case-insensitive contains)",
                 type=openapi.TYPE_STRING,
             ),
+            openapi.Parameter(
+                "title_fuzzy",
+                openapi.IN_QUERY,
+                description="Typo-tolerant title match, ordered by similarity",
+                type=openapi.TYPE_STRING,
+            ),
             openapi.Parameter(
                 "author_name",
                 openapi.IN_QUERY,
                 description="Filter by author name (case-insensitive contains)",
                 type=openapi.TYPE_STRING,
             ),
+            openapi.Parameter(
+                "author_name_fuzzy",
+                openapi.IN_QUERY,
+                description="Typo-tolerant author name match, ordered by similarity",
+                type=openapi.TYPE_STRING,
+            ),
             openapi.Parameter(
                 "language",
                 openapi.IN_QUERY,
@@ -88,21 +191,104 @@ class BookViewSet(viewsets.ModelViewSet):
                 description="Search in title, author name, and description",
                 type=openapi.TYPE_STRING,
             ),
+            openapi.Parameter(
+                "pagination",
+                openapi.IN_QUERY,
+                description="Set to 'cursor' for keyset pagination ordered by (-publish_date, id); ignores ordering",
+                type=openapi.TYPE_STRING,
+                enum=["cursor"],
+            ),
+            openapi.Parameter(
+                "ordering",
+                openapi.IN_QUERY,
+                description="Order by title, author_name, publish_date, page_count or rank (relevance, with search). Prefix with '-' for descending.",
+                type=openapi.TYPE_STRING,
+            ),
         ],
         responses={200: BookSerializer(many=True)},
     )
     def list(self, request, *args, **kwargs):
         """List all books with filtering."""
         try:
-            return super().list(request, *args, **kwargs)
+            if settings.LIBRARY_VALUES_SERIALIZATION:
+                handler = self.list_values
+            else:
+                handler = super().list
+            return conditional_response(
+                request,
+                lambda: cached_anonymous_response(
+                    self, request, handler, *args, **kwargs
+                ),
+                lambda: (collection_etag(self, request), None),
+            )
         except Exception as e:
             return Response(
                 f"List failed: {str(e)}", status=status.HTTP_400_BAD_REQUEST
             )
 
+    def list_values(self, request, *args, **kwargs):
+        """
+        ``list`` rendered from ``.values()`` rows (see ValuesSerializerMixin),
+        falling back to model instances when the serializer needs them. With
+        LIBRARY_CATALOG_SNAPSHOT the rows come from the in-process catalog
+        snapshot when it can answer the query.
+        """
+        serializer = self.get_serializer()
+        plan = serializer.get_values_plan()
+        if plan is None:
+            return super().list(request, *args, **kwargs)
+
+        paths = serializer.get_values_paths(plan)
+        for path in getattr(self.paginator, "position_fields", []):
+            if path not in paths:
+                paths.append(path)
+        queryset = None
+        if settings.LIBRARY_CATALOG_SNAPSHOT and catalog_snapshot.supports(paths):
+            queryset = catalog_snapshot.filter_books(request.query_params)
+        if queryset is None:
+            queryset = self.filter_queryset(self.get_queryset()).values(*paths)
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            return Response(serializer.render_values(queryset, plan))
+        return self.get_paginated_response(serializer.render_values(page, plan))
+
+    def get_object_validators(self, request, pk):
+        """
+        ETag and Last-Modified of a book detail, from the object already loaded
+        for the response or else from one indexed lookup.
+        """
+        book = getattr(self, "object", None)
+        if book is not None:
+            versions = book.modified, book.author.modified if book.author else None
+        else:
+            versions = (
+                Book.objects.filter(pk=pk)
+                .values_list("modified", "author__modified")
+                .first()
+            )
+        if versions is None:
+            return None
+        modified, author_modified = versions
+        etag = make_etag(
+            "book",
+            pk,
+            modified.isoformat(),
+            author_modified.isoformat() if author_modified else "",
+            canonical_query_string(request.query_params),
+        )
+        return etag, max(filter(None, versions))
+
     @swagger_auto_schema(
         operation_summary="Get book details",
         operation_description="Retrieve detailed information about a specific book. Anonymous users can view book details.",
+        manual_parameters=[
+            openapi.Parameter(
+                "fields",
+                openapi.IN_QUERY,
+                description="Comma-separated subset of fields to return",
+                type=openapi.TYPE_STRING,
+            ),
+        ],
         tags=["Books"],
         responses={
             200: BookDetailSerializer(),
@@ -112,7 +298,14 @@ class BookViewSet(viewsets.ModelViewSet):
     def retrieve(self, request, *args, **kwargs):
         """Get book details."""
         try:
-            return super().retrieve(request, *args, **kwargs)
+            handler = super().retrieve
+            return conditional_response(
+                request,
+                lambda: cached_anonymous_response(
+                    self, request, handler, *args, **kwargs
+                ),
+                lambda: self.get_object_validators(request, kwargs["pk"]),
+            )
         except Exception as e:
             return Response(
                 f"Retrieve failed: {str(e)}", status=status.HTTP_400_BAD_REQUEST
@@ -221,29 +414,324 @@ class BookViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=["get"], permission_classes=[permissions.AllowAny])
     @swagger_auto_schema(
         operation_summary="List popular books",
-        operation_description="Get a list of books ordered by popularity (most borrowed).",
+        operation_description="Get a list of books ordered by popularity (most borrowed), all-time or within a recent window.",
         tags=["Books"],
+        manual_parameters=[
+            openapi.Parameter(
+                "fields",
+                openapi.IN_QUERY,
+                description="Comma-separated subset of fields to return",
+                type=openapi.TYPE_STRING,
+            ),
+            openapi.Parameter(
+                "window",
+                openapi.IN_QUERY,
+                description="Only count borrows from the last 7, 30 or 365 days",
+                type=openapi.TYPE_STRING,
+                enum=["7d", "30d", "365d"],
+            ),
+        ],
         responses={200: BookSerializer(many=True)},
     )
     def popular(self, request):
         """Get most borrowed books."""
-        try:
-            popular_books = (
-                Book.objects.select_related("author")
-                .annotate(loan_count=models.Count("loans"))
-                .filter(loan_count__gt=0)
-                .order_by("-loan_count")[:10]
+        window = request.query_params.get("window")
+        if window and window not in TRENDING_WINDOWS:
+            return Response(
+                {"window": [f"Must be one of: {', '.join(TRENDING_WINDOWS)}."]},
+                status=status.HTTP_400_BAD_REQUEST,
             )
 
+        try:
+            popular_books = self.get_queryset()
+
             # apply the same filterset to popular books
             filterset = self.filterset_class(request.GET, queryset=popular_books)
+            filtered = False
             if filterset.is_valid():
                 popular_books = filterset.qs
+                filtered = any(
+                    value not in (None, "")
+                    for value in filterset.form.cleaned_data.values()
+                )
 
-            serializer = self.get_serializer(popular_books, many=True)
-            return Response(serializer.data)
+            if window:
+                # served from the daily rollups rather than the loans table
+                popular_books = trending_books(
+                    popular_books, TRENDING_WINDOWS[window], restrict=filtered
+                )
+            else:
+                # top-k scan of the loan_count index
+                popular_books = popular_books.filter(loan_count__gt=0).order_by(
+                    "-loan_count", "id"
+                )[:10]
+            return Response(serialize_many(self.get_serializer(), popular_books))
         except Exception as e:
             return Response(
                 f"Popular books failed: {str(e)}",
                 status=status.HTTP_400_BAD_REQUEST,
             )
+
+    @action(detail=False, methods=["get"], permission_classes=[permissions.AllowAny])
+    @swagger_auto_schema(
+        operation_summary="Suggest titles and authors",
+        operation_description="Typeahead completions for book titles and author names, served from an in-memory prefix index.",
+        tags=["Books"],
+        manual_parameters=[
+            openapi.Parameter(
+                "q",
+                openapi.IN_QUERY,
+                description="Prefix typed so far",
+                type=openapi.TYPE_STRING,
+                required=True,
+            ),
+            openapi.Parameter(
+                "limit",
+                openapi.IN_QUERY,
+                description="Maximum number of completions per kind (default 5)",
+                type=openapi.TYPE_INTEGER,
+            ),
+        ],
+    )
+    def suggest(self, request):
+        """Get title and author completions for a prefix."""
+        try:
+            limit = int(request.query_params.get("limit", 5))
+        except ValueError:
+            return Response(
+                {"limit": ["A valid integer is required."]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        limit = max(1, min(limit, settings.LIBRARY_SUGGEST_MAX_LIMIT))
+        query = request.query_params.get("q", "")
+        return Response(suggestion_index.suggest(query, limit))
+
+    @action(detail=False, methods=["get"], permission_classes=[permissions.AllowAny])
+    @swagger_auto_schema(
+        operation_summary="Book facet counts",
+        operation_description="Counts per language, availability, publish-year bucket and author nationality for the books matching the given filters. Accepts the same filters as the book list.",
+        tags=["Books"],
+        manual_parameters=[
+            openapi.Parameter(
+                "year_bucket",
+                openapi.IN_QUERY,
+                description="Width of the publish-year buckets in years (default 10)",
+                type=openapi.TYPE_INTEGER,
+            ),
+        ],
+    )
+    def facets(self, request):
+        """Get facet counts for the filtered catalog."""
+        try:
+            year_bucket = int(request.query_params.get("year_bucket", 10))
+        except ValueError:
+            year_bucket = 0
+        if not 1 <= year_bucket <= 100:
+            return Response(
+                {"year_bucket": ["Must be an integer between 1 and 100."]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        filterset = self.filterset_class(request.GET, queryset=Book.objects.all())
+        if not filterset.is_valid():
+            return Response(filterset.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        key = make_cache_key(
+            "facets",
+            get_catalog_version(),
+            year_bucket,
+            canonical_query_string(request.query_params, filterset.filters),
+        )
+        data = cache.get(key)
+        if data is None:
+            data = book_facets(filterset.qs, year_bucket=year_bucket)
+            cache.set(key, data, settings.LIBRARY_FACETS_CACHE_TIMEOUT)
+        return Response(data)
+
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path=r"by-isbn/(?P<isbn>[0-9Xx-]+)",
+        permission_classes=[permissions.AllowAny],
+    )
+    @swagger_auto_schema(
+        operation_summary="Get a book by ISBN",
+        operation_description="Look up a book by its ISBN-10 or ISBN-13 (hyphens allowed), through the unique isbn13 index.",
+        tags=["Books"],
+        responses={
+            200: BookDetailSerializer(),
+            400: openapi.Response(description="Not a valid ISBN"),
+            404: openapi.Response(description="Book not found"),
+        },
+    )
+    def by_isbn(self, request, isbn=None):
+        """Get book details by ISBN."""
+        isbn13 = to_isbn13(isbn)
+        if isbn13 is None:
+            return Response(
+                {"isbn": ["Must be an ISBN-10 or ISBN-13."]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            book = self.get_queryset().get(isbn13=isbn13)
+        except Book.DoesNotExist:
+            return Response(
+                {"detail": "No book with this ISBN."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        return Response(self.get_serializer(book).data)
+
+    @action(detail=True, methods=["get"], permission_classes=[permissions.AllowAny])
+    @swagger_auto_schema(
+        operation_summary="List similar books",
+        operation_description="Books with the most similar title and description (TF-IDF cosine similarity), most similar first. Precomputed by the build_book_similarity command.",
+        tags=["Books"],
+        responses={200: BookSerializer(many=True)},
+    )
+    def similar(self, request, pk=None):
+        """Get books similar to this one."""
+        try:
+            # one read of the (book, -score) index joined to the books
+            similar_books = (
+                self.get_queryset()
+                .filter(similar_to__book_id=pk)
+                .order_by("-similar_to__score")
+            )
+            return Response(serialize_many(self.get_serializer(), similar_books))
+        except Exception as e:
+            return Response(
+                f"Similar books failed: {str(e)}",
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+    @action(
+        detail=True,
+        methods=["get"],
+        url_path="also-borrowed",
+        permission_classes=[permissions.AllowAny],
+    )
+    @swagger_auto_schema(
+        operation_summary="List books also borrowed",
+        operation_description="Books most often borrowed by the patrons who borrowed this one. Updated by the build_also_borrowed command.",
+        tags=["Books"],
+        manual_parameters=[
+            openapi.Parameter(
+                "limit",
+                openapi.IN_QUERY,
+                description="Maximum number of books (default 10, at most 50)",
+                type=openapi.TYPE_INTEGER,
+            ),
+        ],
+        responses={200: BookSerializer(many=True)},
+    )
+    def also_borrowed(self, request, pk=None):
+        """Get books borrowed by the same patrons."""
+        try:
+            limit = int(request.query_params.get("limit", 10))
+        except ValueError:
+            return Response(
+                {"limit": ["A valid integer is required."]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        limit = max(1, min(limit, 50))
+
+        try:
+            # top-N read of the (book, -count) index joined to the books
+            books = (
+                self.get_queryset()
+                .filter(co_borrowed_with__book_id=pk)
+                .order_by("-co_borrowed_with__count", "id")[:limit]
+            )
+            return Response(serialize_many(self.get_serializer(), books))
+        except Exception as e:
+            return Response(
+                f"Also borrowed failed: {str(e)}",
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+    @action(
+        detail=False,
+        methods=["post"],
+        parser_classes=[MultiPartParser],
+        permission_classes=[permissions.IsAdminUser],
+    )
+    @swagger_auto_schema(
+        operation_summary="Bulk import books",
+        operation_description=(
+            "Import books from an uploaded CSV, JSON Lines, MARC21 or MARCXML file "
+            "(staff only). Columns: title, author_id or author (exact name of an "
+            "existing author), description, isbn, publish_date, page_count, "
+            "language and optionally is_available; MARC records are mapped onto "
+            "them. Valid rows are inserted in batches; rejected rows are listed "
+            "with their line (MARC: record) number. For very large files use the "
+            "import_books management command."
+        ),
+        tags=["Books - Admin"],
+        manual_parameters=[
+            openapi.Parameter(
+                "file",
+                openapi.IN_FORM,
+                description="CSV (with a header line), JSONL, MARC21 or MARCXML file",
+                type=openapi.TYPE_FILE,
+                required=True,
+            ),
+            openapi.Parameter(
+                "format",
+                openapi.IN_FORM,
+                description="Input format (default: from the file name)",
+                type=openapi.TYPE_STRING,
+                enum=IMPORT_FORMATS,
+            ),
+        ],
+        responses={
+            201: openapi.Response(description="Import report: created, failed, errors"),
+            400: openapi.Response(description="No valid rows, or unreadable file"),
+            401: openapi.Response(description="Unauthorized"),
+            403: openapi.Response(description="Forbidden - Staff access required"),
+        },
+    )
+    def bulk(self, request):
+        """Import books from a CSV, JSONL, MARC21 or MARCXML upload."""
+        upload = request.FILES.get("file")
+        if upload is None:
+            return Response(
+                {"file": ["No file was submitted."]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        import_format = request.data.get("format") or guess_format(upload.name)
+        if import_format not in IMPORT_FORMATS:
+            return Response(
+                {"format": [f"Must be one of: {', '.join(IMPORT_FORMATS)}."]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        book_import = BookImport()
+        try:
+            # uploads are read from disk past 2.5 MB; text formats by line
+            if import_format in BINARY_FORMATS:
+                stream = upload
+            else:
+                stream = codecs.iterdecode(upload, "utf-8-sig")
+            book_import.run(READERS[import_format](stream))
+        except (ImportFormatError, UnicodeDecodeError) as e:
+            return Response(
+                {"detail": f"Import stopped at {e}", **book_import.report()},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        except Exception as e:
+            return Response(
+                f"Bulk import failed: {str(e)}",
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        finally:
+            if book_import.created:
+                bump_catalog_version()
+
+        return Response(
+            book_import.report(),
+            status=(
+                status.HTTP_201_CREATED
+                if book_import.created
+                else status.HTTP_400_BAD_REQUEST
+            ),
+        )
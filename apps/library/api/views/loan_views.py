@@ -4,6 +4,7 @@ from rest_framework.decorators import action
 from django_filters.rest_framework import DjangoFilterBackend
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
+from django.db import transaction
 
 from apps.library.models import Loan, Book
 from apps.library.api.serializers import (
@@ -12,6 +13,11 @@ from apps.library.api.serializers import (
     ReturnBookSerializer,
 )
 from apps.library.api.filters import LoanFilter
+from apps.library.api.serializers.mixins import (
+    project_queryset,
+    requested_fields,
+    serialize_many,
+)
 from django.contrib.auth import get_user_model
 from apps.library.api.permissions.library_permissions import IsAdminForAllLoans
 
@@ -32,7 +38,14 @@ class LoanViewSet(viewsets.ViewSet):
         return [permissions.IsAuthenticated()]
 
     def get_queryset(self):
-        return Loan.objects.select_related("user", "book", "book__author").all()
+        return Loan.objects.select_related("user", "book").all()
+
+    def get_list_queryset(self, request):
+        """Loans with only the columns the (``?fields=`` trimmed) listing renders."""
+        return project_queryset(
+            self.get_queryset(),
+            LoanSerializer.queryset_fields(requested_fields(request)),
+        )
 
     @swagger_auto_schema(
         operation_summary="Borrow a book",
@@ -54,16 +67,25 @@ class LoanViewSet(viewsets.ViewSet):
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            book = Book.objects.get(id=serializer.validated_data["book_id"])
-            if not book.is_available:
-                return Response(
-                    {"book_id": ["This book is currently borrowed by another user."]},
-                    status=status.HTTP_400_BAD_REQUEST,
+            # the loan, the book's availability and its loan counters are
+            # written in one transaction
+            with transaction.atomic():
+                book = Book.objects.select_for_update().get(
+                    id=serializer.validated_data["book_id"]
                 )
+                if not book.is_available:
+                    return Response(
+                        {
+                            "book_id": [
+                                "This book is currently borrowed by another user."
+                            ]
+                        },
+                        status=status.HTTP_400_BAD_REQUEST,
+                    )
 
-            loan = Loan.objects.create(user=request.user, book=book)
-            book.is_available = False
-            book.save(update_fields=["is_available"])
+                loan = Loan.objects.create(user=request.user, book=book)
+                book.is_available = False
+                book.save(update_fields=["is_available"])
             return Response(LoanSerializer(loan).data, status=status.HTTP_201_CREATED)
         except Book.DoesNotExist:
             return Response(
@@ -129,6 +151,12 @@ class LoanViewSet(viewsets.ViewSet):
         operation_summary="List your borrows",
         operation_description="List all your borrows with filters (active, inactive, book title, etc.)",
         manual_parameters=[
+            openapi.Parameter(
+                "fields",
+                openapi.IN_QUERY,
+                description="Comma-separated subset of fields to return",
+                type=openapi.TYPE_STRING,
+            ),
             openapi.Parameter(
                 "status",
                 openapi.IN_QUERY,
@@ -148,16 +176,24 @@ class LoanViewSet(viewsets.ViewSet):
     )
     @action(detail=False, methods=["get"], url_path="borrows")
     def user_borrows(self, request):
-        qs = self.get_queryset().filter(user=request.user)
+        qs = self.get_list_queryset(request).filter(user=request.user)
         filterset = LoanFilter(request.GET, queryset=qs)
         if filterset.is_valid():
             qs = filterset.qs
-        return Response(LoanSerializer(qs, many=True).data)
+        return Response(
+            serialize_many(LoanSerializer(context={"request": request}), qs)
+        )
 
     @swagger_auto_schema(
         operation_summary="List all borrows (admin)",
         operation_description="Admin: List all borrows in the system with filters.",
         manual_parameters=[
+            openapi.Parameter(
+                "fields",
+                openapi.IN_QUERY,
+                description="Comma-separated subset of fields to return",
+                type=openapi.TYPE_STRING,
+            ),
             openapi.Parameter(
                 "status",
                 openapi.IN_QUERY,
@@ -188,16 +224,24 @@ class LoanViewSet(viewsets.ViewSet):
         permission_classes=[IsAdminForAllLoans],
     )
     def all_borrows(self, request):
-        qs = self.get_queryset()
+        qs = self.get_list_queryset(request)
         filterset = LoanFilter(request.GET, queryset=qs)
         if filterset.is_valid():
             qs = filterset.qs
-        return Response(LoanSerializer(qs, many=True).data)
+        return Response(
+            serialize_many(LoanSerializer(context={"request": request}), qs)
+        )
 
     @swagger_auto_schema(
         operation_summary="List a user's borrows (admin)",
         operation_description="Admin: List all borrows for a specific user.",
         manual_parameters=[
+            openapi.Parameter(
+                "fields",
+                openapi.IN_QUERY,
+                description="Comma-separated subset of fields to return",
+                type=openapi.TYPE_STRING,
+            ),
             openapi.Parameter(
                 "status",
                 openapi.IN_QUERY,
@@ -229,8 +273,10 @@ class LoanViewSet(viewsets.ViewSet):
                 {"detail": "User does not exist."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
-        qs = self.get_queryset().filter(user=user)
+        qs = self.get_list_queryset(request).filter(user=user)
         filterset = LoanFilter(request.GET, queryset=qs)
         if filterset.is_valid():
             qs = filterset.qs
-        return Response(LoanSerializer(qs, many=True).data)
+        return Response(
+            serialize_many(LoanSerializer(context={"request": request}), qs)
+        )
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class LibraryAppConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.library"
+
+    def ready(self):
+        from apps.library import signals  # noqa
@@ -0,0 +1,125 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from apps.library.models import BookCoBorrow, Loan, RecommendationBuild
+from apps.library.services.co_borrow_services import co_borrow_delta
+
+BUILD_NAME = "also_borrowed"
+
+
+class Command(BaseCommand):
+    """
+    Management command to update the "patrons also borrowed" pair counts.
+
+    Only loans created since the previous run are folded in: their patrons'
+    loan histories give the change in pair counts through sparse matrix
+    products, so a run costs in proportion to the new loans' patrons rather
+    than the whole loan history. Patrons are processed in batches, all in one
+    transaction with the build checkpoint. Deleted loans are only accounted
+    for by a --rebuild.
+
+    The checkpoint is a loan id, but ids are allocated before their
+    transactions commit, so a loan with a lower id than one already visible
+    may still appear. Loans younger than --lag-minutes are therefore left
+    for a later run.
+    """
+
+    help = "Fold new loans into the BookCoBorrow pair counts"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of patrons processed per batch (default: 1000)",
+        )
+        parser.add_argument(
+            "--lag-minutes",
+            type=int,
+            default=5,
+            help="Leave loans created in the last N minutes for a later run (default: 5)",
+        )
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Discard the pair counts and rebuild them from the whole loan history",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+
+        with transaction.atomic():
+            build, _ = RecommendationBuild.objects.select_for_update().get_or_create(
+                name=BUILD_NAME
+            )
+            if options["rebuild"]:
+                BookCoBorrow.objects.all().delete()
+                build.last_loan_id = 0
+
+            last_loan_id = build.last_loan_id
+            cutoff = timezone.now() - timedelta(minutes=options["lag_minutes"])
+            # walks the primary key back over the last few minutes of loans
+            up_to = (
+                Loan.objects.filter(created__lte=cutoff)
+                .order_by("-id")
+                .values_list("id", flat=True)
+                .first()
+                or 0
+            )
+            new_loans = Loan.objects.filter(id__gt=last_loan_id, id__lte=up_to)
+            user_ids = sorted(set(new_loans.values_list("user_id", flat=True)))
+
+            pairs = 0
+            for start in range(0, len(user_ids), batch_size):
+                batch = user_ids[start : start + batch_size]
+                loans = list(
+                    Loan.objects.filter(user_id__in=batch, id__lte=up_to)
+                    .order_by()
+                    .values_list("user_id", "book_id", "id")
+                )
+                pairs += self.apply(*co_borrow_delta(loans, last_loan_id))
+                self.stdout.write(
+                    f"Processed {min(start + batch_size, len(user_ids))} "
+                    f"of {len(user_ids)} patrons..."
+                )
+
+            build.last_loan_id = max(up_to, last_loan_id)
+            build.save()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Successfully updated {pairs} book pairs up to loan {build.last_loan_id}"
+            )
+        )
+
+    def apply(self, book_ids, other_book_ids, increments):
+        """Add ``increments`` to the pair counts, creating missing pairs."""
+        if not len(increments):
+            return 0
+        existing = {
+            (row.book_id, row.other_book_id): row
+            for row in BookCoBorrow.objects.filter(
+                book_id__in=set(book_ids.tolist()),
+                other_book_id__in=set(other_book_ids.tolist()),
+            )
+        }
+        updated, created = [], []
+        for book_id, other_book_id, increment in zip(
+            book_ids.tolist(), other_book_ids.tolist(), increments.tolist()
+        ):
+            row = existing.get((book_id, other_book_id))
+            if row is None:
+                created.append(
+                    BookCoBorrow(
+                        book_id=book_id, other_book_id=other_book_id, count=increment
+                    )
+                )
+            else:
+                row.count += increment
+                updated.append(row)
+        BookCoBorrow.objects.bulk_update(updated, ["count"], batch_size=1000)
+        BookCoBorrow.objects.bulk_create(created, batch_size=1000)
+        return len(increments)
@@ -0,0 +1,134 @@
+import os
+import tempfile
+
+import numpy as np
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from scipy import sparse
+
+from apps.library.models import Book, BookSimilarity
+from apps.library.services.similarity_services import (
+    count_matrix,
+    document_frequencies,
+    inverse_document_frequencies,
+    nearest_neighbours,
+    tfidf,
+)
+
+
+class Command(BaseCommand):
+    """
+    Management command to precompute similar books from titles and descriptions.
+
+    Books are streamed in primary key order, one chunk at a time, into hashed
+    term count matrices kept in temporary files. Once document frequencies are
+    known the chunks are turned into TF-IDF vectors and compared chunk against
+    chunk with sparse matrix products, so memory is bounded by the chunk size
+    rather than the catalog size. The best neighbours of each chunk replace
+    its BookSimilarity rows in one transaction.
+    """
+
+    help = "Precompute BookSimilarity rows from title and description TF-IDF"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=2000,
+            help="Number of books vectorized and compared per chunk (default: 2000)",
+        )
+        parser.add_argument(
+            "--top-k",
+            type=int,
+            default=10,
+            help="Number of similar books stored per book (default: 10)",
+        )
+        parser.add_argument(
+            "--features",
+            type=int,
+            default=2**18,
+            help="Size of the hashed vocabulary (default: 262144)",
+        )
+        parser.add_argument(
+            "--min-score",
+            type=float,
+            default=0.05,
+            help="Drop neighbours less similar than this (default: 0.05)",
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        n_features = options["features"]
+
+        with tempfile.TemporaryDirectory() as directory:
+
+            def path(chunk):
+                return os.path.join(directory, f"chunk-{chunk}.npz")
+
+            # pass 1: term counts and document frequencies
+            frequencies = np.zeros(n_features, dtype=np.int64)
+            chunk_ids = []
+            for chunk, rows in enumerate(self.book_chunks(chunk_size)):
+                counts = count_matrix([row[1:] for row in rows], n_features)
+                frequencies += document_frequencies(counts)
+                sparse.save_npz(path(chunk), counts)
+                chunk_ids.append(np.array([row[0] for row in rows], dtype=np.int64))
+            if not chunk_ids:
+                self.stdout.write(self.style.SUCCESS("No books to compare"))
+                return
+            n_books = sum(len(ids) for ids in chunk_ids)
+            self.stdout.write(f"Vectorized {n_books} books...")
+
+            # pass 2: TF-IDF weighting
+            idf = inverse_document_frequencies(frequencies, n_books)
+            for chunk in range(len(chunk_ids)):
+                sparse.save_npz(path(chunk), tfidf(sparse.load_npz(path(chunk)), idf))
+
+            # pass 3: top-k neighbours, chunk against chunk
+            ids = np.concatenate(chunk_ids)
+            top_k = min(options["top_k"], n_books - 1)
+            stored = 0
+            if top_k > 0:
+                neighbours = nearest_neighbours(
+                    lambda chunk: sparse.load_npz(path(chunk)), len(chunk_ids), top_k
+                )
+                for chunk, positions, scores in neighbours:
+                    stored += self.store(
+                        chunk_ids[chunk], ids[positions], scores, options["min_score"]
+                    )
+                    self.stdout.write(
+                        f"Stored neighbours for chunk {chunk + 1} of {len(chunk_ids)}..."
+                    )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Successfully stored {stored} similar books for {n_books} books"
+            )
+        )
+
+    def book_chunks(self, chunk_size):
+        last_id = 0
+        while True:
+            rows = list(
+                Book.objects.filter(pk__gt=last_id)
+                .order_by("pk")
+                .values_list("pk", "title", "description")[:chunk_size]
+            )
+            if not rows:
+                return
+            yield rows
+            last_id = rows[-1][0]
+
+    def store(self, book_ids, neighbour_ids, scores, min_score):
+        similarities = [
+            BookSimilarity(
+                book_id=int(book_id), similar_book_id=int(similar_id), score=float(score)
+            )
+            for book_id, row_ids, row_scores in zip(book_ids, neighbour_ids, scores)
+            for similar_id, score in zip(row_ids, row_scores)
+            if score >= min_score
+        ]
+        with transaction.atomic():
+            BookSimilarity.objects.filter(book_id__in=book_ids.tolist()).delete()
+            BookSimilarity.objects.bulk_create(similarities, batch_size=1000)
+        return len(similarities)
@@ -0,0 +1,123 @@
+import json
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.library.api.cache import bump_catalog_version
+from apps.library.services.book_import_services import (
+    BINARY_FORMATS,
+    IMPORT_FORMATS,
+    READERS,
+    BookImport,
+    ImportFormatError,
+    guess_format,
+)
+from apps.library.services.nationality_services import get_or_create_nationality_id
+
+
+class Command(BaseCommand):
+    """
+    Management command to import books from a CSV, JSON Lines, MARC21
+    (ISO 2709, .mrc) or MARCXML file.
+
+    The file is read as a stream and inserted in batches (see BookImport), so
+    millions of rows take minutes and little more memory than their keys.
+    Columns: title, author_id or author (an existing author's exact name),
+    description, isbn, publish_date (YYYY-MM-DD), page_count, language and
+    optionally is_available; MARC records are mapped onto them (see
+    marc_row). Rejected rows are reported with their line (record) number
+    and do not stop the import.
+    """
+
+    help = "Bulk import books from a CSV, JSONL, MARC21 or MARCXML file ('-' for stdin)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import, or '-' for stdin")
+        parser.add_argument(
+            "--format",
+            choices=IMPORT_FORMATS,
+            help="Input format (default: from the file extension)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of rows validated and inserted per batch (default: 1000)",
+        )
+        parser.add_argument(
+            "--max-errors",
+            type=int,
+            default=1000,
+            help="Number of rejected rows listed in the report (default: 1000)",
+        )
+        parser.add_argument(
+            "--create-authors",
+            metavar="NATIONALITY",
+            help="Create authors not found by name, with this nationality",
+        )
+        parser.add_argument(
+            "--report",
+            help="Write the report as JSON to this file instead of the output",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        import_format = options["format"] or guess_format(path)
+        if import_format not in IMPORT_FORMATS:
+            raise CommandError(f"Pass --format, one of: {', '.join(IMPORT_FORMATS)}")
+
+        nationality_id = None
+        if options["create_authors"]:
+            nationality_id = get_or_create_nationality_id(options["create_authors"])
+        book_import = BookImport(
+            batch_size=options["batch_size"],
+            max_errors=options["max_errors"],
+            new_author_nationality_id=nationality_id,
+        )
+        binary = import_format in BINARY_FORMATS
+        if path == "-":
+            stream = sys.stdin.buffer if binary else sys.stdin
+        elif binary:
+            stream = open(path, "rb")
+        else:
+            stream = open(path, newline="", encoding="utf-8-sig")
+        try:
+            book_import.run(self.progress(READERS[import_format](stream), options))
+        except ImportFormatError as e:
+            raise CommandError(f"Import stopped at {e}")
+        finally:
+            if path != "-":
+                stream.close()
+            if book_import.created or book_import.authors_created:
+                bump_catalog_version()
+
+        report = book_import.report()
+        if options["report"]:
+            with open(options["report"], "w", encoding="utf-8") as output:
+                json.dump(report, output, indent=2)
+        else:
+            unit = "record" if binary else "line"
+            for error in report["errors"]:
+                self.stdout.write(
+                    self.style.ERROR(f"{unit} {error['line']}: {error['errors']}")
+                )
+
+        style = self.style.WARNING if book_import.failed else self.style.SUCCESS
+        self.stdout.write(
+            style(
+                f"Imported {book_import.created} books, "
+                f"rejected {book_import.failed} rows"
+                + (
+                    f", created {book_import.authors_created} authors"
+                    if book_import.authors_created
+                    else ""
+                )
+            )
+        )
+
+    def progress(self, rows, options):
+        every = options["batch_size"] * 100
+        for count, row in enumerate(rows, start=1):
+            if count % every == 0:
+                self.stdout.write(f"Read {count} rows...")
+            yield row
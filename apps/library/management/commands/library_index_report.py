@@ -0,0 +1,156 @@
+import json
+from datetime import date, timedelta
+from itertools import combinations
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.settings import api_settings
+
+from apps.library.api.filters import BookFilter, LoanFilter
+from apps.library.models import Book, Loan
+from apps.library.services.explain_services import explain_queryset, plan_issues
+
+# filters that are commonly sent together and combined up to --combination-size
+BOOK_COMBINABLE = [
+    "language",
+    "is_available",
+    "publish_year",
+    "publish_date_after",
+    "page_count_min",
+]
+LOAN_COMBINABLE = ["status", "borrowed_after", "user"]
+
+
+def first_word(text, default):
+    words = (text or "").split()
+    return words[0] if words else default
+
+
+class Command(BaseCommand):
+    """
+    Management command to check which plans the book and loan filters get.
+
+    Representative BookFilter and LoanFilter parameter combinations, with values
+    sampled from the data, are turned into the querysets the list endpoints run
+    and explained. On PostgreSQL this is EXPLAIN (ANALYZE, BUFFERS), so the
+    queries are executed: run it against a production-sized copy of the data.
+    """
+
+    help = "Report sequential scans, sort spills and row misestimates per filter combination"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--format",
+            choices=["text", "json"],
+            default="text",
+            help="Output format (default: text)",
+        )
+        parser.add_argument(
+            "--combination-size",
+            type=int,
+            default=2,
+            help="Largest number of filters combined in one query (default: 2)",
+        )
+        parser.add_argument(
+            "--misestimate-factor",
+            type=float,
+            default=10,
+            help="Flag plan nodes whose row estimate is off by this factor (default: 10)",
+        )
+        parser.add_argument(
+            "--fail-on-issues",
+            action="store_true",
+            help="Exit with an error if any combination has an issue",
+        )
+
+    def handle(self, *args, **options):
+        reports = []
+        for filterset_class, queryset, params in self.scenarios(
+            options["combination_size"]
+        ):
+            filterset = filterset_class(params, queryset=queryset)
+            report = {"filter": filterset_class.__name__, "params": params}
+            if not filterset.is_valid():
+                report["errors"] = filterset.errors
+                reports.append(report)
+                continue
+            queryset = filterset.qs
+            if filterset_class is BookFilter:
+                # the first page of the paginated book list
+                queryset = queryset[: api_settings.PAGE_SIZE]
+            report["plan"] = explain_queryset(
+                queryset, misestimate_factor=options["misestimate_factor"]
+            )
+            report["issues"] = plan_issues(report["plan"])
+            reports.append(report)
+
+        if options["format"] == "json":
+            self.stdout.write(json.dumps(reports, indent=2, default=str))
+        else:
+            self.write_text(reports)
+
+        failing = [report for report in reports if report.get("issues")]
+        if options["fail_on_issues"] and failing:
+            raise CommandError(f"{len(failing)} filter combinations have issues")
+
+    def scenarios(self, combination_size):
+        """``(filterset_class, queryset, params)`` for every combination."""
+        for filterset_class, queryset, parameters, combinable in [
+            (BookFilter, Book.objects.all(), self.book_parameters(), BOOK_COMBINABLE),
+            (
+                LoanFilter,
+                Loan.objects.select_related("user", "book"),
+                self.loan_parameters(),
+                LOAN_COMBINABLE,
+            ),
+        ]:
+            yield filterset_class, queryset, {}
+            for name, value in parameters.items():
+                yield filterset_class, queryset, {name: value}
+            for size in range(2, combination_size + 1):
+                for names in combinations(combinable, size):
+                    yield filterset_class, queryset, {
+                        name: parameters[name] for name in names
+                    }
+
+    def book_parameters(self):
+        book = Book.objects.select_related("author").order_by("pk").first()
+        author = book.author if book else None
+        return {
+            "title": first_word(book and book.title, "the"),
+            "author_name": first_word(author and author.name, "a"),
+            "search": first_word(book and book.title, "the"),
+            "isbn": book.isbn if book else "9780306406157",
+            "language": book.language if book else "EN",
+            "is_available": "true",
+            "publish_year": str(book.publish_date.year if book else date.today().year),
+            "publish_date_after": (date.today() - timedelta(days=365)).isoformat(),
+            "page_count_min": "300",
+        }
+
+    def loan_parameters(self):
+        loan = Loan.objects.select_related("user", "book").order_by("pk").first()
+        return {
+            "status": "active",
+            "user": loan.user.username if loan else "admin",
+            "book_title": first_word(loan and loan.book.title, "the"),
+            "borrowed_after": (date.today() - timedelta(days=30)).isoformat(),
+            "returned_after": (date.today() - timedelta(days=30)).isoformat(),
+        }
+
+    def write_text(self, reports):
+        for report in reports:
+            params = "&".join(f"{name}={value}" for name, value in report["params"].items())
+            label = f"{report['filter']} {params or '(no filters)'}"
+            if "errors" in report:
+                self.stdout.write(self.style.ERROR(f"{label}: {report['errors']}"))
+                continue
+            timing = report["plan"].get("execution_ms")
+            timing = f" ({timing:.1f} ms)" if timing is not None else ""
+            if not report["issues"]:
+                self.stdout.write(self.style.SUCCESS(f"{label}: ok{timing}"))
+                continue
+            self.stdout.write(
+                self.style.WARNING(f"{label}: {len(report['issues'])} issue(s){timing}")
+            )
+            for issue in report["issues"]:
+                self.stdout.write(f"  {issue}")
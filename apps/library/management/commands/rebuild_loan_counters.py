@@ -0,0 +1,68 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Max
+
+from apps.library.models import Book, Loan
+
+
+class Command(BaseCommand):
+    """
+    Management command to rebuild the denormalized loan counters on books.
+
+    Books are processed in primary key order, one batch per transaction, so the
+    command can run against a live catalog: each batch locks its books before
+    counting, so borrows recorded meanwhile wait and then add to the rebuilt
+    counters instead of being overwritten.
+    """
+
+    help = "Rebuild Book.loan_count and Book.last_borrowed_at from loan history"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of books updated per batch (default: 1000)",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        last_id = 0
+        updated = 0
+
+        while True:
+            ids = list(
+                Book.objects.filter(pk__gt=last_id)
+                .order_by("pk")
+                .values_list("pk", flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+
+            with transaction.atomic():
+                books = list(
+                    Book.objects.select_for_update()
+                    .filter(pk__in=ids)
+                    .order_by("pk")
+                    .only("pk")
+                )
+                stats = {
+                    row["book_id"]: row
+                    for row in Loan.objects.filter(book_id__in=ids)
+                    .order_by()
+                    .values("book_id")
+                    .annotate(count=Count("id"), last=Max("created"))
+                }
+                for book in books:
+                    row = stats.get(book.pk)
+                    book.loan_count = row["count"] if row else 0
+                    book.last_borrowed_at = row["last"] if row else None
+                Book.objects.bulk_update(books, ["loan_count", "last_borrowed_at"])
+
+            updated += len(ids)
+            last_id = ids[-1]
+            self.stdout.write(f"Rebuilt loan counters for {updated} books...")
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Successfully rebuilt loan counters for {updated} books")
+        )
@@ -0,0 +1,76 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+from apps.library.models import Book, BookLoanRollup, Loan
+
+
+class Command(BaseCommand):
+    """
+    Management command to rebuild the daily loan rollups from loan history.
+
+    Books are processed in primary key order, one batch per transaction: the
+    batch's rollups are deleted and recreated from its loans. Each batch locks
+    its books first; record_borrow updates the book before its rollup, so
+    borrows recorded meanwhile wait and then add to the rebuilt rollups
+    instead of colliding with them.
+    """
+
+    help = "Rebuild BookLoanRollup rows from existing loans"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of books rebuilt per batch (default: 1000)",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        last_id = 0
+        books = 0
+        rollups = 0
+
+        while True:
+            ids = list(
+                Book.objects.filter(pk__gt=last_id)
+                .order_by("pk")
+                .values_list("pk", flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+
+            with transaction.atomic():
+                list(
+                    Book.objects.select_for_update()
+                    .filter(pk__in=ids)
+                    .order_by("pk")
+                    .values_list("pk", flat=True)
+                )
+                BookLoanRollup.objects.filter(book_id__in=ids).delete()
+                daily = (
+                    Loan.objects.filter(book_id__in=ids)
+                    .annotate(day=TruncDate("created"))
+                    .order_by()
+                    .values("book_id", "day")
+                    .annotate(borrows=Count("id"))
+                )
+                created = BookLoanRollup.objects.bulk_create(
+                    BookLoanRollup(
+                        book_id=row["book_id"], day=row["day"], borrows=row["borrows"]
+                    )
+                    for row in daily
+                )
+
+            books += len(ids)
+            rollups += len(created)
+            last_id = ids[-1]
+            self.stdout.write(f"Rebuilt loan rollups for {books} books...")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Successfully rebuilt {rollups} loan rollups for {books} books"
+            )
+        )
@@ -0,0 +1,44 @@
+import django.contrib.postgres.search
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+
+def populate_search_vectors(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Author = apps.get_model('library', 'Author')
+    Book = apps.get_model('library', 'Book')
+    author_name = Subquery(Author.objects.filter(pk=OuterRef('author_id')).values('name')[:1])
+    Book.objects.update(
+        search_vector=(
+            SearchVector('title', weight='A', config='english')
+            + SearchVector(author_name, weight='B', config='english')
+            + SearchVector('description', weight='C', config='english')
+        )
+    )
+    schema_editor.execute(
+        'CREATE INDEX library_book_search_vector_gin ON library_book USING gin (search_vector)'
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS library_book_search_vector_gin')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0003_book_is_available'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(populate_search_vectors, drop_search_index),
+    ]
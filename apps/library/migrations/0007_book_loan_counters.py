@@ -0,0 +1,38 @@
+from django.db import migrations, models
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_loan_counters(apps, schema_editor):
+    Book = apps.get_model('library', 'Book')
+    Loan = apps.get_model('library', 'Loan')
+    loans = Loan.objects.filter(book=OuterRef('pk')).order_by().values('book')
+    Book.objects.update(
+        loan_count=Coalesce(Subquery(loans.annotate(count=Count('id')).values('count')), 0),
+        last_borrowed_at=Subquery(loans.annotate(last=Max('created')).values('last')),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0006_book_publish_date_id_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='last_borrowed_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='loan_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['-loan_count', 'id'], name='library_book_loan_count_idx'),
+        ),
+        migrations.RunPython(populate_loan_counters, migrations.RunPython.noop),
+    ]
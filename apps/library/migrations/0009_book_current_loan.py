@@ -0,0 +1,28 @@
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def populate_current_loan(apps, schema_editor):
+    Book = apps.get_model('library', 'Book')
+    Loan = apps.get_model('library', 'Loan')
+    open_loans = Loan.objects.filter(book=OuterRef('pk'), returned_at__isnull=True)
+    Book.objects.update(
+        current_loan=Subquery(open_loans.order_by('-created').values('pk')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0008_bookloanrollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='current_loan',
+            field=models.OneToOneField(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='library.loan'),
+        ),
+        migrations.RunPython(populate_current_loan, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+from django.db import migrations, models
+
+from apps.library.services.isbn_services import to_isbn13
+
+
+def populate_isbn13(apps, schema_editor):
+    Book = apps.get_model('library', 'Book')
+    seen = set()
+    batch = []
+    # the oldest book keeps an ISBN shared by several rows, the others stay NULL
+    for book in Book.objects.order_by('id').only('id', 'isbn').iterator(chunk_size=2000):
+        isbn13 = to_isbn13(book.isbn)
+        if isbn13 is None or isbn13 in seen:
+            continue
+        seen.add(isbn13)
+        book.isbn13 = isbn13
+        batch.append(book)
+        if len(batch) >= 2000:
+            Book.objects.bulk_update(batch, ['isbn13'])
+            batch = []
+    Book.objects.bulk_update(batch, ['isbn13'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0009_book_current_loan'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='isbn13',
+            field=models.CharField(blank=True, editable=False, max_length=13, null=True, unique=True),
+        ),
+        migrations.RunPython(populate_isbn13, migrations.RunPython.noop),
+    ]
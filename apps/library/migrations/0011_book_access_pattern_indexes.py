@@ -0,0 +1,23 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0010_book_isbn13'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='book',
+            options={'ordering': ['-publish_date', 'id'], 'verbose_name': 'Book', 'verbose_name_plural': 'Books'},
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['language', '-publish_date', 'id'], name='library_book_lang_pubdate_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(condition=models.Q(('is_available', True)), fields=['-publish_date', 'id'], name='library_book_available_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0011_book_access_pattern_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookSimilarity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('book', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similarities', to='library.book')),
+                ('similar_book', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similar_to', to='library.book')),
+            ],
+            options={
+                'ordering': ['book', '-score'],
+                'indexes': [models.Index(fields=['book', '-score'], name='library_booksim_score_idx')],
+                'unique_together': {('book', 'similar_book')},
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+import django.db.models.deletion
+import django.utils.timezone
+import model_utils.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0012_booksimilarity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecommendationBuild',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', model_utils.fields.AutoCreatedField(default=django.utils.timezone.now, editable=False, verbose_name='created')),
+                ('modified', model_utils.fields.AutoLastModifiedField(default=django.utils.timezone.now, editable=False, verbose_name='modified')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('last_loan_id', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='BookCoBorrow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('book', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='co_borrows', to='library.book')),
+                ('other_book', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='co_borrowed_with', to='library.book')),
+            ],
+            options={
+                'ordering': ['book', '-count'],
+                'indexes': [models.Index(fields=['book', '-count'], name='library_coborrow_count_idx')],
+                'unique_together': {('book', 'other_book')},
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0013_bookcoborrow_recommendationbuild'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='book',
+            name='library_boo_author__e33dc7_idx',
+        ),
+        migrations.AddIndex(
+            model_name='author',
+            index=models.Index(fields=['nationality'], name='library_aut_nationa_d0c444_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['author', '-publish_date', 'id'], name='library_book_author_pub_idx'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def populate_author_name(apps, schema_editor):
+    Author = apps.get_model('library', 'Author')
+    Book = apps.get_model('library', 'Book')
+    Book.objects.update(
+        author_name=Subquery(
+            Author.objects.filter(pk=OuterRef('author_id')).values('name')[:1]
+        )
+    )
+
+
+def create_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        'CREATE INDEX library_book_author_name_trgm ON library_book '
+        'USING gin (author_name gin_trgm_ops)'
+    )
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS library_book_author_name_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0014_author_counts_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='author_name',
+            field=models.CharField(blank=True, editable=False, max_length=200, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['author_name', 'id'], name='library_book_author_name_idx'),
+        ),
+        migrations.RunPython(populate_author_name, migrations.RunPython.noop),
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
@@ -0,0 +1,32 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0015_book_author_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Nationality',
+            fields=[
+                ('id', models.SmallAutoField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=200, unique=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Nationalities',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.RemoveIndex(
+            model_name='author',
+            name='library_aut_nationa_d0c444_idx',
+        ),
+        migrations.AddField(
+            model_name='author',
+            name='nationality_ref',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='authors', to='library.nationality'),
+        ),
+    ]
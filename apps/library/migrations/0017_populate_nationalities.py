@@ -0,0 +1,36 @@
+from django.db import migrations
+
+
+def populate_nationalities(apps, schema_editor):
+    Author = apps.get_model('library', 'Author')
+    Nationality = apps.get_model('library', 'Nationality')
+    names = Author.objects.order_by().values_list('nationality', flat=True).distinct()
+    Nationality.objects.bulk_create(
+        [Nationality(name=name) for name in names], batch_size=1000
+    )
+    for nationality in Nationality.objects.all():
+        Author.objects.filter(nationality=nationality.name).update(
+            nationality_ref=nationality
+        )
+
+
+def restore_nationality_names(apps, schema_editor):
+    Author = apps.get_model('library', 'Author')
+    Nationality = apps.get_model('library', 'Nationality')
+    for nationality in Nationality.objects.all():
+        Author.objects.filter(nationality_ref=nationality).update(
+            nationality=nationality.name
+        )
+
+
+# a migration (and transaction) of its own: on PostgreSQL the deferred FK
+# checks queued by the copy must run before 0018 alters library_author
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0016_nationality'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_nationalities, restore_nationality_names),
+    ]
@@ -0,0 +1,32 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0017_populate_nationalities'),
+    ]
+
+    operations = [
+        # a default lets the column be added back when migrating backwards
+        migrations.AlterField(
+            model_name='author',
+            name='nationality',
+            field=models.CharField(default='', max_length=200),
+        ),
+        migrations.RemoveField(
+            model_name='author',
+            name='nationality',
+        ),
+        migrations.RenameField(
+            model_name='author',
+            old_name='nationality_ref',
+            new_name='nationality',
+        ),
+        migrations.AlterField(
+            model_name='author',
+            name='nationality',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='authors', to='library.nationality'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0018_author_nationality_fk'),
+    ]
+
+    operations = [
+        # the column indexes of 0005 do not serve icontains, which Django
+        # compiles to UPPER(col::text) LIKE UPPER(%s)
+        migrations.RunSQL(
+            'DROP INDEX IF EXISTS library_book_title_trgm',
+            'CREATE INDEX library_book_title_trgm ON library_book USING gin (title gin_trgm_ops)',
+        ),
+        migrations.RunSQL(
+            'DROP INDEX IF EXISTS library_author_name_trgm',
+            'CREATE INDEX library_author_name_trgm ON library_author USING gin (name gin_trgm_ops)',
+        ),
+        migrations.AddIndex(
+            model_name='author',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('name'), name='gin_trgm_ops'), name='library_author_name_up_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('title'), name='gin_trgm_ops'), name='library_book_title_up_trgm'),
+        ),
+        # created by 0004, now declared on the model
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(
+                    model_name='book',
+                    index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='library_book_search_vector_gin'),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,23 @@
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0019_declared_gin_indexes'),
+    ]
+
+    operations = [
+        # like the indexes replaced in 0019, the column index of 0015 does
+        # not serve author_name__icontains
+        migrations.RunSQL(
+            'DROP INDEX IF EXISTS library_book_author_name_trgm',
+            'CREATE INDEX library_book_author_name_trgm ON library_book USING gin (author_name gin_trgm_ops)',
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('author_name'), name='gin_trgm_ops'), name='library_book_authname_up_trgm'),
+        ),
+    ]
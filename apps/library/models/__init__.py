@@ -1,6 +1,14 @@
-from .book_models import Author, Book
-from .loan_models import Loan
+from .book_models import Author, Book, Nationality
+from .loan_models import BookLoanRollup, Loan
+from .recommendation_models import BookCoBorrow, BookSimilarity, RecommendationBuild
 
-__all__ = ["Author", "Book", "Loan"]
-
-    
\ No newline at end of file
+__all__ = [
+    "Author",
+    "Book",
+    "BookCoBorrow",
+    "BookLoanRollup",
+    "BookSimilarity",
+    "Loan",
+    "Nationality",
+    "RecommendationBuild",
+]
@@ -1,16 +1,44 @@
 from model_utils.models import TimeStampedModel
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import RegexValidator
 from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models.functions import Upper
 from datetime import date
 
 
+class Nationality(models.Model):
+    """Lookup table of author nationalities, see nationality_names."""
+
+    id = models.SmallAutoField(primary_key=True)
+    name = models.CharField(max_length=200, unique=True)
+
+    class Meta:
+        verbose_name_plural = "Nationalities"
+        ordering = ["name"]
+
+    def __str__(self):
+        return self.name
+
+
 class Author(TimeStampedModel):
     name = models.CharField(max_length=200)
-    nationality = models.CharField(max_length=200)
+    nationality = models.ForeignKey(
+        Nationality, on_delete=models.PROTECT, related_name="authors"
+    )
     date_of_birth = models.DateField(null=True, blank=True)
     date_of_death = models.DateField(null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            # serves name__icontains, which compares UPPER(name)
+            GinIndex(
+                OpClass(Upper("name"), name="gin_trgm_ops"),
+                name="library_author_name_up_trgm",
+            ),
+        ]
+
     @property
     def age(self):
         from apps.library.services.author_services import calculate_age
@@ -29,8 +57,14 @@ class Author(TimeStampedModel):
                 )
 
     def save(self, *args, **kwargs):
+        from apps.library.services.author_services import sync_author_name
+
+        adding = self._state.adding
         self.full_clean()
         super().save(*args, **kwargs)
+        if not adding:
+            # books carry a copy of the name, also part of their search document
+            sync_author_name(self.pk, self.name)
 
     def __str__(self):
         return self.name
@@ -50,6 +84,11 @@ class Book(TimeStampedModel):
     author = models.ForeignKey(
         Author, on_delete=models.SET_NULL, null=True, blank=True, related_name="books"
     )
+    # copy of author.name, set by save and kept current by sync_author_name,
+    # so lists, filters and search do not join the author table
+    author_name = models.CharField(
+        max_length=200, null=True, blank=True, editable=False
+    )
     description = models.TextField()
     isbn = models.CharField(
         max_length=13,
@@ -59,20 +98,82 @@ class Book(TimeStampedModel):
             )
         ],
     )
+    # isbn in ISBN-13 form, see to_isbn13
+    isbn13 = models.CharField(
+        max_length=13, unique=True, null=True, blank=True, editable=False
+    )
     publish_date = models.DateField()
     page_count = models.IntegerField()
     language = models.CharField(max_length=2, choices=LANGUAGE_CHOICES)
     is_available = models.BooleanField(default=True)
+    # denormalized from Loan, see record_borrow and rebuild_loan_counters
+    loan_count = models.PositiveIntegerField(default=0, editable=False)
+    last_borrowed_at = models.DateTimeField(null=True, blank=True, editable=False)
+    # the open loan, set by record_borrow and cleared by record_return
+    current_loan = models.OneToOneField(
+        "Loan",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name="+",
+    )
+    # maintained by refresh_search_vectors
+    search_vector = SearchVectorField(null=True, blank=True, editable=False)
+
+    SEARCH_DOCUMENT_FIELDS = {"title", "author", "author_name", "description"}
+    # columns save derives from others, saved along with them
+    DERIVED_FIELDS = {
+        "isbn": "isbn13",
+        "author": "author_name",
+        "author_id": "author_name",
+    }
 
     class Meta:
         verbose_name = "Book"
         verbose_name_plural = "Books"
         indexes = [
             models.Index(fields=["title"]),
-            models.Index(fields=["author"]),
+            # serves title__icontains, which compares UPPER(title), and
+            # title_fuzzy
+            GinIndex(
+                OpClass(Upper("title"), name="gin_trgm_ops"),
+                name="library_book_title_up_trgm",
+            ),
+            GinIndex(fields=["search_vector"], name="library_book_search_vector_gin"),
+            models.Index(fields=["author_name", "id"], name="library_book_author_name_idx"),
+            # serves author_name__icontains and author_name_fuzzy
+            GinIndex(
+                OpClass(Upper("author_name"), name="gin_trgm_ops"),
+                name="library_book_authname_up_trgm",
+            ),
+            # /authors/<id>/books/ in keyset order; also serves author lookups
+            models.Index(
+                fields=["author", "-publish_date", "id"],
+                name="library_book_author_pub_idx",
+            ),
+            # keyset pagination order, see BookKeysetPagination
+            models.Index(
+                fields=["-publish_date", "id"], name="library_book_pubdate_id_idx"
+            ),
+            models.Index(
+                fields=["-loan_count", "id"], name="library_book_loan_count_idx"
+            ),
+            # ?language= lists in the default order
+            models.Index(
+                fields=["language", "-publish_date", "id"],
+                name="library_book_lang_pubdate_idx",
+            ),
+            # ?is_available=true lists in the default order
+            models.Index(
+                fields=["-publish_date", "id"],
+                condition=models.Q(is_available=True),
+                name="library_book_available_idx",
+            ),
         ]
         unique_together = ["title", "author", "publish_date"]
-        ordering = ["-publish_date"]
+        # id breaks ties so pages are stable and match library_book_pubdate_id_idx
+        ordering = ["-publish_date", "id"]
 
     def clean(self):
         if self.publish_date > date.today():
@@ -81,8 +182,44 @@ class Book(TimeStampedModel):
             raise ValidationError("Page count must be greater than 0.")
 
     def save(self, *args, **kwargs):
+        from apps.library.services.isbn_services import to_isbn13
+        from apps.library.services.search_services import refresh_search_vectors
+
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or "isbn" in update_fields:
+            isbn13 = to_isbn13(self.isbn)
+            if not self.is_legacy_duplicate(isbn13):
+                self.isbn13 = isbn13
+        if update_fields is None or {"author", "author_id"} & set(update_fields):
+            self.author_name = self.author.name if self.author_id else None
+        if update_fields is not None:
+            kwargs["update_fields"] = {*update_fields} | {
+                self.DERIVED_FIELDS[name]
+                for name in update_fields
+                if name in self.DERIVED_FIELDS
+            }
         self.full_clean()
         super().save(*args, **kwargs)
+        if update_fields is None or self.SEARCH_DOCUMENT_FIELDS & set(update_fields):
+            refresh_search_vectors(Book.objects.filter(pk=self.pk))
+
+    def is_legacy_duplicate(self, isbn13):
+        """
+        Whether this stored book predates isbn13 and shares its unchanged ISBN
+        with an older book; migration 0010 left such rows with isbn13 NULL and
+        they stay savable as long as their ISBN is not edited.
+        """
+        from apps.library.services.isbn_services import to_isbn13
+
+        if self._state.adding or self.isbn13 is not None or isbn13 is None:
+            return False
+        stored_isbn = (
+            Book.objects.filter(pk=self.pk).values_list("isbn", flat=True).first()
+        )
+        return (
+            to_isbn13(stored_isbn) == isbn13
+            and Book.objects.filter(isbn13=isbn13).exclude(pk=self.pk).exists()
+        )
 
     def __str__(self):
-        return f"{self.title} - {self.author.name if self.author else 'Unknown'}"
+        return f"{self.title} - {self.author_name or 'Unknown'}"
@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from model_utils.models import TimeStampedModel
@@ -31,11 +31,39 @@ class Loan(TimeStampedModel):
             raise ValidationError("Return date cannot be before the borrow date.")
 
     def save(self, *args, **kwargs):
+        from apps.library.services.loan_services import record_borrow, record_return
+
+        adding = self._state.adding
         self.full_clean()
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if adding:
+                record_borrow(self)
+            elif self.returned_at is not None:
+                record_return(self)
 
     def is_returned(self):
         return self.returned_at is not None
 
     def __str__(self):
         return f"{self.user} borrowed {self.book} on {self.borrowed_at}"
+
+
+class BookLoanRollup(models.Model):
+    """Number of times a book was borrowed on a given day."""
+
+    book = models.ForeignKey(
+        "Book", on_delete=models.CASCADE, related_name="loan_rollups"
+    )
+    day = models.DateField()
+    borrows = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("book", "day")
+        indexes = [
+            models.Index(fields=["day", "book"]),
+        ]
+        ordering = ["-day"]
+
+    def __str__(self):
+        return f"{self.book_id} borrowed {self.borrows} times on {self.day}"
@@ -0,0 +1,60 @@
+from django.db import models
+from model_utils.models import TimeStampedModel
+
+
+class BookSimilarity(models.Model):
+    """
+    A precomputed neighbour of a book by title and description TF-IDF, see the
+    build_book_similarity command.
+    """
+
+    book = models.ForeignKey(
+        "Book", on_delete=models.CASCADE, related_name="similarities"
+    )
+    similar_book = models.ForeignKey(
+        "Book", on_delete=models.CASCADE, related_name="similar_to"
+    )
+    score = models.FloatField()
+
+    class Meta:
+        unique_together = ("book", "similar_book")
+        indexes = [
+            models.Index(fields=["book", "-score"], name="library_booksim_score_idx"),
+        ]
+        ordering = ["book", "-score"]
+
+    def __str__(self):
+        return f"{self.book_id} ~ {self.similar_book_id} ({self.score:.3f})"
+
+
+class BookCoBorrow(models.Model):
+    """
+    Number of patrons who borrowed both ``book`` and ``other_book``, kept for
+    both orders of every pair by the build_also_borrowed command.
+    """
+
+    book = models.ForeignKey("Book", on_delete=models.CASCADE, related_name="co_borrows")
+    other_book = models.ForeignKey(
+        "Book", on_delete=models.CASCADE, related_name="co_borrowed_with"
+    )
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("book", "other_book")
+        indexes = [
+            models.Index(fields=["book", "-count"], name="library_coborrow_count_idx"),
+        ]
+        ordering = ["book", "-count"]
+
+    def __str__(self):
+        return f"{self.book_id} & {self.other_book_id} borrowed by {self.count} patrons"
+
+
+class RecommendationBuild(TimeStampedModel):
+    """Progress of an incremental recommendation build: the last loan folded in."""
+
+    name = models.CharField(max_length=50, unique=True)
+    last_loan_id = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name} up to loan {self.last_loan_id}"
@@ -1,8 +1,85 @@
 from datetime import date
 
+from django.db.models import Case, Count, DateField, Q, Value, When
+from django.db.models.functions import Coalesce, ExtractDay, ExtractMonth, ExtractYear
+from django.db.models.lookups import GreaterThan
+
+from apps.library.models import Book
+from apps.library.services.search_services import refresh_search_vectors
+
+# books updated per statement when an author is renamed
+AUTHOR_NAME_BATCH_SIZE = 1000
+
+
 def calculate_age(birth, death=None):
     if not birth:
         return None
     end = death or date.today()
     age = end.year - birth.year - ((end.month, end.day) < (birth.month, birth.day))
-    return age
\ No newline at end of file
+    return age
+
+
+def _month_day(expression):
+    return ExtractMonth(expression) * 100 + ExtractDay(expression)
+
+
+def age_expression(today=None):
+    """
+    ``calculate_age`` as a database expression over the author columns: whole
+    years from date_of_birth to date_of_death, or to ``today`` for the living.
+    """
+    end = Coalesce(
+        "date_of_death", Value(today or date.today(), output_field=DateField())
+    )
+    # one year less when the birthday has not come round yet in the end year
+    before_birthday = Case(
+        When(GreaterThan(_month_day("date_of_birth"), _month_day(end)), then=1),
+        default=0,
+    )
+    return ExtractYear(end) - ExtractYear("date_of_birth") - before_birthday
+
+
+def with_age(queryset):
+    """Annotate authors with ``age_years`` (see age_expression), once."""
+    if "age_years" in queryset.query.annotations:
+        return queryset
+    return queryset.annotate(age_years=age_expression())
+
+
+BOOK_COUNT_ANNOTATIONS = {
+    "book_count": lambda: Count("books"),
+    "active_loan_count": lambda: Count(
+        "books", filter=Q(books__current_loan__isnull=False)
+    ),
+}
+
+
+def with_book_counts(queryset, names=BOOK_COUNT_ANNOTATIONS):
+    """
+    Annotate authors with the ``names`` counts of BOOK_COUNT_ANNOTATIONS.
+
+    All counts share one join on books and one GROUP BY; active loans are read
+    from ``Book.current_loan`` so the loan table is not joined.
+    """
+    annotations = {name: BOOK_COUNT_ANNOTATIONS[name]() for name in names}
+    if not annotations:
+        return queryset
+    return queryset.annotate(**annotations)
+
+
+def sync_author_name(author_id, name, batch_size=AUTHOR_NAME_BATCH_SIZE):
+    """
+    Copy an author's ``name`` to ``Book.author_name`` on their books that
+    still carry another value, ``batch_size`` books per update so a prolific
+    author's rename never locks all their books at once. Search documents of
+    the updated books are refreshed along with them.
+    """
+    stale = Book.objects.filter(author_id=author_id).exclude(author_name=name)
+    updated = 0
+    while True:
+        ids = list(stale.order_by("pk").values_list("pk", flat=True)[:batch_size])
+        if not ids:
+            return updated
+        batch = Book.objects.filter(pk__in=ids)
+        updated += batch.update(author_name=name)
+        refresh_search_vectors(batch)
@@ -0,0 +1,364 @@
+import csv
+import json
+import os
+from datetime import date
+from itertools import islice
+
+from django.db import IntegrityError, transaction
+
+from apps.library.models import Author, Book
+from apps.library.services.isbn_services import ISBN_SEPARATORS, to_isbn13
+from apps.library.services.marc_services import (
+    MarcFormatError,
+    marc_row,
+    read_iso2709,
+    read_marcxml,
+)
+from apps.library.services.search_services import refresh_search_vectors
+
+IMPORT_FORMATS = ["csv", "jsonl", "marc", "marcxml"]
+# formats read from bytes rather than text
+BINARY_FORMATS = {"marc", "marcxml"}
+FORMAT_EXTENSIONS = {"mrc": "marc", "xml": "marcxml"}
+LANGUAGES = {code for code, _ in Book.LANGUAGE_CHOICES}
+TITLE_MAX_LENGTH = Book._meta.get_field("title").max_length
+AUTHOR_NAME_MAX_LENGTH = Author._meta.get_field("name").max_length
+# IntegerField and BigAutoField ranges valid on every database
+PAGE_COUNT_MAX = 2**31 - 1
+ID_MAX = 2**63 - 1
+TRUE_VALUES = {"1", "true", "yes"}
+FALSE_VALUES = {"0", "false", "no"}
+DUPLICATE_BOOK = "A book with this title, author and publish date already exists."
+CONFLICTING_BOOK = (
+    "A book with this ISBN or this title, author and publish date was added "
+    "meanwhile."
+)
+
+
+class ImportFormatError(ValueError):
+    """The input cannot be read as the announced format."""
+
+
+def read_csv(stream):
+    """``(line, row)`` pairs of a CSV text stream with a header line."""
+    reader = csv.DictReader(stream)
+    for row in reader:
+        yield reader.line_num, row
+
+
+def read_jsonl(stream):
+    """``(line, row)`` pairs of a text stream with one JSON object per line."""
+    for line, text in enumerate(stream, start=1):
+        if not text.strip():
+            continue
+        try:
+            row = json.loads(text)
+        except ValueError as e:
+            raise ImportFormatError(f"line {line}: invalid JSON ({e})")
+        if not isinstance(row, dict):
+            raise ImportFormatError(f"line {line}: expected a JSON object")
+        yield line, row
+
+
+def marc_reader(read_records):
+    def read(stream):
+        """``(record_number, row)`` pairs of a binary MARC stream."""
+        try:
+            for number, record in read_records(stream):
+                yield number, marc_row(record)
+        except MarcFormatError as e:
+            raise ImportFormatError(str(e))
+
+    return read
+
+
+READERS = {
+    "csv": read_csv,
+    "jsonl": read_jsonl,
+    "marc": marc_reader(read_iso2709),
+    "marcxml": marc_reader(read_marcxml),
+}
+
+
+def guess_format(filename):
+    """Import format for ``filename``'s extension, e.g. "marc" for ".mrc"."""
+    extension = os.path.splitext(filename)[1].lstrip(".").lower()
+    return FORMAT_EXTENSIONS.get(extension, extension)
+
+
+def cell(row, name):
+    value = row.get(name)
+    return "" if value is None else str(value).strip()
+
+
+def parse_id(value):
+    """``value`` as a primary key, or ``None``; "²" is a digit, not a number."""
+    if not (value.isascii() and value.isdigit()) or int(value) > ID_MAX:
+        return None
+    return int(value)
+
+
+class AuthorResolver:
+    """
+    Author ids for the ``author_id`` or ``author`` (name) of import rows,
+    looked up one query per batch for the ids and names not seen before.
+
+    With a ``nationality_id``, names matching no author are created with
+    that nationality, in one more query per batch.
+    """
+
+    def __init__(self, nationality_id=None):
+        self.nationality_id = nationality_id
+        self.names = {}
+        self.ids = {}
+        self.created = 0
+
+    def prefetch(self, rows):
+        ids, names = set(), set()
+        for row in rows:
+            author_id = cell(row, "author_id")
+            if author_id:
+                pk = parse_id(author_id)
+                if pk is not None and pk not in self.ids:
+                    ids.add(pk)
+            elif cell(row, "author") and cell(row, "author") not in self.names:
+                names.add(cell(row, "author"))
+        if ids:
+            found = dict(Author.objects.filter(pk__in=ids).values_list("pk", "name"))
+            self.ids.update({pk: found.get(pk) for pk in ids})
+        if names:
+            matches = {}
+            for pk, name in Author.objects.filter(name__in=names).values_list(
+                "pk", "name"
+            ):
+                matches.setdefault(name, []).append(pk)
+            if self.nationality_id is not None:
+                matches.update(self.create(set(names) - set(matches)))
+            self.names.update({name: matches.get(name, []) for name in names})
+
+    def create(self, names):
+        authors = Author.objects.bulk_create(
+            [
+                Author(name=name, nationality_id=self.nationality_id)
+                for name in sorted(names)
+                if len(name) <= AUTHOR_NAME_MAX_LENGTH
+            ]
+        )
+        self.created += len(authors)
+        return {author.name: [author.pk] for author in authors}
+
+    def resolve(self, row):
+        """``(author_id, author_name, error)`` for ``row``."""
+        author_id = cell(row, "author_id")
+        if author_id:
+            pk = parse_id(author_id)
+            name = None if pk is None else self.ids.get(pk)
+            if name is None:
+                return None, None, "Author with this ID does not exist."
+            return pk, name, None
+        name = cell(row, "author")
+        if not name:
+            return None, None, "Provide author_id or author."
+        matches = self.names.get(name, [])
+        if not matches:
+            return None, None, "No author with this name."
+        if len(matches) > 1:
+            return None, None, "Several authors have this name; use author_id."
+        return matches[0], name, None
+
+
+def build_book(row, authors):
+    """
+    An unsaved Book for ``row``, validated in memory like BookCreateSerializer
+    and Book.clean, or ``(None, errors)``.
+    """
+    errors = {}
+    today = date.today()
+
+    title = cell(row, "title")
+    if not title:
+        errors["title"] = "This field is required."
+    elif len(title) > TITLE_MAX_LENGTH:
+        errors["title"] = (
+            f"Ensure this field has no more than {TITLE_MAX_LENGTH} characters."
+        )
+
+    description = cell(row, "description")
+    if not description:
+        errors["description"] = "This field is required."
+
+    isbn = ISBN_SEPARATORS.sub("", cell(row, "isbn"))
+    if not (isbn.isascii() and isbn.isdigit() and len(isbn) in (10, 13)):
+        errors["isbn"] = "ISBN must be 10 or 13 digits"
+
+    publish_date = None
+    try:
+        publish_date = date.fromisoformat(cell(row, "publish_date"))
+    except ValueError:
+        errors["publish_date"] = "Enter a date in YYYY-MM-DD format."
+    else:
+        if publish_date > today:
+            errors["publish_date"] = "Cannot be in the future."
+
+    page_count = None
+    try:
+        page_count = int(cell(row, "page_count"))
+    except ValueError:
+        errors["page_count"] = "A valid integer is required."
+    else:
+        if page_count <= 0:
+            errors["page_count"] = "Must be greater than 0."
+        elif page_count > PAGE_COUNT_MAX:
+            errors["page_count"] = (
+                f"Ensure this value is less than or equal to {PAGE_COUNT_MAX}."
+            )
+
+    language = cell(row, "language").upper()
+    if language not in LANGUAGES:
+        errors["language"] = f'"{cell(row, "language")}" is not a valid choice.'
+
+    is_available = cell(row, "is_available").lower()
+    if is_available and is_available not in TRUE_VALUES | FALSE_VALUES:
+        errors["is_available"] = "Must be a valid boolean."
+
+    author_id, author_name, author_error = authors.resolve(row)
+    if author_error:
+        errors["author"] = author_error
+
+    if errors:
+        return None, errors
+    return (
+        Book(
+            title=title,
+            author_id=author_id,
+            author_name=author_name,
+            description=description,
+            isbn=isbn,
+            isbn13=to_isbn13(isbn),
+            publish_date=publish_date,
+            page_count=page_count,
+            language=language,
+            is_available=is_available not in FALSE_VALUES,
+        ),
+        None,
+    )
+
+
+class BookImport:
+    """
+    Streaming, batched book import.
+
+    Rows are ``(line, dict)`` pairs (see READERS). Each batch of
+    ``batch_size`` rows costs one query for unseen authors, one each for
+    existing ``(title, author, publish_date)`` and ISBN-13 conflicts, and one
+    ``bulk_create`` in its own transaction; the per-row ``Book.full_clean``
+    queries are replaced by in-memory checks. Books inserted concurrently can
+    still make a batch violate a unique constraint: that batch is then
+    inserted row by row and the conflicting rows are reported. Keys seen earlier in the input
+    are remembered, so memory grows with the number of imported rows (about
+    100 MB per million). The first ``max_errors`` row errors are kept.
+
+    Bulk inserts send no signals: callers invalidate catalog caches once the
+    import is done. Unknown authors are rejected unless
+    ``new_author_nationality_id`` is given (see AuthorResolver).
+    """
+
+    def __init__(
+        self, batch_size=1000, max_errors=1000, new_author_nationality_id=None
+    ):
+        self.batch_size = batch_size
+        self.max_errors = max_errors
+        self.created = 0
+        self.failed = 0
+        self.errors = []
+        self._authors = AuthorResolver(new_author_nationality_id)
+        self._seen_keys = set()
+        self._seen_isbns = set()
+
+    def run(self, rows):
+        rows = iter(rows)
+        while True:
+            batch = list(islice(rows, self.batch_size))
+            if not batch:
+                return self
+            self.import_batch(batch)
+
+    @property
+    def authors_created(self):
+        return self._authors.created
+
+    def report(self):
+        return {
+            "created": self.created,
+            "authors_created": self.authors_created,
+            "failed": self.failed,
+            "errors": self.errors,
+        }
+
+    def add_error(self, line, errors):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"line": line, "errors": errors})
+
+    def import_batch(self, batch):
+        self._authors.prefetch([row for _, row in batch])
+        candidates = []
+        for line, row in batch:
+            book, errors = build_book(row, self._authors)
+            if errors:
+                self.add_error(line, errors)
+            else:
+                candidates.append((line, book))
+
+        existing_keys, existing_isbns = self.existing(
+            [book for _, book in candidates]
+        )
+        lines, books = [], []
+        for line, book in candidates:
+            key = (book.title, book.author_id, book.publish_date)
+            if key in existing_keys or key in self._seen_keys:
+                self.add_error(line, {"non_field_errors": DUPLICATE_BOOK})
+            elif book.isbn13 in existing_isbns or book.isbn13 in self._seen_isbns:
+                self.add_error(line, {"isbn": "A book with this ISBN already exists."})
+            else:
+                self._seen_keys.add(key)
+                self._seen_isbns.add(book.isbn13)
+                lines.append(line)
+                books.append(book)
+
+        if not books:
+            return
+        try:
+            self.insert(books)
+        except IntegrityError:
+            for line, book in zip(lines, books):
+                try:
+                    self.insert([book])
+                except IntegrityError:
+                    self.add_error(line, {"non_field_errors": CONFLICTING_BOOK})
+
+    def insert(self, books):
+        with transaction.atomic():
+            Book.objects.bulk_create(books)
+            refresh_search_vectors(
+                Book.objects.filter(pk__in=[book.pk for book in books])
+            )
+        self.created += len(books)
+
+    def existing(self, books):
+        """``(title, author_id, publish_date)`` keys and ISBN-13s already stored."""
+        if not books:
+            return set(), set()
+        keys = set(
+            Book.objects.filter(
+                author_id__in={book.author_id for book in books},
+                title__in={book.title for book in books},
+                publish_date__in={book.publish_date for book in books},
+            ).values_list("title", "author_id", "publish_date")
+        )
+        isbns = set(
+            Book.objects.filter(
+                isbn13__in={book.isbn13 for book in books}
+            ).values_list("isbn13", flat=True)
+        )
+        return keys, isbns
@@ -0,0 +1,45 @@
+import numpy as np
+from scipy import sparse
+
+
+def borrow_matrix(user_rows, book_columns, shape):
+    """Binary patron x book matrix: 1 where the patron borrowed the book."""
+    matrix = sparse.csr_matrix(
+        (np.ones(len(user_rows), dtype=np.int32), (user_rows, book_columns)),
+        shape=shape,
+    )
+    matrix.data[:] = 1
+    return matrix
+
+
+def co_borrow_delta(loans, last_loan_id):
+    """
+    Change in pair counts caused by the loans after ``last_loan_id``.
+
+    ``loans`` holds ``(user_id, book_id, loan_id)`` for every loan of the
+    patrons who borrowed since ``last_loan_id``. With ``B`` their binary
+    patron x book matrix, pair counts are ``B.T @ B``; the delta is that
+    product over all their loans minus the one over their earlier loans.
+
+    Returns ``(book_ids, other_book_ids, increments)`` arrays, one entry per
+    ordered pair of distinct books whose count grew.
+    """
+    if not loans:
+        empty = np.array([], dtype=np.int64)
+        return empty, empty, empty
+    user_ids, book_ids, loan_ids = (np.asarray(column) for column in zip(*loans))
+    users, user_rows = np.unique(user_ids, return_inverse=True)
+    books, book_columns = np.unique(book_ids, return_inverse=True)
+    shape = (len(users), len(books))
+
+    earlier = loan_ids <= last_loan_id
+    after = borrow_matrix(user_rows, book_columns, shape)
+    before = borrow_matrix(user_rows[earlier], book_columns[earlier], shape)
+    delta = sparse.coo_matrix((after.T @ after) - (before.T @ before))
+
+    keep = (delta.row != delta.col) & (delta.data > 0)
+    return (
+        books[delta.row[keep]],
+        books[delta.col[keep]],
+        delta.data[keep].astype(np.int64),
+    )
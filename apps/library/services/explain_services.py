@@ -0,0 +1,122 @@
+import json
+import re
+
+from django.db import connections
+
+SQLITE_SCAN = re.compile(r"\bSCAN (?:TABLE )?(\w+)")
+
+
+def explain_queryset(queryset, misestimate_factor=10):
+    """
+    EXPLAIN ``queryset`` and summarize the plan: sequential scans, sorts (and
+    whether they spilled to disk) and nodes whose row estimate is off by
+    ``misestimate_factor`` or more.
+
+    On PostgreSQL this runs ``EXPLAIN (ANALYZE, BUFFERS)``, which executes the
+    query. Other backends only give the estimated plan, so neither actual rows
+    nor spills are reported there.
+    """
+    if connections[queryset.db].vendor == "postgresql":
+        output = queryset.explain(format="json", analyze=True, buffers=True)
+        return summarize_postgresql_plan(json.loads(output)[0], misestimate_factor)
+    return summarize_text_plan(queryset.explain())
+
+
+def walk_plan(node):
+    yield node
+    for child in node.get("Plans", []):
+        yield from walk_plan(child)
+
+
+def summarize_postgresql_plan(explained, misestimate_factor=10):
+    """Summary of one ``EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON)`` entry."""
+    root = explained["Plan"]
+    summary = {
+        "analyzed": True,
+        "planning_ms": explained.get("Planning Time"),
+        "execution_ms": explained.get("Execution Time"),
+        "rows": {"estimated": root.get("Plan Rows"), "actual": root.get("Actual Rows")},
+        "buffers": {
+            "hit": root.get("Shared Hit Blocks", 0),
+            "read": root.get("Shared Read Blocks", 0),
+        },
+        "seq_scans": [],
+        "sorts": [],
+        "misestimates": [],
+    }
+    for node in walk_plan(root):
+        node_type = node["Node Type"]
+        if node_type.endswith("Seq Scan"):
+            summary["seq_scans"].append(
+                {
+                    "relation": node.get("Relation Name"),
+                    "filter": node.get("Filter"),
+                    "actual_rows": node.get("Actual Rows"),
+                }
+            )
+        if node_type.endswith("Sort"):
+            summary["sorts"].append(
+                {
+                    "key": node.get("Sort Key"),
+                    "method": node.get("Sort Method"),
+                    "space_kb": node.get("Sort Space Used"),
+                    "spilled": node.get("Sort Space Type") == "Disk",
+                }
+            )
+        # both counts are per loop; nodes that never ran have no actual rows
+        estimated, actual = node.get("Plan Rows"), node.get("Actual Rows")
+        if actual is None or not node.get("Actual Loops"):
+            continue
+        low, high = sorted([estimated, actual])
+        if (high + 1) / (low + 1) >= misestimate_factor:
+            summary["misestimates"].append(
+                {
+                    "node": node_type,
+                    "relation": node.get("Relation Name"),
+                    "estimated": estimated,
+                    "actual": actual,
+                }
+            )
+    return summary
+
+
+def summarize_text_plan(output):
+    """Summary of a plain text plan, as printed by SQLite's EXPLAIN QUERY PLAN."""
+    summary = {
+        "analyzed": False,
+        "seq_scans": [],
+        "sorts": [],
+        "misestimates": [],
+    }
+    for line in output.splitlines():
+        match = SQLITE_SCAN.search(line)
+        if match and "USING" not in line:
+            summary["seq_scans"].append(
+                {"relation": match.group(1), "filter": None, "actual_rows": None}
+            )
+        if "USE TEMP B-TREE" in line:
+            summary["sorts"].append(
+                {"key": line.strip(), "method": None, "space_kb": None, "spilled": False}
+            )
+    return summary
+
+
+def plan_issues(summary):
+    """Human readable problems found in an ``explain_queryset`` summary."""
+    issues = [
+        f"seq scan on {scan['relation']}"
+        + (f" (filter: {scan['filter']})" if scan["filter"] else "")
+        for scan in summary["seq_scans"]
+    ]
+    issues.extend(
+        f"sort spilled to disk ({sort['space_kb']} kB, {sort['method']})"
+        for sort in summary["sorts"]
+        if sort["spilled"]
+    )
+    issues.extend(
+        f"{row['node']}"
+        + (f" on {row['relation']}" if row["relation"] else "")
+        + f": estimated {row['estimated']} rows, actual {row['actual']}"
+        for row in summary["misestimates"]
+    )
+    return issues
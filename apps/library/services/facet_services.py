@@ -0,0 +1,61 @@
+from django.db.models import Count, F, Q
+from django.db.models.functions import ExtractYear
+
+from apps.library.models import Book
+from apps.library.services.nationality_services import nationality_names
+
+
+def book_facets(queryset, year_bucket=10):
+    """
+    Facet counts for a filtered book queryset in two grouped queries.
+
+    Language and availability counts come from one conditional aggregate over
+    the fixed choices. Publish years and author nationality ids are grouped
+    together once, then folded into ``year_bucket``-wide buckets and
+    per-nationality counts in Python, with names from the cached map.
+    """
+    queryset = queryset.order_by()
+    languages = dict(Book.LANGUAGE_CHOICES)
+    totals = queryset.aggregate(
+        total=Count("id"),
+        available=Count("id", filter=Q(is_available=True)),
+        **{
+            f"language_{code}": Count("id", filter=Q(language=code))
+            for code in languages
+        },
+    )
+
+    buckets = {}
+    nationalities = {}
+    groups = queryset.values(
+        year=ExtractYear("publish_date"), nationality=F("author__nationality_id")
+    ).annotate(count=Count("id"))
+    for row in groups:
+        start = row["year"] - row["year"] % year_bucket
+        buckets[start] = buckets.get(start, 0) + row["count"]
+        if row["nationality"] is not None:
+            nationalities[row["nationality"]] = (
+                nationalities.get(row["nationality"], 0) + row["count"]
+            )
+
+    return {
+        "total": totals["total"],
+        "language": [
+            {"value": code, "label": label, "count": totals[f"language_{code}"]}
+            for code, label in languages.items()
+        ],
+        "is_available": [
+            {"value": True, "count": totals["available"]},
+            {"value": False, "count": totals["total"] - totals["available"]},
+        ],
+        "publish_year": [
+            {"from": start, "to": start + year_bucket - 1, "count": buckets[start]}
+            for start in sorted(buckets)
+        ],
+        "nationality": [
+            {"value": nationality_names.name(pk), "count": count}
+            for pk, count in sorted(
+                nationalities.items(), key=lambda item: (-item[1], item[0])
+            )
+        ],
+    }
@@ -0,0 +1,30 @@
+import re
+
+ISBN_SEPARATORS = re.compile(r"[\s-]")
+ISBN_10 = re.compile(r"^\d{9}[\dX]$")
+ISBN_13 = re.compile(r"^\d{13}$")
+
+
+def isbn13_check_digit(first_twelve):
+    total = sum(
+        int(digit) * (3 if position % 2 else 1)
+        for position, digit in enumerate(first_twelve)
+    )
+    return str((10 - total % 10) % 10)
+
+
+def to_isbn13(value):
+    """
+    Canonical ISBN-13 for an ISBN-10 or ISBN-13 (hyphens and spaces allowed),
+    or ``None`` if ``value`` is neither.
+
+    ISBN-10s are prefixed with 978 and get a recomputed check digit; ISBN-13s
+    are returned as is.
+    """
+    isbn = ISBN_SEPARATORS.sub("", str(value or "")).upper()
+    if ISBN_13.match(isbn):
+        return isbn
+    if ISBN_10.match(isbn):
+        first_twelve = f"978{isbn[:9]}"
+        return first_twelve + isbn13_check_digit(first_twelve)
+    return None
@@ -0,0 +1,81 @@
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from apps.library.models import Book, BookLoanRollup, Loan
+
+# ?window= values accepted by the popular endpoint, in days
+TRENDING_WINDOWS = {"7d": 7, "30d": 30, "365d": 365}
+
+
+def record_borrow(loan):
+    """
+    Bump the denormalized borrow counters of ``loan.book`` and its daily rollup,
+    and point the book at the loan while it is open.
+
+    ``last_borrowed_at`` only moves forward, whatever order loans are recorded
+    in. Runs in the transaction that creates the loan. A book instance already
+    loaded on the loan is refreshed so a later full ``save()`` of it does not
+    write stale counters back.
+    """
+    created = Value(loan.created)
+    changes = {
+        "loan_count": F("loan_count") + 1,
+        # Greatest is NULL on SQLite as soon as one argument is
+        "last_borrowed_at": Greatest(Coalesce("last_borrowed_at", created), created),
+    }
+    if loan.returned_at is None:
+        changes.update(current_loan=loan, modified=timezone.now())
+    Book.objects.filter(pk=loan.book_id).update(**changes)
+    if Loan.book.is_cached(loan):
+        loan.book.refresh_from_db(
+            fields=["loan_count", "last_borrowed_at", "current_loan", "modified"]
+        )
+    increment_rollup(loan.book_id, timezone.localdate(loan.created))
+
+
+def record_return(loan):
+    """
+    Clear ``current_loan`` on the book if it still points at ``loan``.
+
+    ``modified`` is bumped as the current borrower is part of the book detail.
+    """
+    cleared = Book.objects.filter(pk=loan.book_id, current_loan=loan).update(
+        current_loan=None, modified=timezone.now()
+    )
+    if cleared and Loan.book.is_cached(loan):
+        loan.book.refresh_from_db(fields=["current_loan", "modified"])
+
+
+def increment_rollup(book_id, day):
+    rollups = BookLoanRollup.objects.filter(book_id=book_id, day=day)
+    if rollups.update(borrows=F("borrows") + 1):
+        return
+    try:
+        with transaction.atomic():
+            BookLoanRollup.objects.create(book_id=book_id, day=day, borrows=1)
+    except IntegrityError:
+        # another borrow created the row first
+        rollups.update(borrows=F("borrows") + 1)
+
+
+def trending_books(books, days, limit=10, restrict=False):
+    """
+    The ``limit`` books borrowed most over the last ``days`` days, read from
+    the daily rollups. With ``restrict`` only books in ``books`` are ranked.
+    """
+    start = timezone.localdate() - timedelta(days=days - 1)
+    rollups = BookLoanRollup.objects.filter(day__gte=start)
+    if restrict:
+        rollups = rollups.filter(book__in=books.values("pk"))
+    top = (
+        rollups.values("book_id")
+        .annotate(total=Sum("borrows"))
+        .order_by("-total", "book_id")[:limit]
+    )
+    ids = [row["book_id"] for row in top]
+    by_id = books.in_bulk(ids)
+    return [by_id[book_id] for book_id in ids if book_id in by_id]
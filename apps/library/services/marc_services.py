@@ -0,0 +1,259 @@
+import re
+from xml.etree.ElementTree import ParseError, iterparse
+
+FIELD_TERMINATOR = b"\x1e"
+RECORD_TERMINATOR = b"\x1d"
+SUBFIELD_DELIMITER = b"\x1f"
+LEADER_LENGTH = 24
+DIRECTORY_ENTRY_LENGTH = 12
+
+# MARC language codes (008/35-37, 041 $a) of Book.LANGUAGE_CHOICES
+MARC_LANGUAGES = {
+    "eng": "EN",
+    "fre": "FR",
+    "fra": "FR",
+    "ara": "AR",
+    "spa": "ES",
+    "cze": "CZ",
+    "ces": "CZ",
+    "dut": "NL",
+    "nld": "NL",
+}
+TRAILING_PUNCTUATION = re.compile(r"[\s/:;,=.]+$")
+FINAL_INITIAL = re.compile(r"\b\w\.$")
+YEAR = re.compile(r"\b(\d{4})\b")
+PAGES = re.compile(r"(\d+)\s*(?:p\b|pages?\b)", re.IGNORECASE)
+
+
+class MarcFormatError(ValueError):
+    """The input is not well-formed MARC21 or MARCXML."""
+
+
+class MarcRecord:
+    """
+    Control and data fields of one MARC record.
+
+    ``control`` maps tags below 010 to their value; ``data`` maps the other
+    tags to ``(indicators, [(code, value), ...])`` in record order.
+    """
+
+    def __init__(self, leader=""):
+        self.leader = leader
+        self.control = {}
+        self.data = {}
+
+    def add_data_field(self, tag, indicators, subfields):
+        self.data.setdefault(tag, []).append((indicators, subfields))
+
+    def subfields(self, tag, code):
+        """Values of subfield ``code`` in every ``tag`` field."""
+        return [
+            value
+            for _, subfields in self.data.get(tag, [])
+            for subfield, value in subfields
+            if subfield == code
+        ]
+
+    def first(self, tag, code):
+        values = self.subfields(tag, code)
+        return values[0] if values else ""
+
+
+def read_iso2709(stream):
+    """
+    ``(record_number, MarcRecord)`` pairs of a binary MARC21 (ISO 2709) stream.
+
+    Records are read one at a time from their length prefix, so memory is
+    bounded by the largest record (99,999 bytes). Records whose leader does
+    not announce UTF-8 (position 9) are MARC-8: their ASCII text is kept and
+    other characters are replaced with U+FFFD.
+    """
+    number = 0
+    while True:
+        head = stream.read(5)
+        # some dumps put a line break between records
+        while head[:1] in (b"\n", b"\r"):
+            head = head[1:] + stream.read(1)
+        if not head:
+            return
+        number += 1
+        # a leader and a record terminator at least; shorter lengths would
+        # make the read below take the rest of the stream
+        if len(head) < 5 or not head.isdigit() or int(head) < LEADER_LENGTH + 1:
+            raise MarcFormatError(f"record {number}: invalid record length")
+        data = head + stream.read(int(head) - 5)
+        if len(data) != int(head) or not data.endswith(RECORD_TERMINATOR):
+            raise MarcFormatError(f"record {number}: truncated record")
+        try:
+            yield number, parse_iso2709(data)
+        except (ValueError, IndexError) as e:
+            raise MarcFormatError(f"record {number}: {e}")
+
+
+def parse_iso2709(data):
+    leader = data[:LEADER_LENGTH].decode("ascii")
+    encoding = "utf-8" if leader[9] == "a" else "ascii"
+    base_address = int(leader[12:17])
+    directory = data[LEADER_LENGTH : base_address - 1]
+    if len(directory) % DIRECTORY_ENTRY_LENGTH:
+        raise ValueError("invalid directory")
+
+    record = MarcRecord(leader)
+    for offset in range(0, len(directory), DIRECTORY_ENTRY_LENGTH):
+        entry = directory[offset : offset + DIRECTORY_ENTRY_LENGTH].decode("ascii")
+        tag, length, start = entry[:3], int(entry[3:7]), int(entry[7:])
+        field = data[base_address + start : base_address + start + length]
+        field = field.rstrip(FIELD_TERMINATOR)
+        if tag < "010":
+            record.control[tag] = field.decode(encoding, "replace")
+            continue
+        indicators, *subfields = field.split(SUBFIELD_DELIMITER)
+        record.add_data_field(
+            tag,
+            indicators.decode(encoding, "replace"),
+            [
+                (
+                    subfield[:1].decode(encoding, "replace"),
+                    subfield[1:].decode(encoding, "replace"),
+                )
+                for subfield in subfields
+                if subfield
+            ],
+        )
+    return record
+
+
+def local_name(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def read_marcxml(stream):
+    """
+    ``(record_number, MarcRecord)`` pairs of a binary MARCXML stream.
+
+    The document is parsed incrementally and each record is dropped from the
+    tree once read, so memory stays bounded by one record.
+    """
+    number = 0
+    root = None
+    try:
+        for event, element in iterparse(stream, events=("start", "end")):
+            if root is None:
+                root = element
+            if event != "end" or local_name(element.tag) != "record":
+                continue
+            number += 1
+            yield number, marcxml_record(element)
+            # the finished records are no longer referenced by the collection
+            root.clear()
+    except ParseError as e:
+        raise MarcFormatError(f"record {number + 1}: invalid XML ({e})")
+
+
+def marcxml_record(element):
+    record = MarcRecord()
+    for child in element:
+        name = local_name(child.tag)
+        if name == "leader":
+            record.leader = child.text or ""
+        elif name == "controlfield":
+            record.control[child.get("tag", "")] = child.text or ""
+        elif name == "datafield":
+            record.add_data_field(
+                child.get("tag", ""),
+                child.get("ind1", " ") + child.get("ind2", " "),
+                [
+                    (subfield.get("code", ""), subfield.text or "")
+                    for subfield in child
+                    if local_name(subfield.tag) == "subfield"
+                ],
+            )
+    return record
+
+
+def clean(value):
+    return TRAILING_PUNCTUATION.sub("", value.strip())
+
+
+def clean_name(value):
+    """Like clean, but a final initial keeps its full stop: "Ursula K."."""
+    name = value.strip().rstrip(" /:;,=")
+    if FINAL_INITIAL.search(name):
+        return name
+    return clean(name)
+
+
+def author_name(record):
+    """
+    Main entry (100, else 110) in direct order: personal names catalogued
+    as "Surname, Forenames" (first indicator 1) become "Forenames Surname".
+    """
+    for indicators, subfields in record.data.get("100", []):
+        name = next((value for code, value in subfields if code == "a"), "")
+        name = clean_name(name)
+        if indicators[:1] == "1" and "," in name:
+            surname, forenames = name.split(",", 1)
+            name = f"{forenames.strip()} {surname.strip()}"
+        return name
+    return clean_name(record.first("110", "a"))
+
+
+def isbn(record):
+    """First ISBN in 020 $a without its qualifier, e.g. "(pbk.)"."""
+    candidates = [value.split("(")[0].strip() for value in record.subfields("020", "a")]
+    return next(
+        (
+            candidate
+            for candidate in candidates
+            if candidate.replace("-", "").isdigit()
+        ),
+        candidates[0] if candidates else "",
+    )
+
+
+def publish_year(record):
+    """008/07-10, else the first year of 264 or 260 $c."""
+    date1 = record.control.get("008", "")[7:11]
+    if date1.isdigit():
+        return date1
+    for value in record.subfields("264", "c") + record.subfields("260", "c"):
+        match = YEAR.search(value)
+        if match:
+            return match.group(1)
+    return ""
+
+
+def page_count(record):
+    """Largest page number in 300 $a, e.g. 850 for "2 v. (xii, 850 p.)"."""
+    extent = " ".join(record.subfields("300", "a"))
+    pages = [int(match) for match in PAGES.findall(extent)]
+    return str(max(pages)) if pages else ""
+
+
+def language(record):
+    code = record.control.get("008", "")[35:38].strip() or record.first("041", "a")
+    code = code.strip().lower()
+    return MARC_LANGUAGES.get(code, code)
+
+
+def marc_row(record):
+    """
+    Import row (see build_book) for a MARC record.
+
+    MARC dates are years, so books are dated January 1st of their year of
+    publication; the description is the summary (520), else the first note
+    (500).
+    """
+    title = clean(record.first("245", "a"))
+    subtitle = clean(record.first("245", "b"))
+    year = publish_year(record)
+    return {
+        "title": f"{title}: {subtitle}" if subtitle else title,
+        "author": author_name(record),
+        "description": record.first("520", "a").strip()
+        or record.first("500", "a").strip(),
+        "isbn": isbn(record),
+        "publish_date": f"{year}-01-01" if year else "",
+        "page_count": page_count(record),
+        "language": language(record),
+    }
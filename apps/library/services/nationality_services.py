@@ -0,0 +1,119 @@
+import time
+
+from django.core.cache import cache
+
+from apps.library.models import Nationality
+
+NATIONALITY_VERSION_KEY = "library:nationality:version"
+# seconds between checks for renames and deletes made by other processes
+NATIONALITY_RECHECK_INTERVAL = 5
+# seconds between table reloads caused by unknown ids or names
+NATIONALITY_RELOAD_INTERVAL = 1
+
+
+class NationalityNames:
+    """
+    Per-worker ``id -> name`` map of the Nationality lookup table.
+
+    It is loaded on the first miss and reloaded on later ones, at most every
+    NATIONALITY_RELOAD_INTERVAL seconds; in between, a miss is looked up on
+    its own, so unknown names cost one indexed query rather than a table
+    scan. Committed saves and deletes in this process update it in place;
+    other processes learn of renames and deletes through a version key in
+    the shared cache, read at most every NATIONALITY_RECHECK_INTERVAL
+    seconds. The maps are replaced, never mutated, so readers in other
+    threads see a consistent pair.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._names = {}
+        self._ids = {}
+        self._version = None
+        self._checked_at = time.monotonic()
+        self._loaded_at = None
+
+    def load(self):
+        names = dict(Nationality.objects.values_list("id", "name"))
+        self._names, self._ids = names, {name: pk for pk, name in names.items()}
+        self._loaded_at = time.monotonic()
+
+    def reload(self):
+        """Reload the table unless it was loaded very recently."""
+        if (
+            self._loaded_at is not None
+            and time.monotonic() - self._loaded_at < NATIONALITY_RELOAD_INTERVAL
+        ):
+            return False
+        self.load()
+        return True
+
+    def check_version(self):
+        now = time.monotonic()
+        if now - self._checked_at < NATIONALITY_RECHECK_INTERVAL:
+            return
+        self._checked_at = now
+        version = cache.get(NATIONALITY_VERSION_KEY)
+        if version is not None and version != self._version:
+            self._version = version
+            self.load()
+
+    def update(self, pk, name, version=None):
+        """Record a local save (or, with ``name=None``, a delete)."""
+        names = {key: value for key, value in self._names.items() if key != pk}
+        if name is not None:
+            names[pk] = name
+        self._names, self._ids = names, {value: key for key, value in names.items()}
+        if version is not None:
+            self._version = version
+
+    def name(self, nationality_id):
+        """Name of the nationality with id ``nationality_id``, or ``None``."""
+        if nationality_id is None:
+            return None
+        self.check_version()
+        if nationality_id not in self._names and not self.reload():
+            return (
+                Nationality.objects.filter(pk=nationality_id)
+                .values_list("name", flat=True)
+                .first()
+            )
+        return self._names.get(nationality_id)
+
+    def id(self, name):
+        """Id of the nationality called ``name``, or ``None``."""
+        self.check_version()
+        if name not in self._ids and not self.reload():
+            return (
+                Nationality.objects.filter(name=name)
+                .values_list("id", flat=True)
+                .first()
+            )
+        return self._ids.get(name)
+
+
+nationality_names = NationalityNames()
+
+
+def nationality_changed(pk, name, created=False):
+    """
+    Apply a saved nationality (or, with ``name=None``, a deleted one) to this
+    process's map and, for renames and deletes, have other processes reload
+    theirs. Call it once the change is committed: a rolled back save must not
+    leave a name pointing at a missing row.
+    """
+    version = None
+    if not created:
+        version = time.time_ns()
+        cache.set(NATIONALITY_VERSION_KEY, version, None)
+    nationality_names.update(pk, name, version)
+
+
+def get_or_create_nationality_id(name):
+    """Id of the nationality called ``name``, created if missing."""
+    nationality_id = nationality_names.id(name)
+    if nationality_id is None:
+        nationality_id = Nationality.objects.get_or_create(name=name)[0].pk
+    return nationality_id
@@ -0,0 +1,88 @@
+from django.conf import settings
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    TrigramWordSimilarity,
+)
+from django.db import connection
+from django.db.models import Case, F, FloatField, Q, Value, When
+from django.db.models.functions import Upper
+
+SEARCH_CONFIG = "english"
+
+
+def uses_full_text_search():
+    """Full-text search needs the setting enabled and a PostgreSQL backend."""
+    return (
+        settings.LIBRARY_SEARCH_BACKEND == "fulltext"
+        and connection.vendor == "postgresql"
+    )
+
+
+def book_search_vector():
+    """Weighted search document for a book: title, author name, description."""
+    return (
+        SearchVector("title", weight="A", config=SEARCH_CONFIG)
+        + SearchVector("author_name", weight="B", config=SEARCH_CONFIG)
+        + SearchVector("description", weight="C", config=SEARCH_CONFIG)
+    )
+
+
+def refresh_search_vectors(queryset):
+    """Recompute the stored search document for every book in ``queryset``."""
+    if connection.vendor != "postgresql":
+        return 0
+    return queryset.update(search_vector=book_search_vector())
+
+
+def search_books(queryset, value):
+    """
+    Filter books matching ``value`` and annotate them with ``search_rank``.
+
+    Uses the GIN-indexed ``search_vector`` on PostgreSQL, otherwise falls back
+    to case-insensitive substring matching with a coarse field-based rank.
+    """
+    if uses_full_text_search():
+        query = SearchQuery(value, search_type="websearch", config=SEARCH_CONFIG)
+        return queryset.filter(search_vector=query).annotate(
+            search_rank=SearchRank(F("search_vector"), query)
+        )
+
+    return queryset.filter(
+        Q(title__icontains=value)
+        | Q(author_name__icontains=value)
+        | Q(description__icontains=value)
+    ).annotate(
+        search_rank=Case(
+            When(title__icontains=value, then=Value(1.0)),
+            When(author_name__icontains=value, then=Value(0.4)),
+            default=Value(0.1),
+            output_field=FloatField(),
+        )
+    )
+
+
+def fuzzy_filter(queryset, field_name, value):
+    """
+    Typo-tolerant match of ``value`` against ``field_name``.
+
+    On PostgreSQL this uses the pg_trgm word-similarity operator and orders
+    the rows by similarity. It compares ``UPPER(field_name)``, the expression
+    of the ``gin_trgm_ops`` indexes that also serve ``icontains``; trigrams
+    are case-insensitive, so the match is unchanged. Other databases
+    approximate it by requiring the leading trigram of every word of
+    ``value`` to appear in the field.
+    """
+    if connection.vendor == "postgresql":
+        return (
+            queryset.alias(fuzzy_text=Upper(field_name))
+            .filter(fuzzy_text__trigram_word_similar=value)
+            .annotate(similarity=TrigramWordSimilarity(value, "fuzzy_text"))
+            .order_by("-similarity")
+        )
+
+    condition = Q()
+    for word in value.split():
+        condition &= Q(**{f"{field_name}__icontains": word[:3]})
+    return queryset.filter(condition)
@@ -0,0 +1,102 @@
+import re
+import zlib
+
+import numpy as np
+from scipy import sparse
+
+TOKEN = re.compile(r"[^\W\d_]{2,}")
+STOP_WORDS = frozenset(
+    "a an and are as at be by for from has he in is it its of on or that the "
+    "their this to was were which with".split()
+)
+# title words count this many times as much as description words
+TITLE_WEIGHT = 2
+
+
+def tokenize(text):
+    return [token for token in TOKEN.findall(text.casefold()) if token not in STOP_WORDS]
+
+
+def count_matrix(documents, n_features):
+    """
+    Term counts of ``(title, description)`` pairs, one row per document, over
+    ``n_features`` hashed features (CRC32 of the token, stable across runs).
+    """
+    features = {}
+    rows, columns, counts = [], [], []
+    for row, (title, description) in enumerate(documents):
+        for tokens, weight in [
+            (tokenize(title or ""), TITLE_WEIGHT),
+            (tokenize(description or ""), 1),
+        ]:
+            for token in tokens:
+                feature = features.get(token)
+                if feature is None:
+                    feature = features[token] = (
+                        zlib.crc32(token.encode("utf-8")) % n_features
+                    )
+                rows.append(row)
+                columns.append(feature)
+                counts.append(weight)
+    # duplicate (row, column) entries are summed
+    return sparse.csr_matrix(
+        (np.array(counts, dtype=np.float32), (rows, columns)),
+        shape=(len(documents), n_features),
+    )
+
+
+def document_frequencies(counts):
+    """Number of rows of ``counts`` in which each feature occurs."""
+    return np.bincount(counts.indices, minlength=counts.shape[1])
+
+
+def inverse_document_frequencies(frequencies, n_documents):
+    # smoothed as if one extra document contained every term
+    return (np.log((1 + n_documents) / (1 + frequencies)) + 1).astype(np.float32)
+
+
+def tfidf(counts, idf):
+    """Sublinear TF-IDF rows of ``counts``, L2 normalized."""
+    weights = counts.copy()
+    weights.data = 1 + np.log(weights.data)
+    weights = sparse.csr_matrix(weights.multiply(idf))
+    norms = np.sqrt(np.asarray(weights.multiply(weights).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sparse.csr_matrix(sparse.diags(1 / norms) @ weights, dtype=np.float32)
+
+
+def nearest_neighbours(load_chunk, n_chunks, k):
+    """
+    Yield ``(chunk, positions, scores)`` for every chunk: for each of its rows,
+    the ``k`` most similar rows of all chunks by cosine similarity, best first.
+
+    ``load_chunk(i)`` returns the i-th block of normalized rows and positions
+    index the concatenation of all blocks. Only two blocks and one dense
+    block-by-block score matrix are in memory at a time.
+    """
+    for i in range(n_chunks):
+        block = load_chunk(i)
+        best_scores = np.full((block.shape[0], k), -np.inf, dtype=np.float32)
+        best_positions = np.full((block.shape[0], k), -1, dtype=np.int64)
+        offset = 0
+        for j in range(n_chunks):
+            other = block if j == i else load_chunk(j)
+            scores = (block @ other.T).toarray().astype(np.float32)
+            if j == i:
+                np.fill_diagonal(scores, -np.inf)
+            positions = np.broadcast_to(
+                np.arange(offset, offset + other.shape[0]), scores.shape
+            )
+            scores = np.hstack([best_scores, scores])
+            positions = np.hstack([best_positions, positions])
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            best_scores = np.take_along_axis(scores, top, axis=1)
+            best_positions = np.take_along_axis(positions, top, axis=1)
+            offset += other.shape[0]
+
+        order = np.argsort(-best_scores, axis=1, kind="stable")
+        yield (
+            i,
+            np.take_along_axis(best_positions, order, axis=1),
+            np.take_along_axis(best_scores, order, axis=1),
+        )
@@ -0,0 +1,243 @@
+import bisect
+import heapq
+import threading
+import time
+
+from django.conf import settings
+
+from apps.library.models import Author, Book
+
+# longer prefixes are matched on the first MAX_KEY_LENGTH characters and then
+# checked against the full text
+MAX_KEY_LENGTH = 32
+# upper bound on index positions inspected per lookup
+SCAN_FACTOR = 20
+
+
+def normalize(text):
+    return " ".join((text or "").casefold().split())
+
+
+def word_keys(text):
+    """Index keys for ``text``: the normalized text and every word-start suffix."""
+    words = text.split(" ")
+    return {
+        " ".join(words[position:])[:MAX_KEY_LENGTH]
+        for position in range(len(words))
+        if words[position]
+    }
+
+
+class PrefixIndex:
+    """
+    Sorted array of word-start keys supporting prefix lookups with bisect.
+
+    Keys and entry ids live in two parallel lists to keep the per-key overhead
+    small; ``entries`` maps an id to its display text and normalized text.
+    The three are replaced together as one tuple and never mutated once
+    published, so lock-free searches in other threads see a consistent index;
+    each ``update`` builds new lists in one merge pass, so changes should be
+    batched.
+    """
+
+    def __init__(self):
+        self._state = ([], [], {})
+
+    def __len__(self):
+        return len(self._state[2])
+
+    def load(self, rows):
+        """Replace the whole index with ``(entry_id, text)`` rows."""
+        pairs = []
+        entries = {}
+        for entry_id, text in rows:
+            normalized = normalize(text)
+            entries[entry_id] = (text, normalized)
+            pairs.extend((key, entry_id) for key in word_keys(normalized))
+        pairs.sort()
+        self._state = (
+            [key for key, _ in pairs],
+            [entry_id for _, entry_id in pairs],
+            entries,
+        )
+
+    def update(self, rows):
+        """
+        Add or replace ``(entry_id, text)`` rows; a ``None`` text removes
+        the entry.
+        """
+        changes = dict(rows)
+        if not changes:
+            return
+        keys, ids, entries = self._state
+        entries = dict(entries)
+        added = []
+        for entry_id, text in changes.items():
+            entries.pop(entry_id, None)
+            if text is None:
+                continue
+            normalized = normalize(text)
+            entries[entry_id] = (text, normalized)
+            added.extend((key, entry_id) for key in word_keys(normalized))
+        added.sort()
+        kept = (
+            (key, entry_id)
+            for key, entry_id in zip(keys, ids)
+            if entry_id not in changes
+        )
+        pairs = list(heapq.merge(kept, added))
+        self._state = (
+            [key for key, _ in pairs],
+            [entry_id for _, entry_id in pairs],
+            entries,
+        )
+
+    def put(self, entry_id, text):
+        self.update([(entry_id, text)])
+
+    def discard(self, entry_id):
+        self.update([(entry_id, None)])
+
+    def search(self, prefix, limit):
+        """
+        Return up to ``limit`` ``(entry_id, text)`` pairs whose text has a word
+        starting with ``prefix``. Matches at the start of the text come first,
+        then shorter texts.
+        """
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        keys, ids, entries = self._state
+        key_prefix = prefix[:MAX_KEY_LENGTH]
+        position = bisect.bisect_left(keys, key_prefix)
+        end = min(len(keys), position + limit * SCAN_FACTOR)
+
+        matches = {}
+        while position < end and keys[position].startswith(key_prefix):
+            entry_id = ids[position]
+            text, normalized = entries[entry_id]
+            is_match = normalized.startswith(prefix) or f" {prefix}" in normalized
+            if entry_id not in matches and is_match:
+                matches[entry_id] = (
+                    not normalized.startswith(prefix),
+                    len(normalized),
+                    normalized,
+                    text,
+                )
+            position += 1
+
+        ranked = sorted(matches.items(), key=lambda item: item[1])
+        return [(entry_id, rank[-1]) for entry_id, rank in ranked[:limit]]
+
+
+class SuggestionIndex:
+    """
+    Per-worker title and author name index.
+
+    Changes are folded in incrementally using the ``modified`` timestamps of
+    books and authors. Deleted rows only disappear on the periodic full
+    rebuild, as deletes leave no ``modified`` trace behind.
+    """
+
+    def __init__(self):
+        self.titles = PrefixIndex()
+        self.authors = PrefixIndex()
+        self._watermark = None
+        # (model, id) of the rows applied whose modified is the watermark
+        self._applied = set()
+        self._checked_at = None
+        self._built_at = None
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        now = time.monotonic()
+        if (
+            self._checked_at is not None
+            and now - self._checked_at < settings.LIBRARY_SUGGEST_REFRESH_SECONDS
+        ):
+            return
+        with self._lock:
+            if (
+                self._built_at is None
+                or now - self._built_at >= settings.LIBRARY_SUGGEST_REBUILD_SECONDS
+            ):
+                self._rebuild()
+                self._built_at = now
+            else:
+                self._apply_changes()
+            self._checked_at = now
+
+    def _rebuild(self):
+        watermark = None
+        applied = set()
+
+        def rows(model, text_field):
+            nonlocal watermark, applied
+            queryset = model.objects.order_by().values_list(
+                "id", text_field, "modified"
+            )
+            for entry_id, text, modified in queryset.iterator(chunk_size=5000):
+                if watermark is None or modified > watermark:
+                    watermark = modified
+                    applied = set()
+                if modified == watermark:
+                    applied.add((model, entry_id))
+                yield entry_id, text
+
+        self.titles.load(rows(Book, "title"))
+        self.authors.load(rows(Author, "name"))
+        self._watermark = watermark
+        self._applied = applied
+
+    def _apply_changes(self):
+        if self._watermark is None:
+            self._rebuild()
+            return
+        changes = []
+        for index, model, text_field in [
+            (self.titles, Book, "title"),
+            (self.authors, Author, "name"),
+        ]:
+            # gte: rows committed later with the same timestamp must not be
+            # missed, so the rows already applied at the watermark come back
+            rows = (
+                model.objects.filter(modified__gte=self._watermark)
+                .order_by()
+                .values_list("id", text_field, "modified")
+            )
+            changed = [
+                (entry_id, text, modified)
+                for entry_id, text, modified in rows
+                if modified > self._watermark
+                or (model, entry_id) not in self._applied
+            ]
+            index.update((entry_id, text) for entry_id, text, _ in changed)
+            changes.extend(
+                (model, entry_id, modified) for entry_id, _, modified in changed
+            )
+        if not changes:
+            return
+        watermark = max(modified for _, _, modified in changes)
+        applied = self._applied if watermark == self._watermark else set()
+        self._applied = applied | {
+            (model, entry_id)
+            for model, entry_id, modified in changes
+            if modified == watermark
+        }
+        self._watermark = watermark
+
+    def suggest(self, query, limit):
+        self.refresh()
+        return {
+            "titles": [
+                {"id": book_id, "title": title}
+                for book_id, title in self.titles.search(query, limit)
+            ],
+            "authors": [
+                {"id": author_id, "name": name}
+                for author_id, name in self.authors.search(query, limit)
+            ],
+        }
+
+
+suggestion_index = SuggestionIndex()
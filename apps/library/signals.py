@@ -0,0 +1,50 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from apps.library.api.cache import bump_catalog_deletes, bump_catalog_version
+from apps.library.models import Author, Book, Loan, Nationality
+from apps.library.services.author_services import sync_author_name
+from apps.library.services.nationality_services import nationality_changed
+
+
+@receiver(post_save, sender=Book)
+@receiver(post_delete, sender=Book)
+@receiver(post_save, sender=Author)
+@receiver(post_delete, sender=Author)
+@receiver(post_save, sender=Loan)
+@receiver(post_delete, sender=Loan)
+@receiver(post_save, sender=Nationality)
+@receiver(post_delete, sender=Nationality)
+def invalidate_catalog_cache(sender, **kwargs):
+    """
+    Any book, author, loan or nationality change invalidates cached catalog
+    responses once committed: bumped earlier, a concurrent request could
+    cache the old rows under the new version.
+    """
+    transaction.on_commit(bump_catalog_version)
+
+
+@receiver(post_delete, sender=Book)
+@receiver(post_delete, sender=Author)
+def count_catalog_delete(sender, **kwargs):
+    """Deleted books and authors make catalog snapshots rebuild."""
+    transaction.on_commit(bump_catalog_deletes)
+
+
+@receiver(post_save, sender=Nationality)
+def update_nationality_names(sender, instance, created, **kwargs):
+    pk, name = instance.pk, instance.name
+    transaction.on_commit(lambda: nationality_changed(pk, name, created=created))
+
+
+@receiver(post_delete, sender=Nationality)
+def remove_nationality_name(sender, instance, **kwargs):
+    pk = instance.pk
+    transaction.on_commit(lambda: nationality_changed(pk, None))
+
+
+@receiver(pre_delete, sender=Author)
+def clear_author_name(sender, instance, **kwargs):
+    """Books keep no copy of a deleted author's name; their author is set to null."""
+    sync_author_name(instance.pk, None)
@@ -1,3 +1,14 @@
 import pytest
+from django.core.cache import cache
+from apps.library.services.nationality_services import nationality_names
 from .fixtures.book_fixtures import *  # noqa
 from .fixtures.loan_fixtures import *  # noqa
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    nationality_names.clear()
+    yield
+    cache.clear()
+    nationality_names.clear()
@@ -2,7 +2,15 @@ import factory
 from factory.django import DjangoModelFactory
 from factory import fuzzy
 from datetime import date, timedelta
-from apps.library.models.book_models import Author, Book
+from apps.library.models.book_models import Author, Book, Nationality
+
+
+class NationalityFactory(DjangoModelFactory):
+    class Meta:
+        model = Nationality
+        django_get_or_create = ("name",)
+
+    name = factory.Faker("country")
 
 
 class AuthorFactory(DjangoModelFactory):
@@ -10,7 +18,7 @@ class AuthorFactory(DjangoModelFactory):
         model = Author
 
     name = factory.Faker("name")
-    nationality = factory.Faker("country")
+    nationality = factory.SubFactory(NationalityFactory)
     date_of_birth = factory.Faker("date_of_birth", minimum_age=20, maximum_age=100)
     date_of_death = None
 
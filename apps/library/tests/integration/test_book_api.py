@@ -1,15 +1,30 @@
+import json
 import pytest
 from rest_framework import status
 from rest_framework.test import APIClient
-from apps.library.models.book_models import Book
+from apps.library.api.cache import bump_catalog_version
+from apps.library.api.catalog_snapshot import CatalogSnapshot
+from apps.library.api.pagination import BookKeysetPagination, CountStrategyPagination
+from apps.library.models.book_models import Book, Nationality
+from apps.library.models.loan_models import BookLoanRollup
+from apps.library.models.recommendation_models import BookCoBorrow, BookSimilarity
+from apps.library.services.nationality_services import nationality_names
 from apps.library.tests.fixtures.book_fixtures import (
     author,
     authors,
     book,
     books,
 )  # noqa
-from apps.library.tests.factories.loan_factories import StaffUserFactory  # noqa
+from apps.library.tests.factories.book_factories import AuthorFactory, BookFactory
+from apps.library.tests.factories.loan_factories import (  # noqa
+    LoanFactory,
+    StaffUserFactory,
+)
 from datetime import date, timedelta
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.http import QueryDict
+from django.test.utils import CaptureQueriesContext
 
 
 @pytest.mark.django_db
@@ -148,6 +163,617 @@ class TestBookAPI:
         assert response.status_code == status.HTTP_400_BAD_REQUEST
         assert expected_error in str(response.content)
 
+    @pytest.mark.parametrize("search_backend", ["fulltext", "icontains"])
+    def test_book_search_ordered_by_rank(
+        self, api_client, author, settings, search_backend
+    ):
+        settings.LIBRARY_SEARCH_BACKEND = search_backend
+        BookFactory(title="Gardening", description="Mentions dune grass", author=author)
+        BookFactory(title="Dune", description="A desert planet", author=author)
+        BookFactory(title="Unrelated", description="Nothing to see", author=author)
+
+        response = api_client.get(f"{self.BASE_URL}/books/?search=dune&ordering=-rank")
+        assert response.status_code == status.HTTP_200_OK
+        titles = [item["title"] for item in response.data["results"]]
+        assert titles == ["Dune", "Gardening"]
+
+    def test_book_ordering_by_rank_without_search_is_ignored(self, api_client, books):
+        response = api_client.get(f"{self.BASE_URL}/books/?ordering=rank")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["count"] == len(books)
+
+    def test_book_fuzzy_title_tolerates_typos(self, api_client, author):
+        BookFactory(title="Harry Potter and the Stone", author=author)
+        BookFactory(title="War and Peace", author=author)
+
+        response = api_client.get(f"{self.BASE_URL}/books/?title_fuzzy=harry poter")
+        assert response.status_code == status.HTTP_200_OK
+        titles = [item["title"] for item in response.data["results"]]
+        assert titles == ["Harry Potter and the Stone"]
+
+    def test_book_suggest(self, api_client, author, settings):
+        settings.LIBRARY_SUGGEST_REBUILD_SECONDS = 0
+        author.name = "Frank Herbert"
+        author.save()
+        BookFactory(title="Dune Messiah", author=author)
+        BookFactory(title="Emma", author=author)
+
+        response = api_client.get(f"{self.BASE_URL}/books/suggest/?q=fra")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["titles"] == []
+        assert response.data["authors"] == [{"id": author.id, "name": "Frank Herbert"}]
+
+        response = api_client.get(f"{self.BASE_URL}/books/suggest/?q=mes&limit=1")
+        assert [item["title"] for item in response.data["titles"]] == ["Dune Messiah"]
+
+    @pytest.mark.parametrize(
+        "count_cap,expected_count,expected_approximate",
+        [(10, 3, False), (2, 2, True)],
+    )
+    def test_book_list_count_is_capped(
+        self, api_client, books, settings, count_cap, expected_count, expected_approximate
+    ):
+        settings.LIBRARY_PAGINATION_COUNT_CAP = count_cap
+        response = api_client.get(f"{self.BASE_URL}/books/")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["count"] == expected_count
+        assert response.data["count_is_approximate"] is expected_approximate
+        assert len(response.data["results"]) == 3
+
+    def test_book_list_pages_past_the_count_cap(self, api_client, settings, monkeypatch):
+        settings.LIBRARY_PAGINATION_COUNT_CAP = 3
+        monkeypatch.setattr(CountStrategyPagination, "page_size", 3)
+        ids = [BookFactory(page_count=100 + n).id for n in range(8)]
+        url = f"{self.BASE_URL}/books/?ordering=page_count"
+
+        seen = []
+        while url:
+            response = api_client.get(url)
+            assert response.status_code == status.HTTP_200_OK
+            assert response.data["count_is_approximate"] is True
+            seen.extend(item["id"] for item in response.data["results"])
+            url = response.data["next"]
+        assert seen == ids
+
+        # past the last row, like any page out of range
+        response = api_client.get(f"{self.BASE_URL}/books/?ordering=page_count&page=4")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_book_cursor_pagination_walks_catalog(self, api_client, monkeypatch):
+        monkeypatch.setattr(BookKeysetPagination, "page_size", 2)
+        today = date.today()
+        expected = []
+        for days_ago in [1, 1, 1, 5, 9]:
+            book = BookFactory(publish_date=today - timedelta(days=days_ago))
+            expected.append(book.id)
+
+        seen = []
+        url = f"{self.BASE_URL}/books/?pagination=cursor"
+        while url:
+            response = api_client.get(url)
+            assert response.status_code == status.HTTP_200_OK
+            assert "count" not in response.data
+            seen.extend(item["id"] for item in response.data["results"])
+            url = response.data["next"]
+        assert seen == expected
+
+        previous = api_client.get(response.data["previous"])
+        assert [item["id"] for item in previous.data["results"]] == expected[2:4]
+
+    def test_book_cursor_pagination_respects_filters(self, api_client, monkeypatch):
+        monkeypatch.setattr(BookKeysetPagination, "page_size", 1)
+        english = [BookFactory(language="EN").id for _ in range(2)]
+        BookFactory(language="FR")
+
+        response = api_client.get(f"{self.BASE_URL}/books/?pagination=cursor&language=EN")
+        second = api_client.get(response.data["next"])
+        ids = [item["id"] for item in response.data["results"] + second.data["results"]]
+        assert sorted(ids) == sorted(english)
+        assert second.data["next"] is None
+
+    def test_book_publish_year_filter(self, api_client, author):
+        inside = [
+            BookFactory(publish_date=date(2010, 1, 1), author=author).id,
+            BookFactory(publish_date=date(2010, 12, 31), author=author).id,
+        ]
+        BookFactory(publish_date=date(2011, 1, 1), author=author)
+        BookFactory(publish_date=date(2009, 12, 31), author=author)
+
+        response = api_client.get(f"{self.BASE_URL}/books/?publish_year=2010")
+        assert sorted(row["id"] for row in response.data["results"]) == inside
+        response = api_client.get(f"{self.BASE_URL}/books/?publish_year=0")
+        assert response.data["results"] == []
+
+    def test_book_facets(self, api_client, author, django_assert_max_num_queries):
+        BookFactory(language="EN", publish_date=date(2001, 5, 1), author=author)
+        BookFactory(language="EN", publish_date=date(2009, 5, 1), author=author)
+        BookFactory(
+            language="FR", publish_date=date(2015, 5, 1), is_available=False, author=author
+        )
+
+        url = f"{self.BASE_URL}/books/facets/?author_name={author.name}&year_bucket=10"
+        nationality_names.load()  # done once per worker
+        with django_assert_max_num_queries(2):
+            response = api_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        languages = {item["value"]: item["count"] for item in response.data["language"]}
+        assert response.data["total"] == 3
+        assert languages["EN"] == 2 and languages["FR"] == 1 and languages["AR"] == 0
+        assert response.data["is_available"] == [
+            {"value": True, "count": 2},
+            {"value": False, "count": 1},
+        ]
+        assert response.data["publish_year"] == [
+            {"from": 2000, "to": 2009, "count": 2},
+            {"from": 2010, "to": 2019, "count": 1},
+        ]
+        assert response.data["nationality"] == [
+            {"value": author.nationality.name, "count": 3}
+        ]
+
+        with django_assert_max_num_queries(0):
+            cached = api_client.get(url)
+        assert cached.data == response.data
+
+    def test_popular_books_use_loan_counters(self, api_client, books):
+        first, second, never_borrowed = books
+        for _ in range(2):
+            LoanFactory(book=first, returned_at=date.today())
+        LoanFactory(book=second)
+
+        first.refresh_from_db()
+        assert first.loan_count == 2
+        assert first.last_borrowed_at is not None
+
+        response = api_client.get(f"{self.BASE_URL}/books/popular/")
+        assert response.status_code == status.HTTP_200_OK
+        assert [item["id"] for item in response.data] == [first.id, second.id]
+
+        response = api_client.get(
+            f"{self.BASE_URL}/books/popular/?language={second.language}"
+            f"&title={second.title}"
+        )
+        assert [item["id"] for item in response.data] == [second.id]
+
+    def test_popular_books_within_window(self, api_client, books):
+        recent, old, _ = books
+        LoanFactory(book=recent)
+        for _ in range(3):
+            LoanFactory(book=old, returned_at=date.today())
+        BookLoanRollup.objects.filter(book=old).update(
+            day=date.today() - timedelta(days=40)
+        )
+
+        response = api_client.get(f"{self.BASE_URL}/books/popular/?window=30d")
+        assert response.status_code == status.HTTP_200_OK
+        assert [item["id"] for item in response.data] == [recent.id]
+
+        response = api_client.get(f"{self.BASE_URL}/books/popular/?window=365d")
+        assert [item["id"] for item in response.data] == [old.id, recent.id]
+
+        response = api_client.get(
+            f"{self.BASE_URL}/books/popular/?window=365d&title={recent.title}"
+        )
+        assert [item["id"] for item in response.data] == [recent.id]
+
+        response = api_client.get(f"{self.BASE_URL}/books/popular/?window=2d")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_anonymous_list_and_detail_are_cached(
+        self,
+        api_client,
+        book,
+        django_assert_num_queries,
+        django_capture_on_commit_callbacks,
+    ):
+        list_url = f"{self.BASE_URL}/books/?language={book.language}&title="
+        detail_url = f"{self.BASE_URL}/books/{book.id}/"
+        first_list = api_client.get(list_url)
+        first_detail = api_client.get(detail_url)
+
+        with django_assert_num_queries(0):
+            cached_list = api_client.get(
+                f"{self.BASE_URL}/books/?title=&language={book.language}"
+            )
+            cached_detail = api_client.get(detail_url)
+        assert cached_list.content == first_list.content
+        assert cached_detail.content == first_detail.content
+
+        with django_capture_on_commit_callbacks(execute=True):
+            book.title = "Renamed"
+            book.save()
+            # cached entries stay valid until the change is committed
+            assert api_client.get(detail_url).content == first_detail.content
+        response = api_client.get(detail_url)
+        assert response.data["title"] == "Renamed"
+
+    def test_authenticated_list_is_not_cached(self, authenticated_client, book):
+        authenticated_client.get(f"{self.BASE_URL}/books/")
+        Book.objects.filter(pk=book.pk).update(title="Changed behind the cache")
+
+        response = authenticated_client.get(f"{self.BASE_URL}/books/")
+        assert response.data["results"][0]["title"] == "Changed behind the cache"
+
+    def test_book_detail_conditional_get(
+        self,
+        api_client,
+        book,
+        django_assert_max_num_queries,
+        django_capture_on_commit_callbacks,
+    ):
+        url = f"{self.BASE_URL}/books/{book.id}/"
+        response = api_client.get(url)
+        etag = response["ETag"]
+        assert response["Last-Modified"]
+
+        with django_assert_max_num_queries(1):
+            response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+        response = api_client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+        )
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+        with django_capture_on_commit_callbacks(execute=True):
+            book.author.name = "Someone Else"
+            book.author.save()
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response["ETag"] != etag
+
+    def test_book_list_conditional_get(
+        self,
+        api_client,
+        book,
+        django_assert_num_queries,
+        django_capture_on_commit_callbacks,
+    ):
+        url = f"{self.BASE_URL}/books/?language={book.language}"
+        etag = api_client.get(url)["ETag"]
+
+        with django_assert_num_queries(0):
+            response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+        with django_capture_on_commit_callbacks(execute=True):
+            BookFactory(language=book.language)
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["count"] == 2
+
+    def test_author_detail_conditional_get(self, authenticated_client, author):
+        url = f"{self.BASE_URL}/authors/{author.id}/"
+        etag = authenticated_client.get(url)["ETag"]
+
+        response = authenticated_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_book_list_does_not_join_authors(self, api_client, books):
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(
+                f"{self.BASE_URL}/books/?search=a&ordering=author_name"
+            )
+        assert response.status_code == status.HTTP_200_OK
+        assert not any("library_author" in query["sql"] for query in queries)
+
+    def test_author_list_book_counts(
+        self, authenticated_client, author, django_assert_num_queries
+    ):
+        borrowed, _ = BookFactory(author=author), BookFactory(author=author)
+        LoanFactory(book=borrowed)
+        idle = AuthorFactory(name="Idle Author")
+
+        url = f"{self.BASE_URL}/authors/?ordering=-book_count"
+        nationality_names.load()  # done once per worker
+        # one grouped query for the page, one capped count
+        with django_assert_num_queries(2):
+            response = authenticated_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        counts = [
+            (item["id"], item["book_count"], item["active_loan_count"])
+            for item in response.data["results"]
+        ]
+        assert counts == [(author.id, 2, 1), (idle.id, 0, 0)]
+
+        response = authenticated_client.get(
+            f"{self.BASE_URL}/authors/?name=idle&fields=id,name"
+        )
+        assert response.data["results"] == [{"id": idle.id, "name": "Idle Author"}]
+
+    def test_author_nationality_is_a_lookup(self, authenticated_client):
+        url = f"{self.BASE_URL}/authors/"
+        for name in ["First Author", "Second Author"]:
+            response = authenticated_client.post(
+                url, {"name": name, "nationality": "Icelandic"}, format="json"
+            )
+            assert response.status_code == status.HTTP_201_CREATED
+            assert response.data["nationality"] == "Icelandic"
+        AuthorFactory(nationality__name="Maltese")
+        assert Nationality.objects.filter(name="Icelandic").count() == 1
+
+        response = authenticated_client.get(f"{url}?nationality=Icelandic")
+        assert sorted(item["name"] for item in response.data["results"]) == [
+            "First Author",
+            "Second Author",
+        ]
+        response = authenticated_client.get(f"{url}?nationality=Atlantean")
+        assert response.data["results"] == []
+
+    def test_invalid_author_creates_no_nationality(self, authenticated_client):
+        response = authenticated_client.post(
+            f"{self.BASE_URL}/authors/",
+            {
+                "name": "Future Author",
+                "nationality": "Atlantean",
+                "date_of_birth": (date.today() + timedelta(days=1)).isoformat(),
+            },
+            format="json",
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert not Nationality.objects.filter(name="Atlantean").exists()
+
+    def test_author_age_filters_and_ordering(self, authenticated_client):
+        today = date.today()
+        young = AuthorFactory(date_of_birth=date(today.year - 30, 1, 1))
+        old = AuthorFactory(date_of_birth=date(today.year - 80, 1, 1))
+        dead = AuthorFactory(
+            date_of_birth=date(1900, 1, 1), date_of_death=date(1950, 1, 1)
+        )
+
+        response = authenticated_client.get(f"{self.BASE_URL}/authors/?ordering=-age")
+        assert [(item["id"], item["age"]) for item in response.data["results"]] == [
+            (old.id, 80),
+            (dead.id, 50),
+            (young.id, 30),
+        ]
+
+        response = authenticated_client.get(
+            f"{self.BASE_URL}/authors/?age_min=40&age_max=60&fields=id"
+        )
+        assert response.data["results"] == [{"id": dead.id}]
+
+    def test_author_books_cursor_pagination(
+        self, authenticated_client, author, monkeypatch
+    ):
+        monkeypatch.setattr(BookKeysetPagination, "page_size", 2)
+        today = date.today()
+        expected = [
+            BookFactory(author=author, publish_date=today - timedelta(days=days)).id
+            for days in [1, 3, 5]
+        ]
+        BookFactory()
+
+        seen = []
+        url = f"{self.BASE_URL}/authors/{author.id}/books/"
+        while url:
+            response = authenticated_client.get(url)
+            assert response.status_code == status.HTTP_200_OK
+            seen.extend(item["id"] for item in response.data["results"])
+            url = response.data["next"]
+        assert seen == expected
+
+        response = authenticated_client.get(f"{self.BASE_URL}/authors/0/books/")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_book_detail_current_borrower(
+        self, authenticated_client, book, django_assert_num_queries
+    ):
+        loan = LoanFactory(book=book)
+        url = f"{self.BASE_URL}/books/{book.id}/"
+        nationality_names.load()  # done once per worker
+
+        with django_assert_num_queries(1):
+            response = authenticated_client.get(url)
+        assert response.data["current_borrower"]["user_id"] == loan.user.id
+        assert response.data["current_borrower"]["username"] == loan.user.username
+
+        loan.returned_at = date.today()
+        loan.save()
+        response = authenticated_client.get(url)
+        assert response.data["current_borrower"] is None
+
+    def test_book_list_sparse_fields(self, api_client, book):
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(f"{self.BASE_URL}/books/?fields=id,title")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["results"] == [{"id": book.id, "title": book.title}]
+        sql = " ".join(query["sql"] for query in queries)
+        assert '"description"' not in sql
+        assert '"library_author"' not in sql
+
+        response = api_client.get(f"{self.BASE_URL}/books/{book.id}/?fields=id,author")
+        assert set(response.data) == {"id", "author"}
+        assert response.data["author"]["name"] == book.author.name
+
+    @pytest.mark.parametrize("query", ["", "?pagination=cursor", "?ordering=title"])
+    def test_book_list_values_path_matches_instances(
+        self, authenticated_client, books, settings, query
+    ):
+        url = f"{self.BASE_URL}/books/{query}"
+        fast = authenticated_client.get(url)
+        settings.LIBRARY_VALUES_SERIALIZATION = False
+        assert authenticated_client.get(url).data == fast.data
+
+    def test_book_lookup_by_isbn(self, api_client, book, django_assert_num_queries):
+        book.isbn = "0306406152"
+        book.save()
+        nationality_names.load()  # done once per worker
+
+        for isbn in ["0306406152", "978-0-306-40615-7"]:
+            with django_assert_num_queries(1):
+                response = api_client.get(f"{self.BASE_URL}/books/by-isbn/{isbn}/")
+            assert response.status_code == status.HTTP_200_OK
+            assert response.data["id"] == book.id
+            assert response.data["isbn13"] == "9780306406157"
+
+            response = api_client.get(f"{self.BASE_URL}/books/?isbn={isbn}")
+            assert [row["id"] for row in response.data["results"]] == [book.id]
+
+        response = api_client.get(f"{self.BASE_URL}/books/by-isbn/9781234567897/")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        response = api_client.get(f"{self.BASE_URL}/books/by-isbn/123/")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    @pytest.mark.parametrize(
+        "query",
+        [
+            "",
+            "?language=EN&is_available=true",
+            "?publish_year=2010&ordering=-page_count",
+            "?publish_date_after=2005-01-01&page_count_max=500&ordering=publish_date",
+            "?publish_year=2010&page_count_min=200",
+            "?page_count_min=200&page_count_max=400&ordering=page_count",
+            "?ordering=-page_count,publish_date",
+            "?title=a",
+        ],
+    )
+    def test_catalog_snapshot_matches_database(
+        self, authenticated_client, author, settings, query
+    ):
+        for year, pages in [(2001, 300), (2010, 100), (2010, 300), (2020, 400)]:
+            BookFactory(
+                author=author,
+                publish_date=date(year, 6, 1),
+                language="EN",
+                page_count=pages,
+            )
+        BookFactory(author=None, is_available=False)
+        url = f"{self.BASE_URL}/books/{query}"
+
+        settings.LIBRARY_CATALOG_SNAPSHOT = True
+        from_snapshot = authenticated_client.get(url)
+        settings.LIBRARY_CATALOG_SNAPSHOT = False
+        assert from_snapshot.data == authenticated_client.get(url).data
+
+    def test_catalog_snapshot_follows_changes(
+        self,
+        authenticated_client,
+        book,
+        settings,
+        django_assert_num_queries,
+        django_capture_on_commit_callbacks,
+    ):
+        settings.LIBRARY_CATALOG_SNAPSHOT = True
+        url = f"{self.BASE_URL}/books/?language={book.language}"
+
+        def author_names():
+            response = authenticated_client.get(url)
+            return [row["author_name"] for row in response.data["results"]]
+
+        assert author_names() == [book.author.name]
+        with django_assert_num_queries(0):
+            authenticated_client.get(url)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            book.author.name = "Renamed Author"
+            book.author.save()
+            other = BookFactory(language=book.language, publish_date=book.publish_date)
+        assert sorted(author_names()) == sorted(["Renamed Author", other.author.name])
+
+        with django_capture_on_commit_callbacks(execute=True):
+            other.delete()
+        assert author_names() == ["Renamed Author"]
+
+        # a delete and a create between refreshes keep the count unchanged
+        with django_capture_on_commit_callbacks(execute=True):
+            book.delete()
+            replacement = BookFactory(language=book.language)
+        assert author_names() == [replacement.author.name]
+
+    def test_catalog_snapshot_reads_one_page(self, author):
+        for pages in [300, 100, 200]:
+            BookFactory(author=author, page_count=pages)
+        snapshot = CatalogSnapshot()
+
+        records = snapshot.filter_books(QueryDict("ordering=page_count"))
+        assert [record.page_count for record in records[:1]] == [100]
+        assert len(records._read) == 1
+
+    def test_catalog_snapshot_skips_applied_rows(
+        self, book, django_capture_on_commit_callbacks
+    ):
+        other = BookFactory(page_count=book.page_count + 1)
+        snapshot = CatalogSnapshot()
+        snapshot.refresh()
+        orders = snapshot._orders
+
+        # the row at the watermark comes back but is not applied again
+        bump_catalog_version()
+        snapshot.refresh()
+        assert snapshot._orders is orders
+
+        with django_capture_on_commit_callbacks(execute=True):
+            book.page_count = other.page_count + 1
+            book.save()
+        snapshot.refresh()
+        assert [record.id for record in snapshot._orders["-page_count"]] == [
+            book.id,
+            other.id,
+        ]
+        assert [record.id for record in snapshot._orders["page_count"]] == [
+            other.id,
+            book.id,
+        ]
+
+    def test_similar_books(self, api_client, books, django_assert_num_queries):
+        book, close, closer = books[:3]
+        BookSimilarity.objects.create(book=book, similar_book=close, score=0.4)
+        BookSimilarity.objects.create(book=book, similar_book=closer, score=0.9)
+
+        with django_assert_num_queries(1):
+            response = api_client.get(f"{self.BASE_URL}/books/{book.id}/similar/")
+        assert response.status_code == status.HTTP_200_OK
+        assert [row["id"] for row in response.data] == [closer.id, close.id]
+
+    def test_also_borrowed_books(self, api_client, books, django_assert_num_queries):
+        book, once, twice = books[:3]
+        BookCoBorrow.objects.create(book=book, other_book=once, count=1)
+        BookCoBorrow.objects.create(book=book, other_book=twice, count=2)
+        BookCoBorrow.objects.create(book=twice, other_book=once, count=5)
+
+        with django_assert_num_queries(1):
+            response = api_client.get(
+                f"{self.BASE_URL}/books/{book.id}/also-borrowed/?limit=5"
+            )
+        assert response.status_code == status.HTTP_200_OK
+        assert [row["id"] for row in response.data] == [twice.id, once.id]
+
+    def test_bulk_import(self, authenticated_client, author):
+        rows = [
+            {
+                "title": f"Imported {n}",
+                "author_id": author.id,
+                "description": "Text",
+                "isbn": isbn,
+                "publish_date": "2001-01-01",
+                "page_count": 10,
+                "language": "EN",
+            }
+            for n, isbn in enumerate(["9783161484100", "123"])
+        ]
+        content = "".join(json.dumps(row) + "\n" for row in rows).encode()
+        url = f"{self.BASE_URL}/books/bulk/"
+
+        response = APIClient().post(
+            url, {"file": SimpleUploadedFile("books.jsonl", content)}
+        )
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+        response = authenticated_client.post(
+            url, {"file": SimpleUploadedFile("books.jsonl", content)}
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data["created"] == 1 and response.data["failed"] == 1
+        assert response.data["errors"][0]["line"] == 2
+        assert Book.objects.get(title="Imported 0").author_name == author.name
+
+        response = authenticated_client.post(
+            url, {"file": SimpleUploadedFile("books.txt", content)}
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "format" in response.data
+
     def test_unauthenticated_access(self, api_client, book):
         """Test that unauthenticated users can only read books."""
         # List books - should work
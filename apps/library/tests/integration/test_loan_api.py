@@ -2,6 +2,9 @@ import pytest
 from rest_framework import status
 from rest_framework.test import APIClient
 from datetime import date
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from apps.library.models.book_models import Book
 from apps.library.models.loan_models import Loan
 from apps.library.tests.fixtures.loan_fixtures import (
     user,
@@ -137,6 +140,44 @@ class TestLoanAPI:
         assert response.status_code == expected_status
         assert expected_error in str(response.content)
 
+    def test_loan_list_sparse_fields(self, staff_client, active_loan):
+        url = f"{self.BASE_URL}/all-borrows/?fields=id,borrower_name,is_active"
+        with CaptureQueriesContext(connection) as queries:
+            response = staff_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data == [
+            {
+                "id": active_loan.id,
+                "borrower_name": active_loan.user.get_full_name(),
+                "is_active": True,
+            }
+        ]
+        loan_sql = next(q["sql"] for q in queries if '"library_loan"' in q["sql"])
+        assert '"password"' not in loan_sql
+        assert '"library_book"' not in loan_sql
+
+    def test_borrow_and_return_legacy_duplicate_isbn(self, authenticated_client, book):
+        # a book from before isbn13, sharing its ISBN with an older one
+        duplicate = Book.objects.get(pk=book.pk)
+        duplicate.pk = None
+        duplicate.title = "Legacy duplicate"
+        duplicate.isbn13 = None
+        Book.objects.bulk_create([duplicate])
+
+        response = authenticated_client.post(
+            f"{self.BASE_URL}/borrow/", data={"book_id": duplicate.pk}, format="json"
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        response = authenticated_client.post(
+            f"{self.BASE_URL}/return/",
+            data={"loan_id": response.data["id"]},
+            format="json",
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+        duplicate.refresh_from_db()
+        assert duplicate.is_available and duplicate.isbn13 is None
+
     def test_unauthorized_access(self, api_client, book, active_loan):
         """Test that unauthenticated users cannot access loan endpoints."""
         # Try to list loans
@@ -0,0 +1,331 @@
+import json
+import pytest
+from datetime import date, timedelta
+from io import StringIO
+from django.core.management import call_command
+from apps.library.models.book_models import Book
+from apps.library.models.loan_models import BookLoanRollup
+from apps.library.models.recommendation_models import BookCoBorrow, BookSimilarity
+from apps.library.services.book_import_services import BookImport
+from apps.library.tests.factories.book_factories import AuthorFactory, BookFactory
+from apps.library.tests.factories.loan_factories import LoanFactory, UserFactory
+
+
+@pytest.mark.django_db
+class TestRebuildLoanCounters:
+    def test_rebuilds_counters_from_loans(self):
+        borrowed, idle = BookFactory(), BookFactory()
+        loans = [LoanFactory(book=borrowed, returned_at=date.today()) for _ in range(3)]
+        Book.objects.update(loan_count=7, last_borrowed_at=None)
+
+        call_command("rebuild_loan_counters", batch_size=1)
+
+        borrowed.refresh_from_db()
+        idle.refresh_from_db()
+        assert borrowed.loan_count == 3
+        assert borrowed.last_borrowed_at == max(loan.created for loan in loans)
+        assert idle.loan_count == 0
+        assert idle.last_borrowed_at is None
+
+    def test_borrows_recorded_out_of_order_keep_the_latest(self):
+        book = BookFactory()
+        latest = LoanFactory(book=book, returned_at=date.today())
+        LoanFactory(
+            book=book,
+            returned_at=date.today(),
+            created=latest.created - timedelta(days=3),
+        )
+
+        book.refresh_from_db()
+        assert book.loan_count == 2
+        assert book.last_borrowed_at == latest.created
+
+
+@pytest.mark.django_db
+class TestRebuildLoanRollups:
+    def test_rebuilds_rollups_from_loans(self):
+        book = BookFactory()
+        for _ in range(2):
+            LoanFactory(book=book, returned_at=date.today())
+        BookLoanRollup.objects.all().delete()
+
+        call_command("rebuild_loan_rollups", batch_size=1)
+
+        rollup = BookLoanRollup.objects.get(book=book)
+        assert rollup.day == date.today()
+        assert rollup.borrows == 2
+
+
+@pytest.mark.django_db
+class TestLibraryIndexReport:
+    def test_json_report_covers_filter_combinations(self):
+        LoanFactory()
+        out = StringIO()
+
+        call_command("library_index_report", format="json", stdout=out)
+
+        reports = json.loads(out.getvalue())
+        combinations = {(report["filter"], tuple(report["params"])) for report in reports}
+        assert ("BookFilter", ()) in combinations
+        assert ("BookFilter", ("language", "publish_year")) in combinations
+        assert ("LoanFilter", ("status", "user")) in combinations
+        assert all("plan" in report and "issues" in report for report in reports)
+
+
+@pytest.mark.django_db
+class TestBuildBookSimilarity:
+    def neighbours(self):
+        return {
+            (row.book_id, row.similar_book_id): round(row.score, 5)
+            for row in BookSimilarity.objects.all()
+        }
+
+    def test_stores_nearest_books(self):
+        dragons = BookFactory(
+            title="Dragon Riders", description="Dragons and riders fight over the mountains."
+        )
+        more_dragons = BookFactory(
+            title="Dragon Mountains", description="Riders of dragons guard the mountains."
+        )
+        cooking = BookFactory(
+            title="Italian Cooking", description="Pasta recipes with tomatoes and basil."
+        )
+
+        call_command("build_book_similarity", top_k=1, stdout=StringIO())
+
+        assert set(self.neighbours()) == {
+            (dragons.id, more_dragons.id),
+            (more_dragons.id, dragons.id),
+        }
+        assert not BookSimilarity.objects.filter(book=cooking).exists()
+
+    def test_chunking_does_not_change_results(self):
+        for title in ["Dragon Riders", "Dragon Mountains", "Mountain Riders", "Sea"]:
+            BookFactory(title=title)
+
+        call_command("build_book_similarity", chunk_size=100, stdout=StringIO())
+        whole = self.neighbours()
+        call_command("build_book_similarity", chunk_size=1, stdout=StringIO())
+        assert self.neighbours() == whole
+
+
+@pytest.mark.django_db
+class TestBuildAlsoBorrowed:
+    def pair_counts(self):
+        return {
+            (row.book_id, row.other_book_id): row.count
+            for row in BookCoBorrow.objects.all()
+        }
+
+    def test_counts_patrons_borrowing_both_books(self):
+        first, second, third = BookFactory(), BookFactory(), BookFactory()
+        alice, bob = UserFactory(), UserFactory()
+        for user, book in [(alice, first), (alice, second), (bob, first), (bob, second)]:
+            LoanFactory(user=user, book=book, returned_at=date.today())
+        LoanFactory(user=bob, book=third, returned_at=date.today())
+        # borrowing a book twice counts once
+        LoanFactory(user=bob, book=third, returned_at=date.today())
+
+        call_command("build_also_borrowed", lag_minutes=0, stdout=StringIO())
+
+        assert self.pair_counts() == {
+            (first.id, second.id): 2,
+            (second.id, first.id): 2,
+            (first.id, third.id): 1,
+            (third.id, first.id): 1,
+            (second.id, third.id): 1,
+            (third.id, second.id): 1,
+        }
+
+    def test_incremental_runs_match_a_rebuild(self):
+        books = [BookFactory() for _ in range(4)]
+        users = [UserFactory() for _ in range(3)]
+        history = [(0, 0), (0, 1), (1, 1), (1, 2), (2, 0), (0, 2), (1, 3), (2, 3), (2, 1)]
+        for step, (user, book) in enumerate(history):
+            LoanFactory(user=users[user], book=books[book], returned_at=date.today())
+            if step % 3 == 2:
+                call_command(
+                    "build_also_borrowed", batch_size=1, lag_minutes=0, stdout=StringIO()
+                )
+        incremental = self.pair_counts()
+
+        call_command(
+            "build_also_borrowed", rebuild=True, lag_minutes=0, stdout=StringIO()
+        )
+        assert self.pair_counts() == incremental
+
+    def test_recent_loans_wait_for_a_later_run(self):
+        first, second = BookFactory(), BookFactory()
+        user = UserFactory()
+        LoanFactory(user=user, book=first, returned_at=date.today())
+        LoanFactory(user=user, book=second, returned_at=date.today())
+
+        call_command("build_also_borrowed", stdout=StringIO())
+        assert self.pair_counts() == {}
+
+        call_command("build_also_borrowed", lag_minutes=0, stdout=StringIO())
+        assert self.pair_counts() == {(first.id, second.id): 1, (second.id, first.id): 1}
+
+
+@pytest.mark.django_db
+class TestImportBooks:
+    HEADER = "title,author,author_id,description,isbn,publish_date,page_count,language\n"
+
+    def test_imports_valid_rows_and_reports_the_rest(self, tmp_path):
+        author = AuthorFactory(name="Ursula Le Guin")
+        stored = BookFactory(author=author, isbn="9780000000002")
+        path = tmp_path / "books.csv"
+        path.write_text(
+            self.HEADER
+            + "The Lathe of Heaven,Ursula Le Guin,,Dreams,0-306-40615-2,1971-03-01,184,en\n"
+            + f"The Dispossessed,,{author.id},Anarres,9783161484100,1974-05-01,387,EN\n"
+            + "No Author,Nobody,,Text,9781234567897,1990-01-01,100,EN\n"
+            + "Bad Row,Ursula Le Guin,,Text,123,someday,-1,XX\n"
+            + "The Dispossessed,Ursula Le Guin,,Again,9781861972712,1974-05-01,387,EN\n"
+            + f"{stored.title},Ursula Le Guin,,Copy,9780306406157,"
+            + f"{stored.publish_date.isoformat()},100,EN\n"
+            + "Same Isbn,Ursula Le Guin,,Copy,9780000000002,2000-01-01,100,EN\n"
+        )
+        report_path = tmp_path / "report.json"
+        out = StringIO()
+
+        call_command(
+            "import_books", str(path), batch_size=2, report=str(report_path), stdout=out
+        )
+
+        assert "Imported 2 books, rejected 5 rows" in out.getvalue()
+        lathe = Book.objects.get(title="The Lathe of Heaven")
+        assert lathe.author_name == "Ursula Le Guin"
+        assert lathe.isbn13 == "9780306406157" and lathe.language == "EN"
+        assert Book.objects.filter(title="The Dispossessed").count() == 1
+        errors = {
+            error["line"]: error["errors"]
+            for error in json.loads(report_path.read_text())["errors"]
+        }
+        assert errors[4] == {"author": "No author with this name."}
+        assert set(errors[5]) == {
+            "isbn", "publish_date", "page_count", "language"
+        }
+        assert "non_field_errors" in errors[6] and "non_field_errors" in errors[7]
+        # the ISBN of line 2 was imported, so line 7 can only clash on its key
+        assert errors[8] == {"isbn": "A book with this ISBN already exists."}
+
+    def test_out_of_range_values_are_reported(self, tmp_path):
+        author = AuthorFactory()
+        path = tmp_path / "books.csv"
+        # Excel writes a byte order mark
+        path.write_text(
+            self.HEADER
+            + f"Long,,{author.id},Text,9783161484100,2001-01-01,{10**20},EN\n"
+            + "Odd Id,,\u00b2,Text,9781861972712,2001-01-01,100,EN\n"
+            + f"Huge Id,,{10**20},Text,9781861972712,2001-01-01,100,EN\n"
+            # digits that are not 0-9
+            + f"Superscript,,{author.id},Text,"
+            + "\u00b2" * 10
+            + ",2001-01-01,100,EN\n"
+            + f"Arabic,,{author.id},Text,\u0660\u0663\u0660\u0666\u0664"
+            + "\u0660\u0666\u0661\u0665\u0662,2001-01-01,100,EN\n"
+            + f"Kept,,{author.id},Text,9781861972712,2001-01-01,100,EN\n",
+            encoding="utf-8-sig",
+        )
+        report_path = tmp_path / "report.json"
+
+        call_command(
+            "import_books", str(path), report=str(report_path), stdout=StringIO()
+        )
+
+        report = json.loads(report_path.read_text())
+        assert report["created"] == 1
+        errors = [(error["line"], list(error["errors"])) for error in report["errors"]]
+        assert errors == [
+            (2, ["page_count"]),
+            (3, ["author"]),
+            (4, ["author"]),
+            (5, ["isbn"]),
+            (6, ["isbn"]),
+        ]
+
+    def test_rows_inserted_meanwhile_are_reported(self, monkeypatch):
+        author = AuthorFactory()
+        taken = BookFactory(author=author, isbn="9783161484100")
+        # as if the book was inserted after the conflict check
+        monkeypatch.setattr(BookImport, "existing", lambda self, books: (set(), set()))
+        rows = [
+            {
+                "title": title,
+                "author_id": author.id,
+                "description": "Text",
+                "isbn": isbn,
+                "publish_date": "2001-01-01",
+                "page_count": 10,
+                "language": "EN",
+            }
+            for title, isbn in [("New", "9781861972712"), ("Copy", taken.isbn)]
+        ]
+
+        book_import = BookImport().run(enumerate(rows, start=1))
+
+        assert book_import.created == 1
+        assert [error["line"] for error in book_import.errors] == [2]
+        assert Book.objects.filter(title="New").exists()
+
+    def test_jsonl_reports_the_line_of_invalid_json(self, tmp_path):
+        author = AuthorFactory()
+        row = {
+            "title": "Kept",
+            "author_id": author.id,
+            "description": "Text",
+            "isbn": "9783161484100",
+            "publish_date": "2001-01-01",
+            "page_count": 10,
+            "language": "EN",
+        }
+        path = tmp_path / "books.jsonl"
+        path.write_text(json.dumps(row) + "\n\n{not json\n")
+
+        with pytest.raises(Exception, match="line 3"):
+            call_command("import_books", str(path), batch_size=1, stdout=StringIO())
+        assert Book.objects.filter(title="Kept").exists()
+
+    def test_marcxml_creates_missing_authors(self, tmp_path):
+        known = AuthorFactory(name="Ursula K. Le Guin")
+        records = [
+            ("1969", "Le Guin, Ursula K.", "The left hand of darkness", "9780441478125"),
+            ("1968", "Dick, Philip K.", "Do androids dream of electric sheep?", ""),
+            ("1974", "Dick, Philip K.", "Flow my tears", "9780394486789"),
+        ]
+        path = tmp_path / "books.xml"
+        path.write_text(
+            '<collection xmlns="http://www.loc.gov/MARC21/slim">'
+            + "".join(
+                "<record>"
+                f'<controlfield tag="008">000000s{year}    xxu           000 1 eng d'
+                "</controlfield>"
+                f'<datafield tag="020" ind1=" " ind2=" "><subfield code="a">{isbn}'
+                "</subfield></datafield>"
+                f'<datafield tag="100" ind1="1" ind2=" "><subfield code="a">{author},'
+                "</subfield></datafield>"
+                f'<datafield tag="245" ind1="1" ind2="0"><subfield code="a">{title} /'
+                "</subfield></datafield>"
+                '<datafield tag="300" ind1=" " ind2=" "><subfield code="a">286 p.'
+                "</subfield></datafield>"
+                '<datafield tag="500" ind1=" " ind2=" "><subfield code="a">A novel.'
+                "</subfield></datafield>"
+                "</record>"
+                for year, author, title, isbn in records
+            )
+            + "</collection>"
+        )
+        out = StringIO()
+
+        call_command(
+            "import_books", str(path), create_authors="American", stdout=out
+        )
+
+        assert "Imported 2 books, rejected 1 rows, created 1 authors" in out.getvalue()
+        assert "record 2: {'isbn'" in out.getvalue()
+        assert Book.objects.get(isbn="9780441478125").author_id == known.id
+        tears = Book.objects.get(title="Flow my tears")
+        assert tears.author_name == "Philip K. Dick"
+        assert tears.author.nationality.name == "American"
+        assert tears.publish_date == date(1974, 1, 1) and tears.page_count == 286
@@ -1,8 +1,12 @@
 import pytest
 from datetime import date, timedelta
 from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from apps.library.models.book_models import Author, Book
 from apps.library.models.loan_models import Loan
+from apps.library.services.author_services import sync_author_name
+from apps.library.tests.factories.book_factories import AuthorFactory, BookFactory
 from apps.library.tests.fixtures.book_fixtures import author, book  # noqa
 from apps.library.tests.fixtures.loan_fixtures import (
     user,
@@ -47,6 +51,44 @@ class TestBookModel:
         expected = f"{book.title} - {book.author.name}"
         assert str(book) == expected
 
+    def test_isbn13_follows_isbn(self, book):
+        book.isbn = "0306406152"
+        book.save(update_fields=["isbn"])
+        book.refresh_from_db()
+        assert book.isbn13 == "9780306406157"
+
+    def test_author_name_follows_author(self, book):
+        assert book.author_name == book.author.name
+
+        other = AuthorFactory(name="Other Author")
+        book.author = other
+        book.save(update_fields=["author"])
+        book.refresh_from_db()
+        assert book.author_name == "Other Author"
+
+    def test_partial_save_does_not_load_the_author(self, book):
+        book = Book.objects.get(pk=book.pk)
+        book.is_available = False
+        with CaptureQueriesContext(connection) as queries:
+            book.save(update_fields=["is_available"])
+        # full_clean still checks the author exists, without loading it
+        assert not any('"library_author"."name"' in query["sql"] for query in queries)
+
+    def test_author_rename_updates_books_in_batches(self, author):
+        books = BookFactory.create_batch(3, author=author)
+
+        assert sync_author_name(author.pk, "Renamed", batch_size=2) == 3
+        assert set(Book.objects.values_list("author_name", flat=True)) == {"Renamed"}
+
+        author.name = "Renamed Again"
+        author.save()
+        assert {book.author_name for book in Book.objects.all()} == {"Renamed Again"}
+
+        author.delete()
+        for book in books:
+            book.refresh_from_db()
+            assert (book.author_id, book.author_name) == (None, None)
+
     def test_invalid_page_count(self, book):
         with pytest.raises(ValidationError):
             book.page_count = 0
@@ -0,0 +1,62 @@
+import pytest
+from datetime import date
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from apps.library.api.serializers import (
+    BookDetailSerializer,
+    BookSerializer,
+    LoanSerializer,
+)
+from apps.library.api.serializers.mixins import serialize_many
+from apps.library.models import Book, Loan
+from apps.library.tests.factories.book_factories import BookFactory
+from apps.library.tests.factories.loan_factories import LoanFactory, UserFactory
+
+
+def make_request(query=""):
+    return Request(APIRequestFactory().get(f"/{query}"))
+
+
+@pytest.mark.django_db
+class TestValuesSerialization:
+    def test_book_values_match_serializer(self):
+        BookFactory.create_batch(3)
+        BookFactory(author=None)
+        queryset = Book.objects.order_by("id")
+
+        expected = BookSerializer(queryset, many=True).data
+        assert serialize_many(BookSerializer(), queryset) == expected
+        assert expected[-1]["author_name"] is None
+
+    def test_loan_values_match_serializer(self):
+        LoanFactory(user=UserFactory(first_name="Ada", last_name="Lovelace"))
+        LoanFactory(returned_at=date.today(), book=BookFactory(author=None))
+        queryset = Loan.objects.select_related("user", "book").order_by("id")
+
+        # book.author_name is nullable, but book is not
+        assert LoanSerializer().get_values_plan() is not None
+        expected = LoanSerializer(queryset, many=True).data
+        assert serialize_many(LoanSerializer(), queryset) == expected
+        assert [row["is_active"] for row in expected] == [True, False]
+        assert expected[-1]["book_author"] is None
+
+    def test_sparse_values_match_serializer(self):
+        LoanFactory()
+        context = {"request": make_request("?fields=id,book_author,borrowed_date")}
+        queryset = Loan.objects.all()
+
+        expected = LoanSerializer(queryset, many=True, context=context).data
+        assert serialize_many(LoanSerializer(context=context), queryset) == expected
+        assert set(expected[0]) == {"id", "book_author", "borrowed_date"}
+
+    def test_unsupported_serializer_falls_back(self, settings):
+        BookFactory()
+        queryset = Book.objects.all()
+
+        assert serialize_many(BookDetailSerializer(), queryset) == (
+            BookDetailSerializer(queryset, many=True).data
+        )
+        settings.LIBRARY_VALUES_SERIALIZATION = False
+        assert serialize_many(BookSerializer(), queryset) == (
+            BookSerializer(queryset, many=True).data
+        )
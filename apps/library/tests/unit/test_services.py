@@ -0,0 +1,338 @@
+import pytest
+from io import BytesIO
+from datetime import date
+from apps.library.models.book_models import Author, Nationality
+from apps.library.services.author_services import age_expression, calculate_age
+from apps.library.services.explain_services import (
+    plan_issues,
+    summarize_postgresql_plan,
+)
+from apps.library.services.book_import_services import AuthorResolver, build_book
+from apps.library.services.isbn_services import to_isbn13
+from apps.library.services.marc_services import (
+    MarcFormatError,
+    marc_row,
+    read_iso2709,
+    read_marcxml,
+)
+from apps.library.services.nationality_services import (
+    NationalityNames,
+    nationality_names,
+)
+from apps.library.services.suggest_services import PrefixIndex, SuggestionIndex
+from apps.library.tests.factories.book_factories import AuthorFactory
+
+
+class TestPrefixIndex:
+    def test_search_matches_word_starts(self):
+        index = PrefixIndex()
+        index.load([(1, "Harry Potter"), (2, "The Potter's Field"), (3, "Dune")])
+
+        assert index.search("pot", 5) == [(1, "Harry Potter"), (2, "The Potter's Field")]
+        assert index.search("harry p", 5) == [(1, "Harry Potter")]
+        assert index.search("otter", 5) == []
+
+    def test_matches_at_start_rank_first(self):
+        index = PrefixIndex()
+        index.load([(1, "A Dune Companion"), (2, "Dune Messiah"), (3, "Dune")])
+
+        assert [entry_id for entry_id, _ in index.search("dune", 5)] == [3, 2, 1]
+        assert len(index.search("dune", 2)) == 2
+
+    def test_put_and_discard_are_incremental(self):
+        index = PrefixIndex()
+        index.load([(1, "Dune")])
+
+        index.put(1, "Emma")
+        index.put(2, "Dubliners")
+        assert index.search("du", 5) == [(2, "Dubliners")]
+        assert index.search("em", 5) == [(1, "Emma")]
+
+        index.discard(2)
+        assert index.search("du", 5) == []
+        assert len(index) == 1
+
+    def test_update_publishes_a_new_index(self):
+        index = PrefixIndex()
+        index.load([(1, "Dune"), (2, "Emma")])
+        published = index._state
+
+        index.update([(1, "Dubliners"), (2, None), (3, "Dune Messiah")])
+        assert published[2] == {1: ("Dune", "dune"), 2: ("Emma", "emma")}
+        assert index.search("du", 5) == [(1, "Dubliners"), (3, "Dune Messiah")]
+        assert index.search("em", 5) == []
+
+    def test_empty_update_keeps_the_index(self):
+        index = PrefixIndex()
+        index.load([(1, "Dune")])
+        published = index._state
+
+        index.update([])
+        assert index._state is published
+
+
+@pytest.mark.django_db
+class TestSuggestionIndex:
+    def test_rows_already_applied_are_skipped(self):
+        author = AuthorFactory(name="Frank Herbert")
+        index = SuggestionIndex()
+        index._rebuild()
+        published = index.authors._state
+
+        # the row at the watermark comes back but is not applied again
+        index._apply_changes()
+        assert index.authors._state is published
+
+        author.name = "Jane Austen"
+        author.save()
+        index._apply_changes()
+        assert index.authors.search("jane", 5) == [(author.id, "Jane Austen")]
+        assert index.authors.search("frank", 5) == []
+
+
+@pytest.mark.django_db
+class TestAgeExpression:
+    TODAY = date(2024, 3, 1)
+
+    @pytest.mark.parametrize(
+        "birth,death",
+        [
+            (date(1950, 3, 1), None),
+            (date(1950, 3, 2), None),
+            (date(1952, 2, 29), None),
+            (date(1900, 12, 31), date(1980, 12, 30)),
+            (date(1900, 12, 31), date(1980, 12, 31)),
+        ],
+    )
+    def test_matches_calculate_age(self, birth, death):
+        author = AuthorFactory(date_of_birth=birth, date_of_death=death)
+        age = (
+            Author.objects.filter(pk=author.pk)
+            .annotate(age_years=age_expression(self.TODAY))
+            .values_list("age_years", flat=True)
+            .get()
+        )
+        expected = calculate_age(birth, death or self.TODAY)
+        assert age == expected
+
+    def test_unknown_birth_date(self):
+        AuthorFactory(date_of_birth=None)
+        ages = Author.objects.annotate(age_years=age_expression(self.TODAY))
+        assert ages.values_list("age_years", flat=True).get() is None
+
+
+@pytest.mark.django_db
+class TestNationalityNames:
+    def test_first_miss_loads_the_table(self, django_assert_num_queries):
+        chilean = Nationality.objects.create(name="Chilean")
+        names = NationalityNames()
+
+        with django_assert_num_queries(1):
+            assert names.name(chilean.pk) == "Chilean"
+            assert names.id("Chilean") == chilean.pk
+
+    def test_committed_saves_update_the_map(
+        self, django_assert_num_queries, django_capture_on_commit_callbacks
+    ):
+        with django_capture_on_commit_callbacks(execute=True):
+            chilean = Nationality.objects.create(name="Chilean")
+            chilean.name = "Chile"
+            chilean.save()
+
+        with django_assert_num_queries(0):
+            assert nationality_names.name(chilean.pk) == "Chile"
+            assert nationality_names.id("Chile") == chilean.pk
+
+        with django_capture_on_commit_callbacks(execute=True):
+            chilean.delete()
+        assert nationality_names.name(chilean.pk) is None
+
+    def test_rolled_back_saves_leave_the_map_alone(
+        self, django_capture_on_commit_callbacks
+    ):
+        with django_capture_on_commit_callbacks() as callbacks:
+            Nationality.objects.create(name="Atlantean")
+        assert callbacks
+        # the transaction is discarded without running its callbacks
+        assert "Atlantean" not in nationality_names._ids
+
+    def test_misses_reload_the_table_at_most_once_a_second(
+        self, django_assert_num_queries
+    ):
+        names = NationalityNames()
+        with django_assert_num_queries(1):
+            assert names.id("Unknown") is None
+        # too soon for another reload: one indexed lookup each
+        with django_assert_num_queries(2):
+            assert names.id("Unknown") is None
+            assert names.id("Still unknown") is None
+
+
+def iso2709(control, data, leader_encoding="a"):
+    """MARC21 record of control fields and ``(tag, indicators, subfields)``."""
+    fields = [(tag, value.encode()) for tag, value in control.items()]
+    fields += [
+        (
+            tag,
+            indicators.encode()
+            + b"".join(
+                b"\x1f" + code.encode() + value.encode() for code, value in subfields
+            ),
+        )
+        for tag, indicators, subfields in data
+    ]
+    directory, body = b"", b""
+    for tag, value in fields:
+        value += b"\x1e"
+        directory += f"{tag}{len(value):04}{len(body):05}".encode()
+        body += value
+    base_address = 24 + len(directory) + 1
+    length = base_address + len(body) + 1
+    leader = f"{length:05}nam {leader_encoding}22{base_address:05}   4500".encode()
+    return leader + directory + b"\x1e" + body + b"\x1d"
+
+
+class TestMarcReaders:
+    CONTROL = {"001": "ocm1", "008": "710301s1971    nyu           000 1 eng d"}
+    DATA = [
+        ("020", "  ", [("a", "0306406152 (pbk.)")]),
+        ("100", "1 ", [("a", "Le Guin, Ursula K.,"), ("d", "1929-2018.")]),
+        ("245", "14", [("a", "The lathe of heaven :"), ("b", "a novel /")]),
+        ("300", "  ", [("a", "xii, 184 p. ;"), ("c", "22 cm.")]),
+        ("520", "  ", [("a", "George Orr dreams things into being.")]),
+    ]
+    ROW = {
+        "title": "The lathe of heaven: a novel",
+        "author": "Ursula K. Le Guin",
+        "description": "George Orr dreams things into being.",
+        "isbn": "0306406152",
+        "publish_date": "1971-01-01",
+        "page_count": "184",
+        "language": "EN",
+    }
+
+    def test_iso2709_records_are_mapped_to_import_rows(self):
+        stream = BytesIO(iso2709(self.CONTROL, self.DATA) + b"\n" + iso2709({}, []))
+        records = list(read_iso2709(stream))
+
+        assert [number for number, _ in records] == [1, 2]
+        assert marc_row(records[0][1]) == self.ROW
+        assert marc_row(records[1][1])["title"] == ""
+
+    def test_marc8_records_keep_their_ascii_text(self):
+        data = [("245", "10", [("a", "Caf\u00e9 stories.")])]
+        stream = BytesIO(iso2709({}, data, leader_encoding=" "))
+        [(_, record)] = read_iso2709(stream)
+        assert record.first("245", "a").startswith("Caf\ufffd")
+
+    def test_truncated_iso2709_record(self):
+        record = iso2709(self.CONTROL, self.DATA)
+        with pytest.raises(MarcFormatError, match="record 2: truncated"):
+            list(read_iso2709(BytesIO(record + record[:-10])))
+
+    @pytest.mark.parametrize("length", [b"00000", b"00004", b"00024"])
+    def test_record_length_below_the_leader_is_rejected(self, length):
+        stream = BytesIO(length + iso2709(self.CONTROL, self.DATA) * 10)
+        with pytest.raises(MarcFormatError, match="record 1: invalid record length"):
+            next(read_iso2709(stream))
+        # nothing past the length prefix was read
+        assert stream.tell() == 5
+
+    @pytest.mark.django_db
+    def test_oversized_page_count_is_a_row_error(self):
+        data = [*self.DATA[:3], ("300", "  ", [("a", f"{10**20} p.")]), self.DATA[4]]
+        [(_, record)] = read_iso2709(BytesIO(iso2709(self.CONTROL, data)))
+        book, errors = build_book(marc_row(record), AuthorResolver())
+        assert book is None and "page_count" in errors
+
+    def test_marcxml_records_are_mapped_to_import_rows(self):
+        fields = "".join(
+            f'<datafield tag="{tag}" ind1="{indicators[0]}" ind2="{indicators[1]}">'
+            + "".join(
+                f'<subfield code="{code}">{value}</subfield>'
+                for code, value in subfields
+            )
+            + "</datafield>"
+            for tag, indicators, subfields in self.DATA
+        )
+        control = "".join(
+            f'<controlfield tag="{tag}">{value}</controlfield>'
+            for tag, value in self.CONTROL.items()
+        )
+        document = (
+            '<collection xmlns="http://www.loc.gov/MARC21/slim">'
+            f"<record><leader>00000nam a2200000   4500</leader>{control}{fields}</record>"
+            "<record><leader>00000nam a2200000   4500</leader></record>"
+            "<record>"
+        )
+
+        records = read_marcxml(BytesIO(document.encode()))
+        assert marc_row(next(records)[1]) == self.ROW
+        assert next(records)[0] == 2
+        with pytest.raises(MarcFormatError, match="record 3: invalid XML"):
+            next(records)
+
+
+class TestToIsbn13:
+    def test_converts_isbn10(self):
+        assert to_isbn13("0306406152") == "9780306406157"
+        assert to_isbn13("0-8044-2957-X") == "9780804429573"
+
+    def test_keeps_isbn13(self):
+        assert to_isbn13("978-0-306-40615-7") == "9780306406157"
+
+    def test_rejects_other_values(self):
+        assert to_isbn13("12345") is None
+        assert to_isbn13("") is None
+        assert to_isbn13(None) is None
+
+
+class TestSummarizePostgresqlPlan:
+    PLAN = {
+        "Plan": {
+            "Node Type": "Limit",
+            "Plan Rows": 10,
+            "Actual Rows": 10,
+            "Actual Loops": 1,
+            "Shared Hit Blocks": 12,
+            "Shared Read Blocks": 3,
+            "Plans": [
+                {
+                    "Node Type": "Sort",
+                    "Plan Rows": 50,
+                    "Actual Rows": 10,
+                    "Actual Loops": 1,
+                    "Sort Key": ["publish_date DESC"],
+                    "Sort Method": "external merge",
+                    "Sort Space Used": 2048,
+                    "Sort Space Type": "Disk",
+                    "Plans": [
+                        {
+                            "Node Type": "Seq Scan",
+                            "Relation Name": "library_book",
+                            "Filter": "(page_count >= 300)",
+                            "Plan Rows": 50,
+                            "Actual Rows": 40000,
+                            "Actual Loops": 1,
+                        }
+                    ],
+                }
+            ],
+        },
+        "Planning Time": 0.1,
+        "Execution Time": 42.0,
+    }
+
+    def test_flags_scans_spills_and_misestimates(self):
+        summary = summarize_postgresql_plan(self.PLAN)
+
+        assert summary["execution_ms"] == 42.0
+        assert summary["buffers"] == {"hit": 12, "read": 3}
+        assert summary["seq_scans"][0]["relation"] == "library_book"
+        assert summary["sorts"][0]["spilled"] is True
+        assert [row["node"] for row in summary["misestimates"]] == ["Seq Scan"]
+        assert plan_issues(summary) == [
+            "seq scan on library_book (filter: (page_count >= 300))",
+            "sort spilled to disk (2048 kB, external merge)",
+            "Seq Scan on library_book: estimated 50 rows, actual 40000",
+        ]
@@ -40,6 +40,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     # third party apps
     "rest_framework",
     "rest_framework_simplejwt",
@@ -174,6 +175,38 @@ REST_FRAMEWORK = {
 }
 
 
+# Library configuration
+# "fulltext" searches books through the PostgreSQL search_vector column,
+# "icontains" keeps the legacy substring matching on every backend.
+LIBRARY_SEARCH_BACKEND = os.getenv("LIBRARY_SEARCH_BACKEND", "fulltext")
+
+# Typeahead index: changed rows are picked up every REFRESH seconds, deleted
+# rows on the full rebuild every REBUILD seconds.
+LIBRARY_SUGGEST_REFRESH_SECONDS = 5
+LIBRARY_SUGGEST_REBUILD_SECONDS = 3600
+LIBRARY_SUGGEST_MAX_LIMIT = 20
+
+# "capped" and "estimated" list counts stop counting after this many rows
+LIBRARY_PAGINATION_COUNT_CAP = 10000
+
+# seconds a computed facet result is reused for identical filters
+LIBRARY_FACETS_CACHE_TIMEOUT = 60
+
+# Anonymous book list/detail responses are cached for this many seconds (0
+# disables it). Entries are invalidated through a catalog version counter kept
+# in the cache, so multi-worker deployments need a shared CACHES backend.
+LIBRARY_RESPONSE_CACHE_TIMEOUT = int(os.getenv("LIBRARY_RESPONSE_CACHE_TIMEOUT", 60))
+
+# Book and loan listings are rendered from .values() rows instead of model
+# instances when their serializers support it.
+LIBRARY_VALUES_SERIALIZATION = True
+
+# Serve simple book list queries (language, availability, date and page count
+# ranges, ordering by date or page count) from a per-worker in-memory copy of
+# the catalog, refreshed whenever the catalog version changes.
+LIBRARY_CATALOG_SNAPSHOT = os.getenv("LIBRARY_CATALOG_SNAPSHOT") == "True"
+
+
 # Simple JWT configuration
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=60),